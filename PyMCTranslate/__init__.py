@@ -1,4 +1,6 @@
 import os
+import threading
+from typing import Iterable, Tuple, Union, List
 
 try:
     from amulet.api.block import Block
@@ -38,8 +40,6 @@ if minified:
                 item.json.gz
                 entity.json.gz
     """
-    # load the mega_json file and unpack
-    json_atlas: list = load_json_gz(os.path.join(pymct_dir, 'min_json', 'atlas.json.gz'))
     json_dir = os.path.join(pymct_dir, 'min_json')
 else:
     """
@@ -56,16 +56,53 @@ else:
                                 <group_name>
                                     <base_name>.json
     """
-    json_atlas = None
     json_dir = os.path.join(pymct_dir, 'json')
 
+_json_atlas: Union[list, None] = None
+_json_atlas_lock = threading.Lock()
+
+
+def get_json_atlas() -> Union[list, None]:
+    """
+    Get the list of json objects the minified files index into.
+    The atlas is only loaded the first time it is requested. Returns None if the json files are not minified.
+    """
+    global _json_atlas
+    if minified and _json_atlas is None:
+        with _json_atlas_lock:
+            if _json_atlas is None:
+                # load the mega_json file and unpack
+                _json_atlas = load_json_gz(os.path.join(pymct_dir, 'min_json', 'atlas.json.gz'))
+    return _json_atlas
+
+
+def __getattr__(name: str):
+    # json_atlas used to be loaded when the package was imported
+    if name == 'json_atlas':
+        return get_json_atlas()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 from PyMCTranslate.py3.translation_manager import TranslationManager
 from PyMCTranslate.py3.versions import Version
 from PyMCTranslate.py3 import raw_text
 
 
-def new_translation_manager() -> TranslationManager:
+def new_translation_manager(
+        lazy: bool = False,
+        preload: Iterable[Tuple[str, Union[int, Tuple[int, ...], List[int]]]] = None,
+        workers: int = None,
+        processes: bool = False,
+        cache_entries: int = None,
+        cache_bytes: int = None
+) -> TranslationManager:
     """Returns a new TranslationManager with the default files.
     Each unique world should have a new TranslationManager because there is the
-    functionality to register custom (mod) blocks making each handler unique."""
-    return TranslationManager(json_dir)
+    functionality to register custom (mod) blocks making each handler unique.
+    The read only translation databases are shared between all TranslationManager instances.
+    :param lazy: If True each block in the translator databases is only decoded when it is first used
+    :param preload: An iterable of (platform, version_number) for versions to load the translators for up front. eg [('java', (1, 15, 2)), ('bedrock', (1, 16, 0))]
+    :param workers: The number of threads or processes to load the version data with in parallel. See TranslationManager
+    :param processes: If True the workers are processes rather than threads. Only useful on multi-core machines when the json is not compiled
+    :param cache_entries: The maximum number of entries in each translation cache or None for no limit
+    :param cache_bytes: The maximum estimated size in bytes of each translation cache or None for no limit"""
+    return TranslationManager(json_dir, lazy, preload, workers, processes, cache_entries, cache_bytes)
@@ -1,11 +1,54 @@
 from __future__ import annotations
 
 import copy
+import functools
 from sys import getsizeof
 import re
-from typing import Dict, Iterable, List, Tuple, Union, overload, Generator
+from typing import Dict, Iterable, List, Tuple, Union, overload, Generator, Sequence
+import numpy
 import amulet_nbt
 
+# the characters the blockstate regexes accept in each part of a blockstate string
+_namespace_chars = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_.-")
+_base_name_chars = frozenset("abcdefghijklmnopqrstuvwxyz0123456789/._-")
+_property_name_chars = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_")
+_property_value_chars = frozenset('abcdefghijklmnopqrstuvwxyz0123456789_"')
+
+# the maximum number of blockstate strings remembered by the parser
+_blockstate_cache_size = 65536
+
+
+def _split_blockstate(blockstate: str) -> Union[Tuple[str, str, Dict[str, str]], None]:
+    """
+    Split a well formed blockstate string without using the regexes.
+    :return: namespace, base_name, properties or None if the string is not in the simple form and the regexes should be used
+    """
+    head, bracket, properties_string = blockstate.partition("[")
+    namespace, colon, base_name = head.rpartition(":")
+    if not colon:
+        namespace = "minecraft"
+    elif not namespace or not _namespace_chars.issuperset(namespace):
+        return None
+    if not base_name or not _base_name_chars.issuperset(base_name):
+        return None
+
+    properties = {}
+    if bracket:
+        if not properties_string.endswith("]"):
+            return None
+        for property_string in properties_string[:-1].split(","):
+            name, equals, value = property_string.partition("=")
+            if (
+                not equals
+                or not name
+                or not value
+                or not _property_name_chars.issuperset(name)
+                or not _property_value_chars.issuperset(value)
+            ):
+                return None
+            properties[name] = value
+    return namespace, base_name, properties
+
 
 class Block:
     """
@@ -68,6 +111,7 @@ class Block:
         "_properties",
         "_extra_blocks",
         "_blockstate",
+        "_hash",
     )  # Reduces memory footprint
 
     blockstate_regex = re.compile(
@@ -89,6 +133,7 @@ class Block:
     ):
         self._blockstate = None
         self._namespaced_name = None
+        self._hash = None
         assert (isinstance(namespace, str) or namespace is None) and isinstance(
             base_name, str
         ), f"namespace and base_name must be strings {namespace} {base_name}"
@@ -181,43 +226,93 @@ class Block:
         return self._extra_blocks
 
     def _gen_blockstate(self):
-        self._namespaced_name = self._blockstate = f"{self.namespace}:{self.base_name}"
-        if self.properties:
+        self._namespaced_name = self._blockstate = f"{self._namespace}:{self._base_name}"
+        if self._properties:
             props = [
                 f"{key}={value.to_snbt()}"
-                for key, value in sorted(self.properties.items())
+                for key, value in sorted(self._properties.items())
             ]
             self._blockstate += f"[{','.join(props)}]"
-        if self.extra_blocks:
+        if self._extra_blocks:
             self._blockstate += (
-                f"{{{' , '.join(block.blockstate for block in self.extra_blocks)}}}"
+                f"{{{' , '.join(block.blockstate for block in self._extra_blocks)}}}"
             )
+        # the block is not modified after it is created so the hash is only computed once
+        self._hash = hash(self._blockstate)
+        if self._extra_blocks:
+            self._hash = hash(self._hash + hash(self._extra_blocks))
 
     @staticmethod
-    def parse_blockstate_string(
+    @functools.lru_cache(maxsize=_blockstate_cache_size)
+    def _parse_blockstate_string(
         blockstate: str,
-    ) -> Tuple[str, str, Dict[str, amulet_nbt.BaseValueType]]:
-        match = Block.blockstate_regex.match(blockstate)
-        namespace = match.group("namespace") or "minecraft"
-        base_name = match.group("base_name")
-
-        if match.group("property_name") is not None:
-            properties = {match.group("property_name"): match.group("property_value")}
+    ) -> Tuple[str, str, Tuple[Tuple[str, amulet_nbt.BaseValueType], ...]]:
+        """
+        Parse a blockstate string into namespace, base name and the sorted property items.
+        The result is remembered and shared between callers so the tags in it must be copied before they are given out.
+        """
+        split = _split_blockstate(blockstate)
+        if split is not None:
+            namespace, base_name, properties = split
         else:
-            properties = {}
+            # the string has characters the simple parser does not handle. Fall back to the regexes
+            match = Block.blockstate_regex.match(blockstate)
+            namespace = match.group("namespace") or "minecraft"
+            base_name = match.group("base_name")
 
-        properties_string = match.group("properties")
-        if properties_string is not None:
-            properties_match = Block.parameters_regex.finditer(properties_string)
-            for match in properties_match:
-                properties[match.group("name")] = match.group("value")
+            if match.group("property_name") is not None:
+                properties = {match.group("property_name"): match.group("property_value")}
+            else:
+                properties = {}
+
+            properties_string = match.group("properties")
+            if properties_string is not None:
+                properties_match = Block.parameters_regex.finditer(properties_string)
+                for match in properties_match:
+                    properties[match.group("name")] = match.group("value")
 
         return (
             namespace,
             base_name,
-            {k: amulet_nbt.from_snbt(v) for k, v in sorted(properties.items())},
+            tuple((k, amulet_nbt.from_snbt(v)) for k, v in sorted(properties.items())),
         )
 
+    @staticmethod
+    def parse_blockstate_string(
+        blockstate: str,
+    ) -> Tuple[str, str, Dict[str, amulet_nbt.BaseValueType]]:
+        namespace, base_name, properties = Block._parse_blockstate_string(blockstate)
+        return namespace, base_name, {k: v.copy() for k, v in properties}
+
+    @staticmethod
+    @functools.lru_cache(maxsize=_blockstate_cache_size)
+    def from_string_blockstate(blockstate: str) -> Block:
+        """
+        Create a Block from a blockstate string (IE: `minecraft:oak_log[axis=x]`)
+        Recently parsed strings are remembered so repeated strings return the same Block instance.
+        This is safe because Block objects are immutable.
+
+        :param blockstate: The blockstate string to parse
+        :return: A Block object
+        """
+        return Block(*Block.parse_blockstate_string(blockstate))
+
+    @staticmethod
+    def from_string_blockstates(blockstates: Iterable[str]) -> List[Block]:
+        """
+        Create a Block for each of a sequence of blockstate strings.
+        Each unique string is only parsed once.
+
+        :param blockstates: The blockstate strings to parse
+        :return: A list of Block objects in the same order as the strings
+        """
+        blockstates = list(blockstates)
+        blocks = {
+            blockstate: Block.from_string_blockstate(blockstate)
+            for blockstate in dict.fromkeys(blockstates)
+        }
+        return [blocks[blockstate] for blockstate in blockstates]
+
     def __str__(self) -> str:
         """
         :return: The base blockstate string of the Block object
@@ -255,10 +350,17 @@ class Block:
         :param other: The Block object to check against
         :return: True if the Blocks objects are equal, False otherwise
         """
+        if self is other:
+            # translated blocks are shared instances so this is the common case
+            return True
         if self.__class__ != other.__class__:
             return False
 
-        return self.blockstate == other.blockstate and self._compare_extra_blocks(other)
+        if self._hash != other._hash:
+            # different hashes means different blocks
+            return False
+
+        return self._blockstate == other._blockstate and self._extra_blocks == other._extra_blocks
 
     def __gt__(self, other: Block) -> bool:
         """
@@ -274,12 +376,7 @@ class Block:
 
         :return: A hash of the Block object
         """
-        current_hash = hash(self.blockstate)
-
-        if self.extra_blocks:
-            current_hash = current_hash + hash(self.extra_blocks)
-
-        return current_hash
+        return self._hash
 
     def __add__(self, other: Block) -> Block:
         """
@@ -374,6 +471,10 @@ class Block:
             extra_blocks=new_extras,
         )
 
+    def __reduce__(self):
+        # the hash of a string is different in each process so the hash must be recomputed rather than copied
+        return Block, (self._namespace, self._base_name, self._properties, self._extra_blocks)
+
     def __sizeof__(self):
         size = (
             getsizeof(self.namespace)
@@ -397,6 +498,10 @@ class BlockManager:
         """
         self._index_to_block: List[Block] = []
         self._block_to_index_map: Dict[Block, int] = {}
+        # a copy of _index_to_block as a numpy object array for the bulk methods.
+        # This is over allocated and the first _block_array_size entries are valid
+        self._block_array = numpy.empty(0, dtype=object)
+        self._block_array_size = 0
 
     def __len__(self):
         return len(self._index_to_block)
@@ -453,3 +558,65 @@ class BlockManager:
         self._index_to_block.append(block)
 
         return i
+
+    def get_add_blocks(self, blocks: Iterable[Block]) -> numpy.ndarray:
+        """
+        Adds a sequence of Block objects to the internal Block object/ID mappings.
+        Each unique Block is only looked up once.
+
+        :param blocks: The Blocks to add to the manager
+        :return: A numpy array of the internal ID of each Block
+        """
+        blocks = list(blocks)
+        block_to_index = {
+            block: self.get_add_block(block) for block in dict.fromkeys(blocks)
+        }
+        return numpy.fromiter(
+            (block_to_index[block] for block in blocks),
+            dtype=numpy.uint32,
+            count=len(blocks),
+        )
+
+    def _get_block_array(self) -> numpy.ndarray:
+        """The Blocks in this manager as a numpy object array. Blocks added since the last call are copied in."""
+        size = len(self._index_to_block)
+        if self._block_array_size < size:
+            if len(self._block_array) < size:
+                # double the capacity so that adding blocks between bulk calls does not copy the whole array each time
+                block_array = numpy.empty(max(size, 2 * len(self._block_array)), dtype=object)
+                block_array[: self._block_array_size] = self._block_array[: self._block_array_size]
+                self._block_array = block_array
+            for index in range(self._block_array_size, size):
+                self._block_array[index] = self._index_to_block[index]
+            self._block_array_size = size
+        return self._block_array[:size]
+
+    def blocks_for(self, indices: Union[Sequence[int], numpy.ndarray]) -> numpy.ndarray:
+        """
+        Get the Block object for each of an array of internal IDs.
+
+        :param indices: An array of internal IDs of any shape
+        :return: A numpy object array of Block objects of the same shape as indices
+        :raises KeyError: If any of the indices are not in the BlockManager
+        """
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        # negative indices would wrap around so check both ends rather than relying on numpy
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise KeyError(
+                f"There are indices in {indices} that are not in the BlockManager. "
+                f"You might want to use the `add_block` function for your blocks before accessing them."
+            )
+        return self._get_block_array()[indices]
+
+    def merge(self, other: BlockManager) -> numpy.ndarray:
+        """
+        Add all the Blocks from another BlockManager to this one.
+        The returned array converts internal IDs in the other manager to internal IDs in this manager.
+
+        >>> remap = block_manager.merge(chunk_block_manager)
+        >>> block_array = remap[chunk_block_array]
+
+        :param other: The BlockManager to add the Blocks from
+        :return: A numpy array where the value at each internal ID of the other manager is the internal ID in this manager
+        """
+        return self.get_add_blocks(other._index_to_block)
@@ -8,8 +8,24 @@ log.setLevel(logging.INFO)
 
 _formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-os.makedirs('./logs', exist_ok=True)
-_log_file = logging.FileHandler('./logs/pymctranslate.log', 'w')
+
+class _LazyFileHandler(logging.FileHandler):
+    """
+    A FileHandler that does not create the log directory or file until the first message is logged.
+    The version header is written as the first line of the file when it is created.
+    """
+    def __init__(self, filename: str, mode: str = 'a'):
+        super().__init__(filename, mode, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        stream = super()._open()
+        record = log.makeRecord(log.name, logging.INFO, __file__, 0, f'PyMCTranslate Version {build_number}', None, None)
+        stream.write(self.format(record) + self.terminator)
+        return stream
+
+
+_log_file = _LazyFileHandler('./logs/pymctranslate.log', 'w')
 if 'pymct-debug' in sys.argv:
     _log_file.setLevel(logging.DEBUG)
     log.setLevel(logging.DEBUG)
@@ -23,8 +39,6 @@ _log_console.setLevel(logging.WARNING)
 _log_console.setFormatter(_formatter)
 log.addHandler(_log_console)
 
-log.info(f'PyMCTranslate Version {build_number}')
-
 
 def enable_console_log(enable=True):
     if enable:
@@ -1,9 +1,15 @@
 import os
-from typing import Union, Tuple, List, Dict, TYPE_CHECKING
+from typing import Union, Tuple, List, Dict, Iterable, Callable, TYPE_CHECKING
+import amulet_nbt
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 from .registry import NumericalRegistry, UniversalBiomeRegistry
-from PyMCTranslate import minified
-from PyMCTranslate.py3.versions import Version
+from .translation_table import TranslationTable
+from .converter import BlockConverter
+from PyMCTranslate.py3.versions.cache import LRUCache
+from PyMCTranslate.py3.versions.translate import nbt_case_key
+from PyMCTranslate import Block, minified
+from PyMCTranslate.py3.versions import Version, load_meta, load_translator_database, _version_data, _translator_databases
 from PyMCTranslate.py3.util import directories
 
 if TYPE_CHECKING:
@@ -27,14 +33,38 @@ class TranslationManager:
     (ie a unique combination of platform and version number)
     """
 
-    def __init__(self, json_path: str):
+    def __init__(
+            self,
+            json_path: str,
+            lazy: bool = False,
+            preload: Iterable[Tuple[str, Union[int, Tuple[int, ...], List[int]]]] = None,
+            workers: int = None,
+            processes: bool = False,
+            cache_entries: int = None,
+            cache_bytes: int = None
+    ):
         """
         Call this class with the path to the mapping json files.
         Note if you are a developer using this library you can call PyMCTranslate.new_translation_manager()
         to get a new instance of this class with the default mappings set up for you.
 
         :param json_path: The path to the json directory
+        :param lazy: If True the translator databases are indexed when loaded and each block is only decoded when it is first used
+        :param preload: An iterable of (platform, version_number) for versions to load the translators for up front. The universal format is always included.
+        :param workers: The number of workers to load the version data with. None or 1 to load it on the calling thread.
+            Decoding the json holds the GIL so threads only overlap the file reads. With the compiled databases loading is
+            mostly decoding so threads are no faster than loading on the calling thread.
+        :param processes: If True the workers are processes rather than threads. This can only help with more than one core
+            and when the json files are decoded because the results have to be pickled back to this process.
+            Lazy and minified databases are always loaded in threads. Lazy databases can not be sent between processes
+            and each process would have to load its own copy of the minified json atlas.
+        :param cache_entries: The maximum number of entries in each translation cache or None for no limit
+        :param cache_bytes: The maximum estimated size in bytes of each translation cache or None for no limit
         """
+        self._lazy = lazy
+        self._cache_entries = cache_entries
+        self._cache_bytes = cache_bytes
+        self._caches: List[LRUCache] = []
         # Storage for each of the Version classes
         self._versions: Dict[str, Dict[Tuple[int, int, int], 'Version']] = {}
         # if a Version class for a specific version number does not exist the neareast will be found and stored here
@@ -50,6 +80,9 @@ class TranslationManager:
         self._universal_biome_registry = UniversalBiomeRegistry()
         self._block_registry = NumericalRegistry()
         self._universal_format = None
+        self._converters: Dict[Tuple[int, int, bool, bool], BlockConverter] = {}
+        # the Block instances output by the translators keyed by namespace, base_name and properties
+        self._blocks = self.new_cache()
 
         # Create a class for each of the versions and store them
         if minified:
@@ -57,19 +90,103 @@ class TranslationManager:
         else:
             init_file = '__init__.json'
 
-        for version_name in directories(os.path.join(json_path, 'versions')):
-            if os.path.isfile(os.path.join(json_path, 'versions', version_name, init_file)):
-                version = Version(os.path.join(json_path, 'versions', version_name), self)
+        version_paths = [
+            os.path.join(json_path, 'versions', version_name) for version_name in directories(os.path.join(json_path, 'versions'))
+            if os.path.isfile(os.path.join(json_path, 'versions', version_name, init_file))
+        ]
+
+        if workers is not None and workers > 1:
+            if processes and not lazy and not minified:
+                executor = ProcessPoolExecutor(workers)
+            else:
+                executor = ThreadPoolExecutor(workers)
+            map_function = executor.map
+        else:
+            executor = None
+            map_function = map
+
+        try:
+            # load the meta files that are not already loaded
+            unloaded_paths = [version_path for version_path in version_paths if version_path not in _version_data]
+            for version_path, meta in zip(unloaded_paths, map_function(load_meta, unloaded_paths)):
+                _version_data.setdefault(version_path, {"meta": meta})
+
+            for version_path in version_paths:
+                version = Version(version_path, self)
                 self._versions.setdefault(version.platform, {})
                 self._versions[version.platform].setdefault(version.version_number, version)
                 self._version_remap[(version.platform, version.data_version)] = version.version_number
-                if version_name == 'universal':
+                if os.path.basename(version_path) == 'universal':
                     self._universal_format = version
 
+            if preload is not None:
+                self._preload(preload, map_function)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _preload(self, preload: Iterable[Tuple[str, Union[int, Tuple[int, ...], List[int]]]], map_function: Callable):
+        """Load the translators for the given versions using map_function to load the databases."""
+        versions = [self.get_version(platform, version_number) for platform, version_number in preload]
+        if self._universal_format is not None:
+            versions.append(self._universal_format)
+        versions = list({id(version): version for version in versions}.values())
+        translators = [
+            (version, attr) for version in versions for attr in ('block', 'entity')
+            if (version.version_path, attr, self._lazy) not in _translator_databases
+        ]
+        databases = map_function(
+            load_translator_database,
+            [version.version_path for version, _ in translators],
+            [attr for _, attr in translators],
+            [self._lazy] * len(translators)
+        )
+        for (version, attr), database in zip(translators, databases):
+            version._load_translator(attr, database)
+        for version in versions:
+            version._load_translator('block')
+            version._load_translator('entity')
+
     @property
     def universal_format(self) -> Version:
         return self._universal_format
 
+    @property
+    def lazy(self) -> bool:
+        """Are the translator databases loaded lazily"""
+        return self._lazy
+
+    def new_cache(self) -> LRUCache:
+        """
+        Create a translation cache with the limits this manager was created with.
+        The cache will be cleared by TranslationManager.clear_cache.
+        """
+        cache = LRUCache(self._cache_entries, self._cache_bytes)
+        self._caches.append(cache)
+        return cache
+
+    def intern_block(self, namespace: str, base_name: str, properties: Dict[str, amulet_nbt.BaseValueType]) -> Block:
+        """
+        Get the shared Block instance for a blockstate.
+        The translators create their output blocks with this so equal outputs are the same object.
+        This saves memory and makes comparing and hashing the outputs cheaper.
+        :param namespace: The namespace of the block
+        :param base_name: The base name of the block
+        :param properties: The properties of the block. This is stored in the Block if one is created so must not be modified after
+        :return: The shared Block instance
+        """
+        # the property order is part of the key so the shared Block has the order the calling version gives
+        key = (namespace, base_name, tuple((name, nbt_case_key(val)) for name, val in properties.items()))
+        block = self._blocks.get(key)
+        if block is None:
+            block = self._blocks[key] = Block(namespace, base_name, properties)
+        return block
+
+    def clear_cache(self):
+        """Remove all cached translations from this manager's translators and converters."""
+        for cache in self._caches:
+            cache.clear()
+
     @property
     def biome_registry(self) -> NumericalRegistry:
         """Use this to register custom biomes"""
@@ -115,6 +232,63 @@ class TranslationManager:
             version_number = self._get_version_number(platform, version_number)
         return self._versions[platform][version_number]
 
+    def build_translation_table(
+            self,
+            source: 'Version',
+            target: 'Version',
+            source_force_blockstate: bool = False,
+            target_force_blockstate: bool = False
+    ) -> TranslationTable:
+        """
+        Build a direct lookup table from every blockstate in the source version to the target version.
+        The table only contains blocks that translate without a block entity or data from the world.
+        Save it with TranslationTable.save and load it again with TranslationManager.load_translation_table.
+        :param source: The version to translate from (use TranslationManager.get_version)
+        :param target: The version to translate to (use TranslationManager.get_version)
+        :param source_force_blockstate: True to use the blockstate format of the source version. False to use the native format
+        :param target_force_blockstate: True to use the blockstate format of the target version. False to use the native format
+        :return: A new TranslationTable
+        """
+        return TranslationTable.build(source, target, source_force_blockstate, target_force_blockstate)
+
+    def converter(
+            self,
+            source: 'Version',
+            target: 'Version',
+            source_force_blockstate: bool = False,
+            target_force_blockstate: bool = False,
+            table: TranslationTable = None
+    ) -> BlockConverter:
+        """
+        Get an object to translate blocks directly from one version to another.
+        The same converter is returned for the same inputs so that its cache is shared.
+        :param source: The version to translate from (use TranslationManager.get_version)
+        :param target: The version to translate to (use TranslationManager.get_version)
+        :param source_force_blockstate: True to use the blockstate format of the source version. False to use the native format
+        :param target_force_blockstate: True to use the blockstate format of the target version. False to use the native format
+        :param table: An optional TranslationTable for the same versions to fill the cache from
+        :return: The BlockConverter for the given inputs
+        """
+        key = (id(source), id(target), source_force_blockstate, target_force_blockstate)
+        if key not in self._converters:
+            self._converters[key] = BlockConverter(source, target, source_force_blockstate, target_force_blockstate, self.new_cache())
+        converter = self._converters[key]
+        if table is not None:
+            converter.update(table)
+        return converter
+
+    def load_translation_table(self, path: str) -> TranslationTable:
+        """
+        Load a table saved with TranslationTable.save.
+        Throws an exception if the table was built with a different build of PyMCTranslate or the versions are not present.
+        :param path: The path of the file to load
+        :return: The TranslationTable stored in the file
+        """
+        table = TranslationTable.load(path)
+        for platform, version_number, _ in (table.source, table.target):
+            assert platform in self._versions and version_number in self._versions[platform], f'Version({platform}, {version_number}) in the translation table is not present'
+        return table
+
     def _get_version_number(self, platform: str, version_number: Union[int, Tuple[int, ...]]) -> Tuple[int, int, int]:
         if (platform, version_number) not in self._version_remap:
             if isinstance(version_number, int):
@@ -0,0 +1,116 @@
+from typing import Tuple, Union, Callable, TYPE_CHECKING
+
+from PyMCTranslate import Block, BlockEntity, Entity
+from PyMCTranslate.py3.versions.cache import LRUCache
+
+if TYPE_CHECKING:
+    from PyMCTranslate.py3.versions import Version
+    from .translation_table import TranslationTable
+
+
+class BlockConverter:
+    """
+    Translates blocks directly from one version to another.
+    The results are cached against the source block so a repeated block is a single dictionary lookup
+    rather than a lookup in each translator and an intermediate universal block.
+    Use TranslationManager.converter to get an instance.
+    """
+    def __init__(
+            self,
+            source: 'Version',
+            target: 'Version',
+            source_force_blockstate: bool = False,
+            target_force_blockstate: bool = False,
+            cache: LRUCache = None
+    ):
+        """
+        :param source: The version to translate from
+        :param target: The version to translate to
+        :param source_force_blockstate: True to use the blockstate format of the source version. False to use the native format
+        :param target_force_blockstate: True to use the blockstate format of the target version. False to use the native format
+        :param cache: The cache to store the results in. Defaults to an unbounded cache
+        """
+        self._source = source
+        self._target = target
+        self._source_force_blockstate = source_force_blockstate
+        self._target_force_blockstate = target_force_blockstate
+        # only blocks without a block entity can be cached
+        self._cache = LRUCache() if cache is None else cache
+
+    @property
+    def source(self) -> 'Version':
+        """The version blocks are translated from"""
+        return self._source
+
+    @property
+    def target(self) -> 'Version':
+        """The version blocks are translated to"""
+        return self._target
+
+    def update(self, table: 'TranslationTable'):
+        """
+        Add the entries from a translation table to the cache.
+        :param table: A TranslationTable built for the same source and target versions and formats
+        """
+        assert table.source == (self._source.platform, self._source.version_number, self._source_force_blockstate), 'The table source does not match the converter source'
+        assert table.target == (self._target.platform, self._target.version_number, self._target_force_blockstate), 'The table target does not match the converter target'
+        for block, output in table.items():
+            self._cache[block] = output, None, False
+
+    def convert(
+            self,
+            object_input: Block,
+            get_block_callback: Callable[[Tuple[int, int, int]], Tuple[Block, Union[None, BlockEntity]]] = None,
+            extra_input: BlockEntity = None
+    ) -> Union[
+        Tuple[Block, None, bool],
+        Tuple[Block, BlockEntity, bool],
+        Tuple[Entity, None, bool]
+    ]:
+        """
+        Translate a block from the source version to the target version.
+        :param object_input: The block in the source version
+        :param get_block_callback: see get_block_at function at the top of translate for a template. This should return blocks in the source version
+        :param extra_input: secondary to the object_input a block entity can be given. This should only be used in the select block tool or plugins. Not compatible with location
+        :return: output, extra_output, extra_needed
+            output - a Block or Entity instance
+            extra_output - None or BlockEntity if there is a BlockEntity to return (only if output is Block)
+            extra_needed - bool specifying if the location is needed to fully define the output
+        """
+        if extra_input is None:
+            result = self._cache.get(object_input)
+            if result is not None:
+                return result
+        else:
+            assert isinstance(extra_input, BlockEntity), 'extra_input must be None or a BlockEntity'
+        assert isinstance(object_input, Block), 'Input object must be a block'
+
+        universal, universal_extra, extra_needed_to, cacheable_to = self._source.block._translate_to_universal(
+            object_input,
+            get_block_callback,
+            self._source_force_blockstate,
+            extra_input
+        )
+
+        if get_block_callback is None:
+            universal_callback = None
+        else:
+            def universal_callback(location: Tuple[int, int, int]) -> Tuple[Block, Union[None, BlockEntity]]:
+                block, block_entity = get_block_callback(location)
+                block, block_entity, _ = self._source.block.to_universal(block, None, self._source_force_blockstate, block_entity)
+                return block, block_entity
+
+        if isinstance(universal, Block):
+            output, extra_output, extra_needed_from, cacheable_from = self._target.block._translate_from_universal(
+                universal,
+                universal_callback,
+                self._target_force_blockstate,
+                universal_extra
+            )
+        else:
+            output, extra_output, extra_needed_from, cacheable_from = universal, universal_extra, False, False
+
+        result = output, extra_output, extra_needed_to or extra_needed_from
+        if extra_input is None and cacheable_to and cacheable_from:
+            self._cache[object_input] = result
+        return result
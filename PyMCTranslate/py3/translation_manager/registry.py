@@ -1,15 +1,30 @@
-from typing import Dict
+from typing import Dict, List, Callable
 
 
 class BaseNumericalRegistry:
     def __init__(self):
         self._to_str: Dict[int, str] = {}
         self._to_int: Dict[str, int] = {}
+        # functions called with (key, value) when an entry is registered
+        self._listeners: List[Callable[[str, int], None]] = []
 
     def register(self, key: str, value: int):
         assert isinstance(key, str) and isinstance(value, int), 'key must be a string and value must be an int'
         self._to_str[value] = key
         self._to_int[key] = value
+        self._on_register(key, value)
+
+    def add_listener(self, listener: Callable[[str, int], None]):
+        """
+        Add a function to be called when an entry is registered.
+        This can be used to invalidate data derived from the registry.
+        :param listener: A function taking the key and value that were registered
+        """
+        self._listeners.append(listener)
+
+    def _on_register(self, key: str, value: int):
+        for listener in self._listeners:
+            listener(key, value)
 
     def __contains__(self, item):
         if isinstance(item, int):
@@ -45,6 +60,7 @@ class UniversalBiomeRegistry(BaseNumericalRegistry):
         assert isinstance(key, str) and isinstance(value, int), 'key must be a string and value must be an int'
         self._to_str[value] = key
         self._to_int[key] = value
+        self._on_register(key, value)
 
     def to_str(self, value: int, default=None):
         return self._to_str.get(value, default)
@@ -0,0 +1,172 @@
+import itertools
+import gzip
+import json
+from typing import Dict, Tuple, Generator, Union, ItemsView, TYPE_CHECKING
+
+import amulet_nbt
+from PyMCTranslate import Block, build_number
+
+if TYPE_CHECKING:
+    from PyMCTranslate.py3.versions import Version
+
+"""
+Translation table file format
+    gzip compressed json
+    {
+        "build_number": int,  # the build number of PyMCTranslate the table was built with
+        "source": [platform, version_number, force_blockstate],
+        "target": [platform, version_number, force_blockstate],
+        "blocks": [[namespace, base_name, {property_name: SNBT}], ...],  # every unique block in the table
+        "table": [source_index, target_index, ...]  # pairs of indexes into blocks
+    }
+"""
+
+_VersionKey = Tuple[str, Tuple[int, int, int], bool]
+
+
+def blockstates(specification: dict, namespace: str, base_name: str) -> Generator[Block, None, None]:
+    """
+    Every blockstate that a specification allows.
+    :param specification: The specification for the block
+    :param namespace: The namespace of the block
+    :param base_name: The base name of the block
+    :return: A generator of Block objects
+    """
+    properties = specification.get('properties', {})
+    if properties:
+        keys, values = zip(*properties.items())
+    else:
+        keys, values = (), ()
+    values = tuple([amulet_nbt.from_snbt(val) for val in prop] for prop in values)
+
+    for spec_ in itertools.product(*values):
+        yield Block(namespace=namespace, base_name=base_name, properties=dict(zip(keys, spec_)))
+
+
+class TranslationTable:
+    """
+    A direct lookup table from blocks in one version to blocks in another version.
+    Only blocks that fully translate without a block entity or data from the world are in the table.
+    Other blocks need to be translated through the universal format as normal.
+    """
+    def __init__(self, source: _VersionKey, target: _VersionKey, table: Dict[Block, Block]):
+        """
+        Use TranslationTable.build or TranslationTable.load to create an instance.
+        :param source: (platform, version_number, force_blockstate) of the source version
+        :param target: (platform, version_number, force_blockstate) of the target version
+        :param table: A dictionary mapping source blocks to target blocks
+        """
+        self._source = source
+        self._target = target
+        self._table = table
+
+    @property
+    def source(self) -> _VersionKey:
+        """(platform, version_number, force_blockstate) of the source version"""
+        return self._source
+
+    @property
+    def target(self) -> _VersionKey:
+        """(platform, version_number, force_blockstate) of the target version"""
+        return self._target
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __contains__(self, block: Block) -> bool:
+        return block in self._table
+
+    def __getitem__(self, block: Block) -> Block:
+        return self._table[block]
+
+    def get(self, block: Block, default=None) -> Union[Block, None]:
+        """
+        Get the target block for a source block.
+        :param block: The block in the source version
+        :param default: The value to return if the block is not in the table
+        :return: The block in the target version or default if it is not in the table
+        """
+        return self._table.get(block, default)
+
+    def items(self) -> ItemsView[Block, Block]:
+        """The (source block, target block) pairs in the table"""
+        return self._table.items()
+
+    @classmethod
+    def build(cls, source: 'Version', target: 'Version', source_force_blockstate: bool = False, target_force_blockstate: bool = False) -> 'TranslationTable':
+        """
+        Build a table by translating every blockstate defined in the source version's specifications to the target version.
+        :param source: The version to translate from
+        :param target: The version to translate to
+        :param source_force_blockstate: True to use the blockstate format of the source version. False to use the native format
+        :param target_force_blockstate: True to use the blockstate format of the target version. False to use the native format
+        :return: A new TranslationTable
+        """
+        source_block = source.block
+        target_block = target.block
+        table = {}
+        for namespace in source_block.namespaces(source_force_blockstate):
+            for base_name in source_block.base_names(namespace, source_force_blockstate):
+                specification = source_block._get_specification(namespace, base_name, source_force_blockstate)
+                for block in blockstates(specification, namespace, base_name):
+                    universal, extra_output, extra_needed, cacheable = source_block._translate_to_universal(block, None, source_force_blockstate, None)
+                    if not cacheable or extra_needed or extra_output is not None or not isinstance(universal, Block):
+                        continue
+                    output, extra_output, extra_needed, cacheable = target_block._translate_from_universal(universal, None, target_force_blockstate, None)
+                    if not cacheable or extra_needed or extra_output is not None or not isinstance(output, Block):
+                        continue
+                    table[block] = output
+
+        return cls(
+            (source.platform, source.version_number, source_force_blockstate),
+            (target.platform, target.version_number, target_force_blockstate),
+            table
+        )
+
+    def save(self, path: str):
+        """
+        Save the table to disk.
+        :param path: The path of the file to write
+        """
+        blocks = []
+        block_indexes: Dict[str, int] = {}
+        table = []
+        for block_pair in self._table.items():
+            for block in block_pair:
+                if block.blockstate not in block_indexes:
+                    block_indexes[block.blockstate] = len(blocks)
+                    blocks.append([block.namespace, block.base_name, {key: val.to_snbt() for key, val in block.properties.items()}])
+                table.append(block_indexes[block.blockstate])
+
+        with gzip.open(path, 'wb') as f:
+            f.write(json.dumps({
+                'build_number': build_number,
+                'source': self._source,
+                'target': self._target,
+                'blocks': blocks,
+                'table': table
+            }, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def load(cls, path: str) -> 'TranslationTable':
+        """
+        Load a table that was saved with TranslationTable.save.
+        Raises an exception if the table was built by a different build of PyMCTranslate.
+        :param path: The path of the file to read
+        :return: The TranslationTable stored in the file
+        """
+        with gzip.open(path, 'rb') as f:
+            data = json.loads(f.read().decode('utf-8'))
+        if data['build_number'] != build_number:
+            raise Exception(f'The translation table {path} was built with PyMCTranslate build {data["build_number"]} but this is build {build_number}. It must be rebuilt.')
+        blocks = [
+            Block(namespace, base_name, {key: amulet_nbt.from_snbt(val) for key, val in properties.items()})
+            for namespace, base_name, properties in data['blocks']
+        ]
+        table_data = data['table']
+        table = {blocks[table_data[index]]: blocks[table_data[index + 1]] for index in range(0, len(table_data), 2)}
+        platform, version_number, force_blockstate = data['source']
+        source = (platform, tuple(version_number), force_blockstate)
+        platform, version_number, force_blockstate = data['target']
+        target = (platform, tuple(version_number), force_blockstate)
+        return cls(source, target, table)
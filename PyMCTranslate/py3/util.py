@@ -27,3 +27,52 @@ def files(path: str) -> Generator[str, None, None]:
 def load_json_gz(file_path: str):
     with gzip.open(file_path, 'rb') as f:
         return json.loads(f.read().decode('utf-8'))
+
+
+class FrozenDict(dict):
+    """
+    A dictionary that cannot be modified after it is created.
+    This is a subclass of dict so it can be read exactly like the dictionaries loaded from json.
+    """
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f'{self.__class__.__name__} is immutable')
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+
+def freeze(data):
+    """
+    Convert json data into an immutable version.
+    Dictionaries become FrozenDict and lists become tuples. Other values are returned as they are.
+    :param data: The json data to freeze
+    :return: The frozen data
+    """
+    if isinstance(data, dict):
+        if isinstance(data, FrozenDict):
+            return data
+        return FrozenDict((key, freeze(val)) for key, val in data.items())
+    elif isinstance(data, (list, tuple)):
+        return tuple([freeze(val) for val in data])
+    return data
+
+
+def thaw(data):
+    """
+    Convert data frozen with freeze back into a mutable copy.
+    :param data: The frozen data
+    :return: A deep copy of the data using dictionaries and lists
+    """
+    if isinstance(data, dict):
+        return {key: thaw(val) for key, val in data.items()}
+    elif isinstance(data, (list, tuple)):
+        return [thaw(val) for val in data]
+    return data
@@ -1,18 +1,26 @@
 import json
 import os
+import threading
 from typing import Union, Tuple, Dict, TYPE_CHECKING
-import glob
 
+import numpy
 import amulet_nbt
-from PyMCTranslate import Block, minified, json_atlas, load_json_gz, log
+from PyMCTranslate import Block, minified, get_json_atlas, load_json_gz, log
 from PyMCTranslate.py3.versions.translate import translate
 from ..versions.translation_database import BlockTranslator, EntityTranslator, ItemTranslator
 from .biomes import BiomeTranslator
+from .compiled_database import load_database, LazyBaseNames
+from PyMCTranslate.py3.util import FrozenDict, freeze
 
 if TYPE_CHECKING:
     from PyMCTranslate.py3.translation_manager import TranslationManager
+    from PyMCTranslate.py3.amulet_objects.block import BlockManager
 
 _version_data = {}
+# The translator databases are read only so they are shared between all TranslationManager instances
+_translator_databases: Dict[Tuple[str, str, bool], dict] = {}
+_translator_database_locks: Dict[Tuple[str, str, bool], threading.Lock] = {}
+_translator_database_lock = threading.Lock()
 
 _translator_classes = {
     'block': BlockTranslator,
@@ -21,6 +29,89 @@ _translator_classes = {
 }
 
 
+def load_meta(version_path: str) -> dict:
+    """
+    Load the meta files for a version.
+    This is a module level function so that it can be run in a worker thread or process.
+    :param version_path: The path to the version directory
+    :return: A dictionary mapping the meta file name to its data
+    """
+    if minified:
+        json_atlas = get_json_atlas()
+        return {
+            key: json_atlas[value] for key, value in load_json_gz(os.path.join(version_path, 'meta.json.gz')).items()
+        }
+    else:
+        meta = {}
+        for file_name in ['__init__', '__waterloggable__', '__always_waterlogged__', '__biome_data__', '__block_entity_map__', '__numerical_block_map__']:
+            if os.path.isfile(os.path.join(version_path, f'{file_name}.json')):
+                with open(os.path.join(version_path, f'{file_name}.json')) as f:
+                    meta[file_name] = json.load(f)
+        return meta
+
+
+def _atlas_entry(index: int):
+    """Get an entry from the json atlas. The entries are frozen in place the first time they are used."""
+    json_atlas = get_json_atlas()
+    entry = json_atlas[index]
+    if not isinstance(entry, (FrozenDict, tuple)):
+        entry = json_atlas[index] = freeze(entry)
+    return entry
+
+
+def load_translator_database(version_path: str, attr: str, lazy: bool = False) -> dict:
+    """
+    Load the database for a translator in a version.
+    This is a module level function so that it can be run in a worker thread or process.
+    :param version_path: The path to the version directory
+    :param attr: The translator name (eg 'block')
+    :param lazy: If True each entry in the database is only decoded when it is first requested
+    :return: The nested database dictionary
+    """
+    if minified:
+        fpath = os.path.join(version_path, f'{attr}.json.gz')
+        if os.path.isfile(fpath):
+            # the minified database holds the index of each entry in the json atlas
+            return {
+                block_format: {
+                    operation: {
+                        namespace: LazyBaseNames(base_names, _atlas_entry) if lazy else {
+                            base_name: _atlas_entry(index) for base_name, index in base_names.items()
+                        } for namespace, base_names in namespaces.items()
+                    } for operation, namespaces in operations.items()
+                } for block_format, operations in load_json_gz(fpath).items()
+            }
+        else:
+            log.critical(f'Could not find {attr} database')
+            return {}
+    else:
+        return load_database(version_path, attr, lazy)
+
+
+def get_translator_database(version_path: str, attr: str, lazy: bool = False, database: dict = None) -> dict:
+    """
+    Get the database for a translator in a version from the process wide cache.
+    If it has not been loaded it will be loaded and stored so that all TranslationManager instances share one copy.
+    :param version_path: The path to the version directory
+    :param attr: The translator name (eg 'block')
+    :param lazy: If True each entry in the database is only decoded when it is first requested
+    :param database: A database that has already been loaded to store if one is not already stored
+    :return: The nested database dictionary
+    """
+    if lazy and (version_path, attr, False) in _translator_databases:
+        # the fully loaded database can serve lazy requests too
+        return _translator_databases[(version_path, attr, False)]
+    key = (version_path, attr, lazy)
+    with _translator_database_lock:
+        lock = _translator_database_locks.setdefault(key, threading.Lock())
+    with lock:
+        if key not in _translator_databases:
+            if database is None:
+                database = load_translator_database(version_path, attr, lazy)
+            _translator_databases[key] = database
+        return _translator_databases[key]
+
+
 class Version:
     """
     Container for the version data.
@@ -34,18 +125,7 @@ class Version:
         self._item = None
 
         if version_path not in _version_data:
-            _version_data[version_path] = {}
-            if minified:
-                # load meta.json.gz and store in _version_data[version_path]["meta"]
-                _version_data[version_path]["meta"] = {
-                    key: json_atlas[value] for key, value in load_json_gz(os.path.join(version_path, 'meta.json.gz')).items()
-                }
-            else:
-                _version_data[version_path]["meta"] = meta = {}
-                for file_name in ['__init__', '__waterloggable__', '__always_waterlogged__', '__biome_data__', '__block_entity_map__', '__numerical_block_map__']:
-                    if os.path.isfile(os.path.join(version_path, f'{file_name}.json')):
-                        with open(os.path.join(version_path, f'{file_name}.json')) as f:
-                            meta[file_name] = json.load(f)
+            _version_data[version_path] = {"meta": load_meta(version_path)}
 
         meta = _version_data[version_path]["meta"]
         # unpack the __init__.json file
@@ -77,6 +157,11 @@ class Version:
             self._always_waterlogged = None
         self._biome = BiomeTranslator(meta['__biome_data__'], translation_manager)
 
+        # lookup tables for the array methods. These are cleared when a block is registered
+        self._ints_to_block_lut: Dict[Tuple[int, int], 'Block'] = {}
+        self._block_to_ints_lut: Dict['Block', Tuple[int, int]] = {}
+        translation_manager.block_registry.add_listener(self._on_block_registered)
+
         if init_file['block_entity_format'] == "str-id":
             self.block_entity_map: Dict[str: str] = meta['__block_entity_map__']
             self.block_entity_map_inverse: Dict[str: str] = {val: key for key, val in self.block_entity_map.items()}
@@ -84,31 +169,27 @@ class Version:
             self.block_entity_map = None
             self.block_entity_map_inverse = None
 
-    def _load_translator(self, attr):
+    @property
+    def translation_manager(self) -> 'TranslationManager':
+        """The TranslationManager this version belongs to"""
+        return self._translation_manager
+
+    @property
+    def version_path(self) -> str:
+        """The path to the directory the data for this version is stored in"""
+        return self._version_path
+
+    def _load_translator(self, attr, database: dict = None):
         """
         Internal method to load the data related to this class.
         This allows loading to be deferred until it is needed (if at all)
+        :param attr: The translator name (eg 'block')
+        :param database: The database for the translator if it has already been loaded
         """
         if attr not in _translator_classes:
             raise Exception(f'Unknown translator {attr}')
         if getattr(self, f'_{attr}') is None:
-            if minified:
-                fpath = os.path.join(self._version_path, f'{attr}.json.gz')
-                if os.path.isfile(fpath):
-                    database = load_json_gz(fpath)
-                else:
-                    log.critical(f'Could not find {attr} database')
-                    database = {}
-            else:
-                database = {}
-                for fpath in glob.iglob(os.path.join(self._version_path, attr, '**', '*.json'), recursive=True):
-                    database_ = database
-                    rel_path = os.path.relpath(fpath, os.path.join(self._version_path, attr)).split(os.sep)
-                    assert len(rel_path) == 5
-                    for directory in rel_path[:-2]:
-                        database_ = database_.setdefault(directory, {})
-                    with open(fpath) as f:
-                        database_[rel_path[-1][:-5]] = json.load(f)
+            database = get_translator_database(self._version_path, attr, self._translation_manager.lazy, database)
             setattr(self, f'_{attr}', _translator_classes[attr](self, self._translation_manager.universal_format, database))
 
     def __repr__(self):
@@ -219,3 +300,70 @@ class Version:
 
         if block_id is not None and block_data is not None:
             return block_id, block_data
+
+    def _on_block_registered(self, key: str, value: int):
+        self._ints_to_block_lut.clear()
+        self._block_to_ints_lut.clear()
+
+    def ints_to_indices(
+            self,
+            block_ids: numpy.ndarray,
+            block_datas: numpy.ndarray,
+            block_manager: 'BlockManager'
+    ) -> numpy.ndarray:
+        """
+        The array version of ints_to_block.
+        Convert arrays of block ids and block data to indices in a BlockManager.
+        Each unique (block_id, block_data) pair is only converted once and the Block is remembered for future calls.
+        :param block_ids: A numpy array of block ids
+        :param block_datas: A numpy array of block data values the same shape as block_ids
+        :param block_manager: The BlockManager to add the Blocks to
+        :return: A numpy array of indices in block_manager the same shape as block_ids
+        """
+        block_ids = numpy.asarray(block_ids)
+        block_datas = numpy.asarray(block_datas)
+        assert block_ids.shape == block_datas.shape, 'block_ids and block_datas must be the same shape'
+        assert numpy.issubdtype(block_ids.dtype, numpy.integer) and numpy.issubdtype(block_datas.dtype, numpy.integer), 'block_ids and block_datas must be integer arrays'
+        # combine the pairs into one int so that numpy.unique can be used
+        keys = (block_ids.astype(numpy.int64) << 32) | (block_datas.astype(numpy.int64) & 0xFFFFFFFF)
+        unique_keys, inverse = numpy.unique(keys, return_inverse=True)
+
+        lut = self._ints_to_block_lut
+        blocks = []
+        for key in unique_keys.tolist():
+            block_id, block_data = key >> 32, key & 0xFFFFFFFF
+            if block_data >= 0x80000000:
+                block_data -= 0x100000000
+            block = lut.get((block_id, block_data))
+            if block is None:
+                block = lut[(block_id, block_data)] = self.ints_to_block(block_id, block_data)
+            blocks.append(block)
+
+        return block_manager.get_add_blocks(blocks)[inverse].reshape(block_ids.shape)
+
+    def indices_to_ints(
+            self,
+            indices: numpy.ndarray,
+            block_manager: 'BlockManager'
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        The array version of block_to_ints.
+        Convert an array of indices in a BlockManager to arrays of block ids and block data.
+        Each unique index is only converted once and the result is remembered for future calls.
+        :param indices: A numpy array of indices in block_manager
+        :param block_manager: The BlockManager the indices refer to
+        :return: numpy int32 arrays of block ids and block data the same shape as indices. Both are -1 where the Block has no numerical form
+        """
+        indices = numpy.asarray(indices)
+        unique_indices, inverse = numpy.unique(indices, return_inverse=True)
+
+        lut = self._block_to_ints_lut
+        ints = numpy.empty((len(unique_indices), 2), dtype=numpy.int32)
+        for index, block in enumerate(block_manager.blocks_for(unique_indices)):
+            block_ints = lut.get(block)
+            if block_ints is None:
+                block_ints = lut[block] = self.block_to_ints(block) or (-1, -1)
+            ints[index] = block_ints
+
+        ints = ints[inverse.reshape(-1)]
+        return ints[:, 0].reshape(indices.shape), ints[:, 1].reshape(indices.shape)
@@ -0,0 +1,112 @@
+import sys
+from collections import OrderedDict
+from typing import Any, Union, Callable
+
+
+def sizeof(obj: Any) -> int:
+    """
+    An estimate of the memory used by a cache key or value in bytes.
+    Tuples are measured as the tuple plus each item. Other objects use sys.getsizeof (eg Block.__sizeof__)
+    """
+    if isinstance(obj, tuple):
+        return sys.getsizeof(obj) + sum(sys.getsizeof(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class LRUCache:
+    """
+    A dictionary like cache that can be limited to a number of entries or an estimated number of bytes.
+    When a limit is exceeded the least recently used entries are removed.
+    Use None for either limit for no limit.
+    """
+    def __init__(self, max_entries: int = None, max_bytes: int = None, size_function: Callable[[Any], int] = sizeof):
+        """
+        :param max_entries: The maximum number of entries to store or None for no limit
+        :param max_bytes: The maximum estimated size of the keys and values in bytes or None for no limit
+        :param size_function: A function to estimate the size of a key or value in bytes
+        """
+        assert max_entries is None or max_entries > 0, 'max_entries must be None or a positive int'
+        assert max_bytes is None or max_bytes > 0, 'max_bytes must be None or a positive int'
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size_function = size_function
+        self._bounded = max_entries is not None or max_bytes is not None
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+
+    @property
+    def max_entries(self) -> Union[int, None]:
+        """The maximum number of entries or None for no limit"""
+        return self._max_entries
+
+    @property
+    def max_bytes(self) -> Union[int, None]:
+        """The maximum estimated size in bytes or None for no limit"""
+        return self._max_bytes
+
+    @property
+    def nbytes(self) -> int:
+        """The estimated size of the keys and values in the cache in bytes. This is only tracked if max_bytes is set"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if self._bounded:
+            self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        """Get the value for key and mark it as recently used. Returns default if it is not in the cache."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        data = self._data
+        if self._max_bytes is not None:
+            if key in self._sizes:
+                self._bytes -= self._sizes[key]
+            size = self._size_function(key) + self._size_function(value)
+            self._sizes[key] = size
+            self._bytes += size
+        data[key] = value
+        if self._bounded:
+            data.move_to_end(key)
+            if self._max_entries is not None:
+                while len(data) > self._max_entries:
+                    self._pop_oldest()
+            if self._max_bytes is not None:
+                while self._bytes > self._max_bytes and len(data) > 1:
+                    self._pop_oldest()
+
+    def resize(self, key, nbytes: int):
+        """
+        Change the estimated size of an entry.
+        Use this when a value in the cache is modified in place so that the size measured when it was added is out of date.
+        :param key: The key of the entry that was modified. Nothing is done if it is not in the cache
+        :param nbytes: The number of bytes added to the entry. Negative if the entry got smaller
+        """
+        if self._max_bytes is not None and key in self._sizes:
+            self._sizes[key] += nbytes
+            self._bytes += nbytes
+            while self._bytes > self._max_bytes and len(self._data) > 1:
+                self._pop_oldest()
+
+    def _pop_oldest(self):
+        key, _ = self._data.popitem(last=False)
+        if key in self._sizes:
+            self._bytes -= self._sizes.pop(key)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        self._data.clear()
+        self._sizes.clear()
+        self._bytes = 0
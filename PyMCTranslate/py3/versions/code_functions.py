@@ -1,24 +1,43 @@
 import glob
 import os
+import threading
 import importlib.util
+from typing import Dict, Callable, Union
 
-code_functions = {}
+# the code function modules are only found and loaded when they are first run
+code_functions: Dict[str, Callable] = {}
+_code_function_paths: Union[Dict[str, str], None] = None
+_lock = threading.Lock()
 
 
-for code_file in glob.iglob(os.path.join(os.path.dirname(__file__), '..', '..', 'code_functions', '**', '*.py'), recursive=True):
-    code_function_name = os.path.splitext(os.path.basename(code_file))[0]
+def _find_code_functions() -> Dict[str, str]:
+    code_function_paths = {}
+    for code_file in glob.iglob(os.path.join(os.path.dirname(__file__), '..', '..', 'code_functions', '**', '*.py'), recursive=True):
+        code_function_name = os.path.splitext(os.path.basename(code_file))[0]
+        code_function_paths[code_function_name] = code_file
+    return code_function_paths
+
+
+def _load_code_function(function_name: str):
+    global _code_function_paths
+    if _code_function_paths is None:
+        _code_function_paths = _find_code_functions()
+    assert function_name in _code_function_paths, f'Function {function_name} could not be found'
 
     spec = importlib.util.spec_from_file_location(
-        code_function_name,
-        code_file,
+        function_name,
+        _code_function_paths[function_name],
     )
     code_module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(code_module)
 
     assert hasattr(code_module, 'main')
-    code_functions[code_function_name] = code_module.main
+    code_functions[function_name] = code_module.main
 
 
 def run(function_name, inputs):
-    assert function_name in code_functions, f'Function {function_name} could not be found'
+    if function_name not in code_functions:
+        with _lock:
+            if function_name not in code_functions:
+                _load_code_function(function_name)
     return code_functions[function_name](*inputs)
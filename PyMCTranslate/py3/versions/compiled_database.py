@@ -0,0 +1,318 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import threading
+from typing import Union, Tuple, Dict, Any, Callable, List
+from collections.abc import Mapping
+
+from PyMCTranslate import log, build_number
+from PyMCTranslate.py3.util import freeze
+
+"""
+Compiled database format
+    A single file per version and translator (eg <version>/block.pymctdb) holding the contents of the
+    <version>/<attr>/**/*.json tree so that loading it is one open and map rather than tens of thousands of reads.
+    The file stores a checksum of the json tree it was built from. If the json tree changes the file is not used.
+    The file is built the first time the json is loaded (or by compile_json.py). It is written next to the json if that
+    directory is writable and otherwise to the user cache directory. It is written to a temporary file and moved into
+    place so processes loading at the same time never read a partial file.
+
+    header
+        magic       8 bytes     b'PYMCTDB\x00'
+        version     uint32      the version of this file format
+        checksum    32 bytes    the checksum of the json tree this file was compiled from. See source_checksum
+        index_start uint64      the offset of the index in the file
+        index_size  uint64      the size of the index in bytes
+    payload
+        the json encoded data for each file concatenated together
+    index
+        json encoded {<block_format>: {<operation>: {<namespace>: {<base_name>: [offset, size]}}}}
+"""
+
+_magic = b'PYMCTDB\x00'
+_format_version = 1
+_header = struct.Struct('<8sI32sQQ')
+compiled_extension = '.pymctdb'
+
+
+def compiled_path(version_path: str, attr: str) -> str:
+    """The path of the compiled database for a given version path and translator name."""
+    return os.path.join(version_path, f'{attr}{compiled_extension}')
+
+
+def _user_cache_dir() -> str:
+    if sys.platform == 'win32':
+        cache_dir = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        cache_dir = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_dir, 'PyMCTranslate')
+
+
+def cache_compiled_path(version_path: str, attr: str) -> str:
+    """The path of the compiled database in the user cache directory. This is used if the version directory is not writable."""
+    version_id = hashlib.sha256(os.path.abspath(version_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(_user_cache_dir(), f'{os.path.basename(version_path)}_{version_id}', f'{attr}{compiled_extension}')
+
+
+def _json_files(database_path: str) -> List[Tuple[Tuple[str, ...], os.DirEntry]]:
+    """Every json file in a database tree as (relative path parts, DirEntry) sorted by path."""
+    files = []
+
+    def scan(path: str, rel_path: Tuple[str, ...]):
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir():
+                    scan(entry.path, rel_path + (entry.name,))
+                elif entry.name.endswith('.json'):
+                    files.append((rel_path + (entry.name,), entry))
+
+    scan(database_path, ())
+    files.sort(key=lambda file: file[0])
+    return files
+
+
+def source_checksum(database_path: str, files: List[Tuple[Tuple[str, ...], os.DirEntry]] = None) -> bytes:
+    """
+    Get the checksum of a json database tree.
+    This is built from the PyMCTranslate build number and the relative path, size and modification time of every json
+    file so that it can be computed without reading the files. Any change to the source tree will change the checksum.
+    :param database_path: The path to the database directory (eg <version>/block)
+    :param files: The result of _json_files if it has already been found
+    :return: A sha256 digest
+    """
+    checksum = hashlib.sha256(f'{build_number}\x00'.encode('utf-8'))
+    for rel_path, entry in _json_files(database_path) if files is None else files:
+        stat = entry.stat()
+        checksum.update(f'{"/".join(rel_path)}\x00{stat.st_size}\x00{stat.st_mtime_ns}\x00'.encode('utf-8'))
+    return checksum.digest()
+
+
+def load_json_database(database_path: str, lazy: bool = False) -> dict:
+    """
+    Load a json database tree into the nested database dictionary.
+    :param database_path: The path to the database directory (eg <version>/block)
+    :param lazy: If True only the file paths are found and each file is read when it is first requested
+    :return: {<block_format>: {<operation>: {<namespace>: {<base_name>: data}}}} where data is frozen when first requested
+    """
+    files = _json_files(database_path)
+    if lazy:
+        return _lazy_json_database(files)
+    return _freeze_on_access(_read_json_database(files))
+
+
+def _index_json_database(files: List[Tuple[Tuple[str, ...], os.DirEntry]]) -> dict:
+    """Build the nested database dictionary with the path to each json file in place of its data."""
+    index = {}
+    for rel_path, entry in files:
+        index_ = index
+        assert len(rel_path) == 5
+        for directory in rel_path[:-2]:
+            index_ = index_.setdefault(directory, {})
+        index_[rel_path[-1][:-5]] = entry.path
+    return index
+
+
+def _load_json_file(fpath: str):
+    with open(fpath) as f:
+        return json.load(f)
+
+
+def _read_json_database(files: List[Tuple[Tuple[str, ...], os.DirEntry]]) -> dict:
+    return {
+        block_format: {
+            operation: {
+                namespace: {
+                    base_name: _load_json_file(fpath) for base_name, fpath in base_names.items()
+                } for namespace, base_names in namespaces.items()
+            } for operation, namespaces in operations.items()
+        } for block_format, operations in _index_json_database(files).items()
+    }
+
+
+def _lazy_json_database(files: List[Tuple[Tuple[str, ...], os.DirEntry]]) -> dict:
+    return {
+        block_format: {
+            operation: {
+                namespace: LazyBaseNames(base_names, lambda fpath: freeze(_load_json_file(fpath))) for namespace, base_names in namespaces.items()
+            } for operation, namespaces in operations.items()
+        } for block_format, operations in _index_json_database(files).items()
+    }
+
+
+def _freeze_on_access(database: dict) -> dict:
+    """Wrap each namespace in the decoded database so that the data for each base name is frozen when it is first requested."""
+    return {
+        block_format: {
+            operation: {
+                namespace: LazyBaseNames(base_names, freeze) for namespace, base_names in namespaces.items()
+            } for operation, namespaces in operations.items()
+        } for block_format, operations in database.items()
+    }
+
+
+def _write_compiled_database(out_path: str, checksum: bytes, database: dict):
+    payload = bytearray()
+    index = {}
+    for block_format, operations in database.items():
+        for operation, namespaces in operations.items():
+            for namespace, base_names in namespaces.items():
+                for base_name, data in base_names.items():
+                    blob = json.dumps(data, separators=(',', ':')).encode('utf-8')
+                    index.setdefault(block_format, {}).setdefault(operation, {}).setdefault(namespace, {})[base_name] = [_header.size + len(payload), len(blob)]
+                    payload += blob
+
+    index_blob = json.dumps(index, separators=(',', ':')).encode('utf-8')
+    # write to a temporary file and move it into place so that a partially written file is never read
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    temp_path = f'{out_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(_header.pack(_magic, _format_version, checksum, _header.size + len(payload), len(index_blob)))
+            f.write(payload)
+            f.write(index_blob)
+        os.replace(temp_path, out_path)
+    finally:
+        if os.path.isfile(temp_path):
+            os.remove(temp_path)
+
+
+def compile_database(version_path: str, attr: str) -> Union[str, None]:
+    """
+    Compile the json database tree for a translator into a single file.
+    :param version_path: The path to the version directory
+    :param attr: The translator name (eg 'block')
+    :return: The path to the compiled file or None if there is no database to compile
+    """
+    database_path = os.path.join(version_path, attr)
+    if not os.path.isdir(database_path):
+        return None
+    files = _json_files(database_path)
+    out_path = compiled_path(version_path, attr)
+    _write_compiled_database(out_path, source_checksum(database_path, files), _read_json_database(files))
+    return out_path
+
+
+class LazyBaseNames(Mapping):
+    """
+    A read only mapping from base name to the data for that base name.
+    The data for each base name is only decoded the first time it is requested.
+    """
+    def __init__(self, index: Dict[str, Any], decode: Callable[[Any], Any]):
+        """
+        :param index: A dictionary mapping the base name to a key that decode can use to get the data
+        :param decode: A function to get the data from a key in index
+        """
+        self._index = index
+        self._decode = decode
+        self._data = {}
+
+    def __getitem__(self, base_name: str):
+        if base_name not in self._data:
+            self._data[base_name] = self._decode(self._index[base_name])
+        return self._data[base_name]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, base_name):
+        return base_name in self._index
+
+
+def _open_compiled_database(fpath: str, checksum: Union[bytes, None]) -> Union[Tuple[mmap.mmap, dict], None]:
+    if not os.path.isfile(fpath) or os.path.getsize(fpath) < _header.size:
+        return None
+    with open(fpath, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, format_version, checksum_, index_start, index_size = _header.unpack_from(mm, 0)
+    if magic != _magic or format_version != _format_version:
+        mm.close()
+        return None
+    if checksum is not None and checksum_ != checksum:
+        log.info(f'Compiled database {fpath} is out of date')
+        mm.close()
+        return None
+    return mm, json.loads(mm[index_start:index_start + index_size])
+
+
+def load_compiled_database(fpath: str, checksum: Union[bytes, None], lazy: bool = False) -> Union[dict, None]:
+    """
+    Load a compiled database file.
+    :param fpath: The path to the compiled file
+    :param checksum: The checksum of the json tree. If the file was built from a different tree it is not used. None to skip the check
+    :param lazy: If True the file is kept mapped and each entry is only decoded when it is first requested
+    :return: The nested database dictionary or None if the compiled file does not exist, is invalid or is out of date
+    """
+    compiled = _open_compiled_database(fpath, checksum)
+    if compiled is None:
+        return None
+    mm, index = compiled
+
+    if lazy:
+        def decode(entry: Tuple[int, int]):
+            offset, size = entry
+            return freeze(json.loads(mm[offset:offset + size]))
+
+        return {
+            block_format: {
+                operation: {
+                    namespace: LazyBaseNames(base_names, decode) for namespace, base_names in namespaces.items()
+                } for operation, namespaces in operations.items()
+            } for block_format, operations in index.items()
+        }
+
+    with mm:
+        return _freeze_on_access({
+            block_format: {
+                operation: {
+                    namespace: {
+                        base_name: json.loads(mm[offset:offset + size]) for base_name, (offset, size) in base_names.items()
+                    } for namespace, base_names in namespaces.items()
+                } for operation, namespaces in operations.items()
+            } for block_format, operations in index.items()
+        })
+
+
+def load_database(version_path: str, attr: str, lazy: bool = False) -> dict:
+    """
+    Load the database for a translator.
+    The compiled database is used if it matches the checksum of the json tree.
+    Otherwise the json tree is loaded and the compiled database is rebuilt for next time.
+    In lazy mode the compiled database is not rebuilt because that would read every json file.
+    Each json file is read when it is first requested instead.
+    :param version_path: The path to the version directory
+    :param attr: The translator name (eg 'block')
+    :param lazy: If True only the index is loaded and the data for each base name is decoded when it is first requested
+    :return: The nested database dictionary
+    """
+    database_path = os.path.join(version_path, attr)
+    if not os.path.isdir(database_path):
+        # there is no json to check the compiled database against so use it as it is
+        return load_compiled_database(compiled_path(version_path, attr), None, lazy) or {}
+
+    files = _json_files(database_path)
+    checksum = source_checksum(database_path, files)
+    fpaths = (compiled_path(version_path, attr), cache_compiled_path(version_path, attr))
+    for fpath in fpaths:
+        database = load_compiled_database(fpath, checksum, lazy)
+        if database is not None:
+            return database
+
+    if lazy:
+        return _lazy_json_database(files)
+
+    # the compiled database is missing or out of date so load the json and rebuild it
+    database = _read_json_database(files)
+    for fpath in fpaths:
+        try:
+            _write_compiled_database(fpath, checksum, database)
+        except OSError as e:
+            log.info(f'Could not write the compiled {attr} database to {fpath}. {e}')
+        else:
+            break
+    return _freeze_on_access(database)
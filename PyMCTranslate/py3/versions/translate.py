@@ -1,10 +1,13 @@
-from typing import Union, Tuple, List, Dict, Callable, TYPE_CHECKING, Type
+from typing import Union, Tuple, List, Dict, Set, Callable, TYPE_CHECKING, Type, Any, Hashable, MutableMapping, Iterable
+import functools
+import sys
 
 import amulet_nbt
 from amulet_nbt import NBTFile, TAG_Byte, TAG_Short, TAG_Int, TAG_Long, TAG_Float, TAG_Double, TAG_Byte_Array, TAG_String, TAG_List, TAG_Compound, TAG_Int_Array, TAG_Long_Array
 
 from PyMCTranslate import Block, BlockEntity, Entity, ChunkLoadError, log
 from PyMCTranslate.py3.versions import code_functions
+from PyMCTranslate.py3.versions.cache import sizeof
 
 if TYPE_CHECKING:
 	from numpy import ndarray
@@ -79,6 +82,55 @@ def index_nbt(nbt: NBTFile, nbt_path: Tuple[str, str, List[Tuple[Union[str, int]
 	return nbt
 
 
+# tags whose (class, value) identifies their snbt. Other tags are compared by their snbt
+_hashable_nbt = (TAG_Byte, TAG_Short, TAG_Int, TAG_Long, TAG_String)
+
+
+def nbt_case_key(nbt: amulet_nbt.BaseValueType) -> Union[Tuple[Type[amulet_nbt.BaseValueType], Union[int, str]], str]:
+	"""
+	A hashable key for the value of a tag. Two tags have the same key if they have the same snbt.
+	Integer and string tags use (tag class, value) which avoids serialising the tag. Other tags use the snbt.
+	:param nbt: The tag to get the key of
+	:return: (tag class, value) or the snbt of the tag
+	"""
+	if nbt.__class__ in _hashable_nbt:
+		return nbt.__class__, nbt.value
+	return nbt.to_snbt()
+
+
+def _snbt_case_key(snbt: str) -> Union[Tuple[Type[amulet_nbt.BaseValueType], Union[int, str]], str]:
+	"""The nbt_case_key of the tag a snbt string in a mapping file would match."""
+	try:
+		nbt = amulet_nbt.from_snbt(snbt)
+	except Exception:
+		return snbt
+	if nbt.to_snbt() != snbt:
+		# the snbt is not in the form to_snbt creates so it can only match itself
+		return snbt
+	return nbt_case_key(nbt)
+
+
+def copy_nbt(nbt: amulet_nbt.BaseValueType) -> amulet_nbt.BaseValueType:
+	"""
+	Create a deep copy of a tag.
+	The tags parsed from the specifications and mappings are shared so they must be copied before they are added to an output.
+	This is faster than both copy.deepcopy and parsing the snbt again.
+	"""
+	if isinstance(nbt, TAG_Compound):
+		return TAG_Compound({key: copy_nbt(val) for key, val in nbt.value.items()})
+	elif isinstance(nbt, TAG_List):
+		return TAG_List([copy_nbt(val) for val in nbt.value], nbt.list_data_type)
+	elif isinstance(nbt, (TAG_Byte_Array, TAG_Int_Array, TAG_Long_Array)):
+		return nbt.__class__(nbt.value.copy())
+	return nbt.copy()
+
+
+@functools.lru_cache(maxsize=1024)
+def _property_from_snbt(snbt: str) -> amulet_nbt.BaseValueType:
+	"""Parse a property value. Block properties are not modified so the same tag can be shared between blocks."""
+	return amulet_nbt.from_snbt(snbt)
+
+
 def nbt_from_list(
 	outer_name: str,
 	outer_type: str,
@@ -95,11 +147,13 @@ def nbt_from_list(
 			Union[TAG_Byte, TAG_Short, TAG_Int, TAG_Long, TAG_Float, TAG_Double, TAG_Byte_Array, TAG_String, TAG_List, TAG_Compound, TAG_Int_Array, TAG_Long_Array]
 		]
 	],
-	default_template: str = None
+	default_template: Union[str, amulet_nbt.BaseValueType] = None
 ) -> NBTFile:
 
-	if default_template is not None:
+	if isinstance(default_template, str):
 		nbt_object = amulet_nbt.from_snbt(default_template)
+	elif default_template is not None:
+		nbt_object = copy_nbt(default_template)
 	else:
 		nbt_object = datatype_to_nbt(outer_type)()
 
@@ -160,23 +214,31 @@ def nbt_from_list(
 def translate(
 		object_input: Union[Block, Entity], 
 		input_spec: dict, 
-		mappings: List[dict], 
+		mappings: Union[List[dict], 'Program'],
 		output_version: 'Version',
 		force_blockstate: bool,
 		get_block_callback: Callable[[Tuple[int, int, int]], Tuple[Block, Union[None, BlockEntity]]] = None,
 		extra_input: BlockEntity = None, 
-		pre_populate_defaults: bool = True
+		pre_populate_defaults: bool = True,
+		neighbours: List[Tuple[Tuple[int, int, int], Union[Block, None]]] = None,
+		nbt_memo: 'NBTMemo' = None
 ) -> Tuple[Union[Block, Entity], Union[BlockEntity, None], bool, bool]:
 	"""
 		A function to translate the object input to the output version
 
 		:param object_input: the Block or Entity object to be converted
 		:param input_spec: the specification for the object_input from the input block_format
-		:param mappings: the mapping file for the input_object
+		:param mappings: the mapping file for the input_object or the mapping compiled with compile_mappings
 		:param output_version: A way for the function to look at the specification being converted to. (used to load default properties)
 		:param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
 		:param get_block_callback: see get_block_at function at the top for a template
 		:param extra_input: secondary to the object_input a block entity can be given. This should only be used in the select block tool or plugins. Not compatible with location
+		:param pre_populate_defaults: If True the output nbt is populated from the default nbt in the output specification
+		:param neighbours: If a list is given the (relative location, Block) of each neighbouring block read by multiblock is appended to it
+			and reading neighbours does not make the result uncacheable. The result may then only be cached against the input and these neighbours.
+			The Block is None if the location could not be read
+		:param nbt_memo: If given results that depend on the input nbt are stored in and looked up from this.
+			The memo is keyed on the input object and the nbt values the mapping read so the result is not cacheable in the normal cache
 		:return: output, extra_output, extra_needed, cacheable
 			extra_needed: a bool to specify if more data is needed beyond the object_input
 			cacheable: a bool to specify if the result can be cached to reduce future processing
@@ -214,8 +276,43 @@ def translate(
 	else:
 		raise Exception
 
-	# run the conversion
-	output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, mappings, get_block_callback)
+	use_memo = nbt_memo is not None and nbt_input is not None
+	if use_memo:
+		memo_key = (object_input.namespace, object_input.base_name) if block_input is None else block_input
+		state = nbt_memo.get(memo_key, nbt_input)
+	else:
+		state = None
+
+	if state is None:
+		# run the conversion
+		if not callable(mappings):
+			mappings = compile_mappings(mappings)
+		state = TranslationState()
+		state.neighbours = neighbours
+		if use_memo:
+			state.nbt_probes = []
+		mappings(state, block_input, nbt_input, get_block_callback, (0, 0, 0), None)
+		# blocks that did not read the nbt are cached by the caller. Entities are always stored in the memo
+		memo_state = use_memo and state.cacheable and not neighbours and (bool(state.nbt_probes) or block_input is None)
+	else:
+		memo_state = False
+
+	output, extra_output = _build_output(state, object_input, output_version, force_blockstate, pre_populate_defaults)
+	if memo_state:
+		nbt_memo.add(memo_key, state)
+	# results that depend on the nbt can only be cached in the memo
+	return output, extra_output, state.extra_needed, state.cacheable and not state.nbt_probes
+
+
+def _build_output(
+		state: 'TranslationState',
+		object_input: Union[Block, Entity],
+		output_version: 'Version',
+		force_blockstate: bool,
+		pre_populate_defaults: bool
+) -> Tuple[Union[Block, Entity], Union[BlockEntity, None]]:
+	"""Create the output object from the state after the mappings have been run."""
+	output_name, output_type, new_data = state.output_name, state.output_type, state.new_data
 
 	# sort out the outputs from the _translate function
 	extra_output = None
@@ -223,17 +320,15 @@ def translate(
 		# we should have a block output
 		# create the block object based on output_name and new['properties']
 		namespace, base_name = output_name.split(':', 1)
-		spec = output_version.block.get_specification(namespace, base_name, force_blockstate)
-		properties = spec.get('defaults', {})
-
-		# cast to NBT
-		properties = {prop: amulet_nbt.from_snbt(val) for prop, val in properties.items()}
+		spec = output_version.block._get_specification(namespace, base_name, force_blockstate)
+		defaults, template = output_version.block._get_parsed_specification(namespace, base_name, force_blockstate)
 
+		properties = dict(defaults)
 		for key, val in new_data['properties'].items():
 			properties[key] = val
-		output = Block(namespace, base_name, properties)
+		output = output_version.translation_manager.intern_block(namespace, base_name, properties)
 
-		if 'snbt' in spec:
+		if template is not None:
 			namespace, base_name = spec.get('nbt_identifier', ['unknown', 'unknown'])
 
 			if pre_populate_defaults:
@@ -241,7 +336,7 @@ def translate(
 					spec.get('outer_name', ''),
 					spec.get('outer_type', 'compound'),
 					new_data['nbt'],
-					spec.get('snbt', '{}')
+					template
 				)
 
 			else:
@@ -261,14 +356,15 @@ def translate(
 		# we should have an entity output
 		# create the entity object based on output_name and new['nbt']
 		namespace, base_name = output_name.split(':', 1)
-		spec = output_version.entity.get_specification(namespace, base_name, force_blockstate)
+		spec = output_version.entity._get_specification(namespace, base_name, force_blockstate)
+		_, template = output_version.entity._get_parsed_specification(namespace, base_name, force_blockstate)
 
 		if pre_populate_defaults:
 			nbt = nbt_from_list(
 				spec.get('outer_name', ''),
 				spec.get('outer_type', 'compound'),
 				new_data['nbt'],
-				spec.get('snbt', '{}')
+				TAG_Compound() if template is None else template
 			)
 
 		else:
@@ -282,392 +378,849 @@ def translate(
 
 	else:
 		raise Exception("No output object given.")
-	return output, extra_output, extra_needed, cacheable
-
-
-def _translate(
-		block_input: Union[Block, None],
-		nbt_input: Union[NBTFile, None],
-		mappings: List[dict],
-		get_block_callback: Callable = None,
-		relative_location: Tuple[int, int, int] = None,
-		nbt_path: Tuple[str, str, List[Tuple[Union[str, int], str]]] = None,
-		inherited_data: Tuple[Union[str, None], Union[str, None], dict, bool, bool] = None
-) -> Tuple[Union[str, None], Union[str, None], dict, bool, bool]:
+	return output, extra_output
+
+
+class TranslationState:
 	"""
-	:param block_input:
-	:param nbt_input:
-	:param mappings:
-	:param get_block_callback:
-	:param relative_location:
-	:param inherited_data:
-	:return:
-		output_name - string of the object being output
-		output_type - string of the type output name is (should be 'block' or 'entity')
-		new - a dictionary that looks like this {'properties': {}, 'nbt': []}
-		extra_needed - bool. Specifies if more data is needed (ie if the block callback needs to be given to do a full map)
-		cacheable - bool. Specifies if the input object is cachable. Only true for simple Blocks without BlockEntities
+	The data built up while running a mapping program.
+	There could be multiple 'new_block' functions in the mappings so new properties and nbt are put in new_data and merged at the very end.
 	"""
-	if relative_location is None:
-		relative_location = (0, 0, 0)
+	__slots__ = ('output_name', 'output_type', 'new_data', 'extra_needed', 'cacheable', 'neighbours', 'nbt_probes', 'carried')
 
-	if inherited_data is not None:
-		output_name, output_type, new_data, extra_needed, cacheable = inherited_data
-	else:
-		output_name = None
-		output_type = None
-		new_data = {
+	def __init__(self):
+		self.output_name: Union[str, None] = None  # string of the object being output
+		self.output_type: Union[str, None] = None  # string of the type output name is (should be 'block' or 'entity')
+		# {'properties': {<property_name>: NBT}, 'nbt': [(outer_name, outer_type, [(path0, type0), (path1, type1), ...], path_n, NBT), ...]}
+		self.new_data = {
 			'properties': {},
 			'nbt': []
-		}  # There could be multiple 'new_block' functions in the mappings so new properties are put in here and merged at the very end
-		new_data['nbt']: List[
-			Tuple[
-				str,
-				str,
-				List[
-					Union[str, int], str
-				],
-				Union[str, int],
-				Union[TAG_Byte, TAG_Short, TAG_Int, TAG_Long, TAG_Float, TAG_Double, TAG_Byte_Array, TAG_String, TAG_List, TAG_Compound, TAG_Int_Array, TAG_Long_Array]
-			]
-		]
+		}
+		self.extra_needed = False  # used to determine if extra data is required (and thus to do block by block)
+		self.cacheable = True  # cacheable until proven otherwise. Only true for simple Blocks without BlockEntities
+		# None or a list of (relative location, Block) read by multiblock. If this is a list reading neighbours does not stop the result being cached
+		self.neighbours: Union[List[Tuple[Tuple[int, int, int], Union[Block, None]]], None] = None
+		# None or a list of (probe, observation) of the input nbt the mapping read. If this is a list reading the nbt does not stop the result being cached in a NBTMemo
+		self.nbt_probes: Union[List[Tuple[Tuple[str, 'NBTPath'], Any]], None] = None
+		# (index in new_data['nbt'], nbt path, nbt type) of each value carried from the input nbt
+		self.carried: List[Tuple[int, 'NBTPath', str]] = []
+
+	def probe_nbt(self, kind: str, nbt_input: NBTFile, nbt_path: 'NBTPath', relative_location: Tuple[int, int, int]) -> bool:
 		"""
-		new['nbt'] = [
-			[
-				[
-					[path0, type0],
-					[path1, type1],
-					...
-				],
-				path_n,
-				NBT
-			],
-			...
-		]
+		Record that the mapping has read the input nbt.
+		:param kind: The type of read. A key in _nbt_probes
+		:param nbt_input: The nbt being read
+		:param nbt_path: The path in the nbt being read
+		:param relative_location: The location of the block the nbt is from
+		:return: True if the read was recorded. False if the result is now not cacheable
 		"""
-		extra_needed = False  # used to determine if extra data is required (and thus to do block by block)
-		cacheable = True    # cacheable until proven otherwise
+		if self.nbt_probes is None or relative_location != (0, 0, 0):
+			# nbt from neighbouring blocks is not tracked
+			self.cacheable = False
+			return False
+		probe = (kind, (nbt_path[0], nbt_path[1], tuple(nbt_path[2])))
+		self.nbt_probes.append((probe, _nbt_probes[kind](nbt_input, probe[1])))
+		return True
+
+
+def _nbt_shape(nbt_input: NBTFile, nbt_path: 'NBTPath'):
+	"""The type of the tag at nbt_path and the keys and types of its children. This is everything walk_input_nbt branches on."""
+	nbt = index_nbt(nbt_input, nbt_path)
+	if nbt is None:
+		return None
+	elif isinstance(nbt, TAG_Compound):
+		return nbt.tag_id, tuple((key, val.tag_id) for key, val in nbt.value.items())
+	elif isinstance(nbt, TAG_List):
+		return nbt.tag_id, int(nbt.list_data_type), len(nbt)
+	elif isinstance(nbt, (TAG_Byte_Array, TAG_Int_Array, TAG_Long_Array)):
+		return nbt.tag_id, len(nbt)
+	return nbt.tag_id
+
+
+def _nbt_value(nbt_input: NBTFile, nbt_path: 'NBTPath'):
+	"""The value of the tag at nbt_path as map_nbt sees it."""
+	nbt = index_nbt(nbt_input, nbt_path)
+	if nbt is None:
+		return None
+	return nbt_case_key(nbt)
 
-	for translate_function in mappings:
-		function_name = translate_function['function']
 
-		if 'new_block' == function_name:
-			# {
-			# 	"function": "new_block",
-			# 	"options": "<namespace>:<base_name>"
-			# }
-			output_name: str = translate_function["options"]
-			output_type = 'block'
-
-		elif 'new_entity' == function_name:
-			# {
-			# 	"function": "new_entity",
-			# 	"options": "<namespace>:<base_name>"
-			# }
-			output_name: str = translate_function["options"]
-			output_type = 'entity'
-
-		elif 'new_properties' == function_name:
-			# {
-			# 	"function": "new_properties",
-			# 	"options": {
-			# 		"<property_name>": "<SNBT>",  # eg "val", "54b"
-			# 	}
-			# }
-			for key, val in translate_function["options"].items():
-				new_data['properties'][key] = amulet_nbt.from_snbt(val)
-
-		elif 'carry_properties' == function_name:
-			# {
-			# 	"function": "carry_properties",
-			# 	"options": {
-			# 		"<property_name>": ["<property_value"],
-			# 		"<nbt_property_name>": ['<SNBT>']
-			# 	}
-			# }
-			assert isinstance(block_input, Block), 'The block input is not a block'
-			for key in translate_function["options"]:
-				if key in block_input.properties:
-					val = block_input.properties[key]
-					if isinstance(val, amulet_nbt.BaseValueType):
-						hash_val = val.to_snbt()
-					else:
-						continue
-					if hash_val in translate_function["options"][key]:
-						new_data['properties'][key] = val
-
-		elif 'map_properties' == function_name:
-			# {
-			# 	"function": "map_properties",
-			# 	"options": {
-			# 		"<property_name>": {
-			# 			"<SNBT>": [
-			# 				<functions>
-			# 			]
-			# 		}
-			# 	}
-			# }
-			assert isinstance(block_input, Block), 'The block input is not a block'
-			for key in translate_function["options"]:
-				if key in block_input.properties:
-					val = block_input.properties[key]
-					if isinstance(val, amulet_nbt.BaseValueType):
-						val = val.to_snbt()
-					else:
-						continue
-					if val in translate_function["options"][key]:
-						output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, translate_function["options"][key][val], get_block_callback, relative_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-
-		elif 'multiblock' == function_name:
-			# {
-			# 	"function": "multiblock",
-			# 	"options": [
-			# 		{
-			# 			"coords": [dx, dy, dz],
-			# 			"functions": <functions>
-			# 		}
-			# 	]
-			# }
-			cacheable = False
-			if get_block_callback is None:
-				extra_needed = True
+_nbt_probes: Dict[str, Callable[[NBTFile, 'NBTPath'], Any]] = {
+	'shape': _nbt_shape,
+	'value': _nbt_value
+}
+
+
+class _NBTMemoResult:
+	"""The state after running a mapping with the values carried from the input nbt removed."""
+	__slots__ = ('output_name', 'output_type', 'properties', 'nbt', 'carried', 'extra_needed')
+
+	def __init__(self, state: TranslationState):
+		self.output_name = state.output_name
+		self.output_type = state.output_type
+		self.properties = dict(state.new_data['properties'])
+		# copy the new values because the originals are now part of the output
+		nbt = [entry[:4] + (copy_nbt(entry[4]), ) for entry in state.new_data['nbt']]
+		for index, _, _ in state.carried:
+			nbt[index] = nbt[index][:4] + (None, )
+		self.nbt = tuple(nbt)
+		self.carried = tuple(state.carried)
+		self.extra_needed = state.extra_needed
+
+	def __sizeof__(self):
+		return object.__sizeof__(self) + sys.getsizeof(self.properties) + sizeof(self.nbt) + sizeof(self.carried)
+
+	def replay(self, nbt_input: NBTFile) -> TranslationState:
+		"""Create the state for a new input nbt that matches the probes this result was stored under."""
+		state = TranslationState()
+		state.output_name = self.output_name
+		state.output_type = self.output_type
+		state.extra_needed = self.extra_needed
+		state.cacheable = False
+		state.new_data['properties'].update(self.properties)
+		# copy the new values so that the outputs do not share nbt
+		nbt = [entry if entry[4] is None else entry[:4] + (copy_nbt(entry[4]), ) for entry in self.nbt]
+		for index, nbt_path, nbt_type in self.carried:
+			nbt[index] = nbt[index][:4] + (datatype_to_nbt(nbt_type)(index_nbt(nbt_input, nbt_path).value), )
+		state.new_data['nbt'] = nbt
+		return state
+
+
+class _NBTProbeNode:
+	"""A node in a NBTMemo tree. It reads one value from the input nbt and branches on the value found."""
+	__slots__ = ('probe', 'branches')
+
+	def __init__(self, probe: Tuple[str, 'NBTPath']):
+		self.probe = probe
+		self.branches: Dict[Any, Union['_NBTProbeNode', _NBTMemoResult]] = {}
+
+	def __sizeof__(self):
+		# the node and its branch dictionary but not the branches themselves. Those are counted as they are added
+		return object.__sizeof__(self) + sys.getsizeof(self.branches)
+
+
+class NBTMemo:
+	"""
+	Translation results that depend on the input nbt.
+	Results are stored against the input block or entity id and then a tree of the nbt values the mapping read.
+	Data carried from the input nbt is not part of the key. It is copied from the new input when the result is used.
+	"""
+	def __init__(self, cache: MutableMapping = None):
+		"""
+		:param cache: The mapping to store the trees in. Defaults to a dictionary.
+			If it has a resize method (eg LRUCache) it is called with the number of bytes a tree grew by when a result is added to it.
+		"""
+		self._cache = {} if cache is None else cache
+		self._resize = getattr(self._cache, 'resize', None)
+
+	def clear(self):
+		self._cache.clear()
+
+	def get(self, key: Hashable, nbt_input: NBTFile) -> Union[TranslationState, None]:
+		"""
+		Get the state for an input.
+		:param key: The input Block or (namespace, base_name) of the input entity
+		:param nbt_input: The input nbt
+		:return: The TranslationState to build the output from or None if there is no stored result
+		"""
+		node = self._cache.get(key)
+		while isinstance(node, _NBTProbeNode):
+			kind, nbt_path = node.probe
+			value = _nbt_probes[kind](nbt_input, nbt_path)
+			if value not in node.branches:
+				return None
+			node = node.branches[value]
+		if node is None:
+			return None
+		return node.replay(nbt_input)
+
+	def add(self, key: Hashable, state: TranslationState):
+		"""
+		Store the result of running a mapping.
+		:param key: The input Block or (namespace, base_name) of the input entity
+		:param state: The state after running the mapping with nbt_probes recorded
+		"""
+		probes = state.nbt_probes
+		if not probes:
+			# the mapping did not read the nbt
+			self._cache[key] = _NBTMemoResult(state)
+			return
+		node = self._cache.get(key)
+		if not isinstance(node, _NBTProbeNode):
+			node = self._cache[key] = _NBTProbeNode(probes[0][0])
+		nbytes = 0
+		for index, (probe, value) in enumerate(probes):
+			if node.probe != probe:
+				# the mapping read a different value to the one it read before. This should not happen
+				break
+			branches = node.branches
+			nbytes -= sys.getsizeof(branches)
+			if value in branches:
+				old = branches[value]
 			else:
-				multiblocks = translate_function["options"]
-				if isinstance(multiblocks, dict):
-					multiblocks = [multiblocks]
-				for multiblock in multiblocks:
-					new_location = (relative_location[0] + multiblock['coords'][0], relative_location[1] + multiblock['coords'][1], relative_location[2] + multiblock['coords'][2])
-					try:
-						block_input_, nbt_input_ = get_block_callback(new_location)
-						output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input_, nbt_input_, multiblock['functions'], get_block_callback ,new_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-					except ChunkLoadError:
-						continue
-
-		elif 'map_block_name' == function_name:
-			# {
-			# 	"function": "map_block_name",
-			# 	"options": {
-			# 		"<namespace>:<base_name>": [
-			# 			<functions>
-			# 		]
-			# 	}
-			# }
-			assert isinstance(block_input, Block), f'The block input {block_input} is not a block'
-			block_name = f'{block_input.namespace}:{block_input.base_name}'
-			if block_name in translate_function["options"]:
-				output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, translate_function["options"][block_name], get_block_callback, relative_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-
-		elif 'walk_input_nbt' == function_name:
-			# This is a special function unlike the others. See _convert_walk_input_nbt for more information
-			# {
-			# 	"function": "walk_input_nbt",
-			#   "outer_name": "",  # defaults to this if undefined
-			# 	"options": {
-			# 		"type": "<nbt type>",  # check that the nbt is of this type
-			# 		"self_default": [],  # if the type is different run these functions : defaults to [{"function": "carry_nbt"}] which carries everything
-			# 	    "functions": [],  # functions to run if defined
-			#
-			# 		"keys": {  # only for compound type
-			# 	        str: {nested options format}
-			# 		},
-			#       "index": {  # only for list or array types
-			# 	        str(<int>): {nested options format}     (type should not be defined for nested array types)
-			# 	    },
-			# 	    "nested_default": []  # only for compound, list or array types.
-			# 	        If nested key/index is not in respective dictionary run these functions on them.
-			#           If undefined defaults to [{"function": "carry_nbt"}] which carries everything
-			# 	}
-			# }
-			cacheable = False
-			if nbt_input is None:
-				extra_needed = True
+				old = None
+				nbytes += sys.getsizeof(value)
+			if index == len(probes) - 1:
+				if old is not None:
+					nbytes -= sizeof(old)
+				new = branches[value] = _NBTMemoResult(state)
+				nbytes += sizeof(new) + sys.getsizeof(branches)
 			else:
-				custom_nbt_path = translate_function.get('path', [])
-				if custom_nbt_path:
-					nbt_temp = index_nbt(nbt_input, ('', 'compound', custom_nbt_path))
-					if nbt_temp is None:
-						log.error(f'Expected nbt data at {custom_nbt_path}')
-					elif not isinstance(nbt_temp, datatype_to_nbt(custom_nbt_path[-1][-1])):
-						log.error(f'Expected nbt data at {custom_nbt_path} to be an {custom_nbt_path[-1][-1]} tag but got {nbt_temp.__class__.__name__}')
-					else:
-						output_name, output_type, new_data, extra_needed, cacheable = _convert_walk_input_nbt(
-							block_input, nbt_input, translate_function["options"], get_block_callback,
-							relative_location, ('', 'compound', custom_nbt_path),
-							(output_name, output_type, new_data, extra_needed, cacheable)
-						)
+				if not isinstance(old, _NBTProbeNode):
+					if old is not None:
+						nbytes -= sizeof(old)
+					old = branches[value] = _NBTProbeNode(probes[index + 1][0])
+					nbytes += sizeof(old)
+				nbytes += sys.getsizeof(branches)
+				node = old
+		if self._resize is not None:
+			# the tree was modified in place so the size the cache measured when it was added is out of date
+			self._resize(key, nbytes)
 
+
+NBTPath = Tuple[str, str, List[Tuple[Union[str, int], str]]]
+
+"""
+A compiled mapping program.
+program(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+Running a program modifies state in place.
+"""
+Program = Callable[[TranslationState, Union[Block, None], Union[NBTFile, None], Union[Callable, None], Tuple[int, int, int], Union[NBTPath, None]], None]
+
+
+def _run_nothing(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+	pass
+
+
+def compile_mappings(mappings: List[dict], property_tables: bool = True) -> Program:
+	"""
+	Compile a list of mapping functions into a single python function.
+	This is done once per mapping file so that the mapping does not need to be interpreted each time it is run.
+	:param mappings: The mapping functions (See the mapping documentation for the format)
+	:param property_tables: If True runs of functions that only depend on the input properties are looked up in a table. See _compile_property_table
+	:return: A function that runs the mapping. See Program for the signature
+	"""
+	programs = []
+	pure_functions = []
+	for translate_function in mappings:
+		if translate_function['function'] not in _function_compilers:
+			continue
+		if property_tables and _property_keys([translate_function]) is not None:
+			pure_functions.append(translate_function)
+			continue
+		if pure_functions:
+			programs.extend(_compile_pure_functions(pure_functions))
+			pure_functions = []
+		programs.append(_function_compilers[translate_function['function']](translate_function))
+	if pure_functions:
+		programs.extend(_compile_pure_functions(pure_functions))
+
+	if len(programs) == 0:
+		return _run_nothing
+	elif len(programs) == 1:
+		return programs[0]
+	elif len(programs) == 2:
+		program_0, program_1 = programs
+
+		def run_programs(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+			program_0(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+			program_1(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+	else:
+		def run_programs(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+			for program in programs:
+				program(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+	return run_programs
+
+
+# functions that only read the input properties and only write the output name, type and properties
+_pure_functions = {'new_block', 'new_entity', 'new_properties', 'carry_properties', 'map_properties'}
+# the maximum number of entries stored in each property table
+_property_table_size = 1024
+
+
+def _property_keys(mappings: List[dict]) -> Union[Set[str], None]:
+	"""
+	Find the input properties a list of mapping functions reads.
+	:param mappings: The mapping functions
+	:return: The names of the properties read or None if the functions depend on more than the input properties
+	"""
+	keys = set()
+	for translate_function in mappings:
+		function_name = translate_function['function']
+		if function_name not in _pure_functions:
+			return None
+		elif function_name == 'carry_properties':
+			keys.update(translate_function['options'])
+		elif function_name == 'map_properties':
+			for key, cases in translate_function['options'].items():
+				keys.add(key)
+				for functions in cases.values():
+					nested_keys = _property_keys(functions)
+					if nested_keys is None:
+						return None
+					keys.update(nested_keys)
+	return keys
+
+
+def _compile_pure_functions(mappings: List[dict]) -> List[Program]:
+	"""Compile functions that only depend on the input properties. If there is a map_properties they are looked up in a table."""
+	if any(translate_function['function'] == 'map_properties' for translate_function in mappings):
+		return [_compile_property_table(mappings)]
+	return [_function_compilers[translate_function['function']](translate_function) for translate_function in mappings]
+
+
+def _property_case_key(val) -> Hashable:
+	"""The key of an input property value. Values that are not nbt are not matched by map_properties or carry_properties."""
+	if isinstance(val, amulet_nbt.BaseValueType):
+		return nbt_case_key(val)
+	return None
+
+
+def _property_cases(mappings: List[dict], cases: Dict[str, Dict[Hashable, amulet_nbt.BaseValueType]]):
+	"""
+	Find the input property values that functions which only depend on the input properties can match.
+	:param mappings: The mapping functions
+	:param cases: Populated with {property_name: {case_key: tag}} for every value that can be matched
+	"""
+	for translate_function in mappings:
+		function_name = translate_function['function']
+		if function_name == 'carry_properties':
+			for key, values in translate_function['options'].items():
+				_add_property_cases(cases.setdefault(key, {}), values)
+		elif function_name == 'map_properties':
+			for key, property_cases in translate_function['options'].items():
+				_add_property_cases(cases.setdefault(key, {}), property_cases)
+				for functions in property_cases.values():
+					_property_cases(functions, cases)
+
+
+def _add_property_cases(cases: Dict[Hashable, amulet_nbt.BaseValueType], values: Iterable[str]):
+	for snbt in values:
+		try:
+			nbt = amulet_nbt.from_snbt(snbt)
+		except Exception:
+			# this can never match an input
+			continue
+		if nbt.to_snbt() == snbt:
+			# if the snbt is not in the form to_snbt creates it can never match an input
+			cases.setdefault(nbt_case_key(nbt), nbt)
+
+
+def _compile_property_table(mappings: List[dict]) -> Program:
+	"""
+	Compile functions that only depend on the input properties.
+	Rather than walking the nested map_properties each time the result is looked up from the values of the properties the functions read.
+	Values that no case matches behave the same so they share one column in the table.
+	The table is filled as inputs are seen so that compiling a mapping stays cheap. At most _property_table_size entries are stored.
+	"""
+	cases: Dict[str, Dict[Hashable, amulet_nbt.BaseValueType]] = {key: {} for key in _property_keys(mappings)}
+	_property_cases(mappings, cases)
+	keys = tuple(sorted(cases))
+	columns = tuple(frozenset(cases[key]) for key in keys)
+	program = compile_mappings(mappings, False)
+	table: Dict[Tuple[Hashable, ...], Tuple[Union[str, None], Union[str, None], Tuple[Tuple[str, amulet_nbt.BaseValueType], ...]]] = {}
+
+	def run(row: Tuple[Hashable, ...]):
+		# None is the column for values that no case matches so those properties are left out
+		block_input = Block('minecraft', 'air', {key: cases[key][val] for key, val in zip(keys, row) if val is not None})
+		# these functions only write to the state so run them on an empty state to find what they write
+		new_state = TranslationState()
+		program(new_state, block_input, None, None, (0, 0, 0), None)
+		return new_state.output_name, new_state.output_type, tuple(new_state.new_data['properties'].items())
+
+	def property_table(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		assert isinstance(block_input, Block), 'The block input is not a block'
+		# the properties are only read so the block's own dictionary is used rather than a copy
+		input_properties = block_input._properties
+		key = []
+		for property_name, column in zip(keys, columns):
+			val = _property_case_key(input_properties.get(property_name))
+			key.append(val if val in column else None)
+		key = tuple(key)
+		result = table.get(key)
+		if result is None:
+			result = run(key)
+			if len(table) < _property_table_size:
+				table[key] = result
+		output_name, output_type, properties = result
+		if output_name is not None:
+			state.output_name = output_name
+		if output_type is not None:
+			state.output_type = output_type
+		if properties:
+			state.new_data['properties'].update(properties)
+	return property_table
+
+
+def _compile_new_block(translate_function: dict) -> Program:
+	# {
+	# 	"function": "new_block",
+	# 	"options": "<namespace>:<base_name>"
+	# }
+	output_name: str = translate_function["options"]
+
+	def new_block(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		state.output_name = output_name
+		state.output_type = 'block'
+	return new_block
+
+
+def _compile_new_entity(translate_function: dict) -> Program:
+	# {
+	# 	"function": "new_entity",
+	# 	"options": "<namespace>:<base_name>"
+	# }
+	output_name: str = translate_function["options"]
+
+	def new_entity(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		state.output_name = output_name
+		state.output_type = 'entity'
+	return new_entity
+
+
+def _compile_new_properties(translate_function: dict) -> Program:
+	# {
+	# 	"function": "new_properties",
+	# 	"options": {
+	# 		"<property_name>": "<SNBT>",  # eg "val", "54b"
+	# 	}
+	# }
+	# block properties are not modified so the parsed values can be shared between outputs
+	new_properties = tuple((key, amulet_nbt.from_snbt(val)) for key, val in translate_function["options"].items())
+
+	def new_properties_(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		properties = state.new_data['properties']
+		for key, val in new_properties:
+			properties[key] = val
+	return new_properties_
+
+
+def _compile_carry_properties(translate_function: dict) -> Program:
+	# {
+	# 	"function": "carry_properties",
+	# 	"options": {
+	# 		"<property_name>": ["<property_value"],
+	# 		"<nbt_property_name>": ['<SNBT>']
+	# 	}
+	# }
+	carry_properties = tuple((key, frozenset(_snbt_case_key(val) for val in values)) for key, values in translate_function["options"].items())
+
+	def carry_properties_(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		assert isinstance(block_input, Block), 'The block input is not a block'
+		input_properties = block_input._properties
+		properties = state.new_data['properties']
+		for key, values in carry_properties:
+			if key in input_properties:
+				val = input_properties[key]
+				if isinstance(val, amulet_nbt.BaseValueType) and nbt_case_key(val) in values:
+					properties[key] = val
+	return carry_properties_
+
+
+def _compile_map_properties(translate_function: dict) -> Program:
+	# {
+	# 	"function": "map_properties",
+	# 	"options": {
+	# 		"<property_name>": {
+	# 			"<SNBT>": [
+	# 				<functions>
+	# 			]
+	# 		}
+	# 	}
+	# }
+	# if this is only dependent on the properties it is part of a property table so the nested functions do not need their own
+	property_tables = _property_keys([translate_function]) is None
+	map_properties = tuple(
+		(key, {_snbt_case_key(val): compile_mappings(functions, property_tables) for val, functions in cases.items()})
+		for key, cases in translate_function["options"].items()
+	)
+
+	def map_properties_(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		assert isinstance(block_input, Block), 'The block input is not a block'
+		input_properties = block_input._properties
+		for key, cases in map_properties:
+			if key in input_properties:
+				val = input_properties[key]
+				if isinstance(val, amulet_nbt.BaseValueType):
+					val = nbt_case_key(val)
+					if val in cases:
+						cases[val](state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+	return map_properties_
+
+
+def _compile_multiblock(translate_function: dict) -> Program:
+	# {
+	# 	"function": "multiblock",
+	# 	"options": [
+	# 		{
+	# 			"coords": [dx, dy, dz],
+	# 			"functions": <functions>
+	# 		}
+	# 	]
+	# }
+	multiblocks = translate_function["options"]
+	if isinstance(multiblocks, dict):
+		multiblocks = [multiblocks]
+	multiblocks = tuple((tuple(multiblock['coords']), compile_mappings(multiblock['functions'])) for multiblock in multiblocks)
+
+	def multiblock_(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		if get_block_callback is None:
+			state.cacheable = False
+			state.extra_needed = True
+		else:
+			neighbours = state.neighbours
+			if neighbours is None:
+				state.cacheable = False
+			for (dx, dy, dz), program in multiblocks:
+				new_location = (relative_location[0] + dx, relative_location[1] + dy, relative_location[2] + dz)
+				try:
+					block_input_, nbt_input_ = get_block_callback(new_location)
+				except ChunkLoadError:
+					if neighbours is not None:
+						neighbours.append((new_location, None))
+					continue
+				if neighbours is not None:
+					neighbours.append((new_location, block_input_))
+				try:
+					program(state, block_input_, nbt_input_, get_block_callback, new_location, nbt_path)
+				except ChunkLoadError:
+					continue
+	return multiblock_
+
+
+def _compile_map_block_name(translate_function: dict) -> Program:
+	# {
+	# 	"function": "map_block_name",
+	# 	"options": {
+	# 		"<namespace>:<base_name>": [
+	# 			<functions>
+	# 		]
+	# 	}
+	# }
+	map_block_name = {block_name: compile_mappings(functions) for block_name, functions in translate_function["options"].items()}
+
+	def map_block_name_(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		assert isinstance(block_input, Block), f'The block input {block_input} is not a block'
+		block_name = f'{block_input.namespace}:{block_input.base_name}'
+		if block_name in map_block_name:
+			map_block_name[block_name](state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+	return map_block_name_
+
+
+def _compile_walk_input_nbt(translate_function: dict) -> Program:
+	# This is a special function unlike the others. See _compile_walk_input_nbt_options for more information
+	# {
+	# 	"function": "walk_input_nbt",
+	#   "outer_name": "",  # defaults to this if undefined
+	# 	"options": {
+	# 		"type": "<nbt type>",  # check that the nbt is of this type
+	# 		"self_default": [],  # if the type is different run these functions : defaults to [{"function": "carry_nbt"}] which carries everything
+	# 	    "functions": [],  # functions to run if defined
+	#
+	# 		"keys": {  # only for compound type
+	# 	        str: {nested options format}
+	# 		},
+	#       "index": {  # only for list or array types
+	# 	        str(<int>): {nested options format}     (type should not be defined for nested array types)
+	# 	    },
+	# 	    "nested_default": []  # only for compound, list or array types.
+	# 	        If nested key/index is not in respective dictionary run these functions on them.
+	#           If undefined defaults to [{"function": "carry_nbt"}] which carries everything
+	# 	}
+	# }
+	walk_nbt = _compile_walk_input_nbt_options(translate_function["options"])
+	custom_nbt_path = translate_function.get('path', [])
+	if custom_nbt_path:
+		custom_nbt_path_ = ('', 'compound', custom_nbt_path)
+		custom_nbt_type = datatype_to_nbt(custom_nbt_path[-1][-1])
+
+		def walk_input_nbt(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+			if nbt_input is None:
+				state.cacheable = False
+				state.extra_needed = True
+			else:
+				state.probe_nbt('shape', nbt_input, custom_nbt_path_, relative_location)
+				nbt_temp = index_nbt(nbt_input, custom_nbt_path_)
+				if nbt_temp is None:
+					log.error(f'Expected nbt data at {custom_nbt_path}')
+				elif not isinstance(nbt_temp, custom_nbt_type):
+					log.error(f'Expected nbt data at {custom_nbt_path} to be an {custom_nbt_path[-1][-1]} tag but got {nbt_temp.__class__.__name__}')
 				else:
-					output_name, output_type, new_data, extra_needed, cacheable = _convert_walk_input_nbt(block_input, nbt_input, translate_function["options"], get_block_callback, relative_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-
-		elif 'new_nbt' == function_name:
-			# when used outside walk_input_nbt
-			# {
-			# 	"function": "new_nbt",
-			# 	"options": [
-			# 		{
-			#           "outer_name": "",  # defaults to this if undefined
-			#           "outer_type": "compound",  # defaults to this if undefined
-			# 			"path": [ # optional. Defaults to the root
-			# 				[ < path1 >: Union[str, int], < datatype1 >: str]
-			# 			]
-			# 			"key": <key>: str or int,
-			# 			"value": "<SNBT>"
-			# 		}
-			# 	]
-			# }
-
-			# when used inside walk_input_nbt
-			# {
-			# 	"function": "new_nbt",
-			# 	"options": [
-			# 		{
-			#           "outer_name": "",  # defaults to this if undefined
-			#           "outer_type": "compound",  # defaults to this if undefined
-			# 			"path": [ # optional. [] to be the root, undefined to be the input path
-			# 				[ < path1 >: Union[str, int], < datatype1 >: str]
-			# 			]
-			# 			"key": <key>: Union[str, int],
-			# 			"value": "<SNBT>"
-			# 		}
-			# 	]
-			# }
-
-			new_nbts = translate_function["options"]
-			if isinstance(new_nbts, dict):
-				new_nbts = [new_nbts]
-
-			for new_nbt in new_nbts:
-				if 'path' in new_nbt:
-					path = new_nbt['path']
-				elif nbt_path is None:
-					path = []
-				else:
-					path = nbt_path[2]
-
-				outer_name = new_nbt.get('outer_name', '')
-				outer_type = new_nbt.get('outer_type', 'compound')
-
-				new_data['nbt'].append((outer_name, outer_type, path, new_nbt['key'], amulet_nbt.from_snbt(new_nbt['value'])))
-
-		elif 'carry_nbt' == function_name:
-			# only works within walk_input_nbt
-			# {
-			# 	"function": "carry_nbt",
-			# 	"options": {
-			# 		"outer_name": "",  # defaults to this if undefined
-			# 		"outer_type": "compound",  # defaults to this if undefined
-			# 		"path": [  # [] to be the root, undefined to be the input path
-			# 			[ <path1>: Union[str, int], <datatype1>: str],
-			# 			...
-			# 		],
-			# 		"key": <key>: Union[str, int]  # undefined to remain under the same key/index
-			# 		"type": <type>: str  # undefined to remain as the input type
-			# 	}
-			# }
-			cacheable = False
+					walk_nbt(state, block_input, nbt_input, get_block_callback, relative_location, custom_nbt_path_)
+	else:
+		def walk_input_nbt(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
 			if nbt_input is None:
-				extra_needed = True
-			elif nbt_path is not None:
+				state.cacheable = False
+				state.extra_needed = True
+			else:
+				walk_nbt(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+	return walk_input_nbt
+
+
+def _compile_walk_input_nbt_options(mappings: dict) -> Program:
+	datatype = mappings['type']
+	nbt_class = datatype_to_nbt(datatype)
+	functions = compile_mappings(mappings['functions']) if 'functions' in mappings else None
+	self_default = compile_mappings(mappings['self_default']) if 'self_default' in mappings else None
+	nested_default = compile_mappings(mappings['nested_default']) if 'nested_default' in mappings else None
+	log_unaccounted = list(mappings.get('nested_default', ())) == [{"function": "carry_nbt"}]
+	keys = {key: _compile_walk_input_nbt_options(val) for key, val in mappings.get('keys', {}).items()}
+	indexes = {index: _compile_walk_input_nbt_options(val) for index, val in mappings.get('index', {}).items()}
+	nested_datatype = datatype.replace('_array', '')
+
+	def walk_nbt(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		if nbt_path is None:
+			nbt_path = ('', 'compound', [])
+
+		state.probe_nbt('shape', nbt_input, nbt_path, relative_location)
+		nbt = index_nbt(nbt_input, nbt_path)  # nbt_path should always exist in nbt_input because the calling code should check that
+
+		if functions is not None:
+			# run functions if present
+			functions(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+
+		if isinstance(nbt, nbt_class):
+			# datatypes match
+			if datatype == 'compound':
+				for key in nbt.value:
+					if key in keys:
+						keys[key](state, block_input, nbt_input, get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(key, nbt_to_datatype(nbt.value[key]))]))
+					elif nested_default is not None:
+						if log_unaccounted:
+							log.info(f'Unnaccounted data at {(nbt_path[0], nbt_path[1], nbt_path[2] + [(key, nbt_to_datatype(nbt.value[key]))])}')
+						nested_default(state, block_input, nbt_input, get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(key, nbt_to_datatype(nbt.value[key]))]))
+
+			elif datatype == 'list':
+				for index in range(len(nbt)):
+					if str(index) in indexes:
+						indexes[str(index)](state, block_input, nbt_input, get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nbt_to_datatype(nbt.value[index]))]))
+					elif nested_default is not None:
+						if log_unaccounted:
+							log.info(f'Unnaccounted data at {(nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nbt_to_datatype(nbt.value[index]))])}')
+						nested_default(state, block_input, nbt_input, get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nbt_to_datatype(nbt.value[index]))]))
+
+			elif datatype in ('byte_array', 'int_array', 'long_array'):
+				for index in range(len(nbt)):
+					if str(index) in indexes:
+						indexes[str(index)](state, block_input, nbt_input, get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nested_datatype)]))
+					elif nested_default is not None:
+						nested_default(state, block_input, nbt_input, get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nested_datatype)]))
+
+		elif self_default is not None:
+			# datatypes do not match. Run self_default
+			self_default(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+	return walk_nbt
+
+
+def _compile_new_nbt(translate_function: dict) -> Program:
+	# when used outside walk_input_nbt
+	# {
+	# 	"function": "new_nbt",
+	# 	"options": [
+	# 		{
+	#           "outer_name": "",  # defaults to this if undefined
+	#           "outer_type": "compound",  # defaults to this if undefined
+	# 			"path": [ # optional. Defaults to the root
+	# 				[ < path1 >: Union[str, int], < datatype1 >: str]
+	# 			]
+	# 			"key": <key>: str or int,
+	# 			"value": "<SNBT>"
+	# 		}
+	# 	]
+	# }
+
+	# when used inside walk_input_nbt
+	# {
+	# 	"function": "new_nbt",
+	# 	"options": [
+	# 		{
+	#           "outer_name": "",  # defaults to this if undefined
+	#           "outer_type": "compound",  # defaults to this if undefined
+	# 			"path": [ # optional. [] to be the root, undefined to be the input path
+	# 				[ < path1 >: Union[str, int], < datatype1 >: str]
+	# 			]
+	# 			"key": <key>: Union[str, int],
+	# 			"value": "<SNBT>"
+	# 		}
+	# 	]
+	# }
+	new_nbts = translate_function["options"]
+	if isinstance(new_nbts, dict):
+		new_nbts = [new_nbts]
+	new_nbts = tuple(
+		(new_nbt.get('outer_name', ''), new_nbt.get('outer_type', 'compound'), new_nbt.get('path'), new_nbt['key'], amulet_nbt.from_snbt(new_nbt['value']))
+		for new_nbt in new_nbts
+	)
+
+	def new_nbt_(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		for outer_name, outer_type, path, key, value in new_nbts:
+			if path is None:
+				path = [] if nbt_path is None else nbt_path[2]
+			state.new_data['nbt'].append((outer_name, outer_type, path, key, copy_nbt(value)))
+	return new_nbt_
+
+
+def _compile_carry_nbt(translate_function: dict) -> Program:
+	# only works within walk_input_nbt
+	# {
+	# 	"function": "carry_nbt",
+	# 	"options": {
+	# 		"outer_name": "",  # defaults to this if undefined
+	# 		"outer_type": "compound",  # defaults to this if undefined
+	# 		"path": [  # [] to be the root, undefined to be the input path
+	# 			[ <path1>: Union[str, int], <datatype1>: str],
+	# 			...
+	# 		],
+	# 		"key": <key>: Union[str, int]  # undefined to remain under the same key/index
+	# 		"type": <type>: str  # undefined to remain as the input type
+	# 	}
+	# }
+	options = translate_function.get('options', {})
+	outer_name = options.get('outer_name', '')
+	outer_type = options.get('outer_type', 'compound')
+	carry_path = options.get('path')
+	carry_key = options.get('key')
+	carry_type = options.get('type')
+
+	def carry_nbt(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		if nbt_input is None:
+			state.cacheable = False
+			state.extra_needed = True
+		elif nbt_path is None:
+			state.cacheable = False
+		else:
+			nbt = index_nbt(nbt_input, nbt_path)
+			if nbt is None:
+				raise Exception('This code should not be run because it should be caught by other code before it gets here.')
+			val = nbt.value
+
+			path = nbt_path[2][:-1] if carry_path is None else carry_path
+			key = nbt_path[2][-1][0] if carry_key is None else carry_key
+			nbt_type = nbt_path[2][-1][1] if carry_type is None else carry_type
+
+			# TODO: some kind of check to make sure that the input data type nbt_path[-1][1] can be cast to nbt_type
+				# perhaps this should be done in the compiler rather than at runtime
+			if state.nbt_probes is None or relative_location != (0, 0, 0):
+				state.cacheable = False
+			else:
+				# the structure was read by walk_input_nbt. The value is copied from the new input when the result is reused
+				state.carried.append((len(state.new_data['nbt']), (nbt_path[0], nbt_path[1], tuple(nbt_path[2])), nbt_type))
+			state.new_data['nbt'].append((outer_name, outer_type, path, key, datatype_to_nbt(nbt_type)(val)))
+	return carry_nbt
+
+
+def _compile_map_nbt(translate_function: dict) -> Program:
+	# {
+	# 	"function": "map_nbt",
+	# 	"options": {  # based on the input nbt value at path (should only be used with end stringable datatypes)
+	# 		"cases": {},  # if the data is in here then do the nested functions
+	# 		"default": []  # if the data is not in cases or cases is not defined then do these functions
+	# 	}
+	# }
+	options = translate_function["options"]
+	# the cases are keyed by snbt in the mapping files. Look them up by nbt_case_key so the input does not need to be serialised
+	cases = {_snbt_case_key(nbt_hash): compile_mappings(functions) for nbt_hash, functions in options['cases'].items()} if 'cases' in options else None
+	default = compile_mappings(options['default']) if 'default' in options else None
+
+	def map_nbt(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		if nbt_input is None:
+			state.cacheable = False
+			state.extra_needed = True
+		elif nbt_path is None:
+			state.cacheable = False
+		else:
+			run_default = True
+			if cases is not None:
+				state.probe_nbt('value', nbt_input, nbt_path, relative_location)
 				nbt = index_nbt(nbt_input, nbt_path)
-				if nbt is None:
-					raise Exception('This code should not be run because it should be caught by other code before it gets here.')
-				val = nbt.value
-
-				options = translate_function.get('options', {})
-				outer_name = options.get('outer_name', '')
-				outer_type = options.get('outer_type', 'compound')
-				path = options.get('path', nbt_path[2][:-1])
-				key = options.get('key', nbt_path[2][-1][0])
-				nbt_type = options.get('type', nbt_path[2][-1][1])
-
-				# TODO: some kind of check to make sure that the input data type nbt_path[-1][1] can be cast to nbt_type
-					# perhaps this should be done in the compiler rather than at runtime
-				new_data['nbt'].append((outer_name, outer_type, path, key, datatype_to_nbt(nbt_type)(val)))
-
-		elif 'map_nbt' == function_name:
-			# {
-			# 	"function": "map_nbt",
-			# 	"options": {  # based on the input nbt value at path (should only be used with end stringable datatypes)
-			# 		"cases": {},  # if the data is in here then do the nested functions
-			# 		"default": []  # if the data is not in cases or cases is not defined then do these functions
-			# 	}
-			# }
-
-			cacheable = False
-			if nbt_input is None:
-				extra_needed = True
-			elif nbt_path is not None:
-				run_default = True
-				if 'cases' in translate_function["options"]:
-					nbt = index_nbt(nbt_input, nbt_path)
-					nbt_hash = nbt.to_snbt()
-					if nbt_hash in translate_function["options"]['cases']:
-						output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, translate_function["options"]['cases'][nbt_hash], get_block_callback, relative_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-						run_default = False
-
-				if run_default and "default" in translate_function["options"]:
-					output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, translate_function["options"]['default'], get_block_callback, relative_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-
-		elif 'code' == function_name:
-			# {
-			# 	"function": "code",  # when all the other functions fail you this should do what you need. Use as sparingly as possible
-			# 	"options": {
-			# 		"input": ["namespace", "base_name", "properties", "nbt"],  # all of these inputs and output are optional. Change these lists to modify
-			# 		"output": ["output_name", "output_type", "new_properties", "new_nbt"],
-			# 		"function": "function_name"  # this links to a lua funciton in the lua directory with the file name function_name.lua
-			# 	}
-			# }
-
-			# this function was originally designed to be lua code but I have now switched it to python because lua is hard :(
-			# Might swap back one day
-			# this would be in function_name.py
-			# def main(namespace, base_name, properties, nbt)
-			#   return "minecraft:air", "block", {"property_name": "property_name"}, []
-
-			# usage examples:
-			#   splitting and merging strings in signs
-
-			cacheable = False
-
-			options = translate_function["options"]
-
-			function_inputs = []
-			for inp in options.get("input", []):
-				if inp == "namspace":
-					function_inputs.append(block_input.namespace)
-				elif inp == "base_name":
-					function_inputs.append(block_input.base_name)
-				elif inp == "properties":
-					function_inputs.append(block_input.properties)
-				elif inp == "nbt":
-					if nbt_input is None:
-						extra_needed = True
-						function_inputs.append(["compound", {}])
-					else:
-						function_inputs.append(objectify_nbt(nbt_input))
-
-			function_output = code_functions.run(options["function"], function_inputs)
-			if not isinstance(function_output, tuple):
-				function_output = (function_output, )
-
-			for out, out_name in zip(function_output, options["output"]):
-				if out_name == 'output_name':
-					assert isinstance(out, str)
-					output_name = out
-				elif out_name == 'output_type':
-					assert isinstance(out, str)
-					output_type = out
-				elif out_name == 'new_properties':
-					assert isinstance(out, dict)
-					for key, val in out.items():
-						new_data['properties'][key] = amulet_nbt.from_snbt(val)
-				elif out_name == 'new_nbt':
-					assert isinstance(out, list)
-					for val in out:
-						assert len(val) == 5
-						new_data['nbt'].append(tuple(val[:4]) + (unobjectify_nbt(val[4]), ))
-
-	return output_name, output_type, new_data, extra_needed, cacheable
+				nbt_hash = nbt_case_key(nbt)
+				if nbt_hash in cases:
+					cases[nbt_hash](state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+					run_default = False
+
+			if run_default and default is not None:
+				default(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path)
+	return map_nbt
+
+
+def _compile_code(translate_function: dict) -> Program:
+	# {
+	# 	"function": "code",  # when all the other functions fail you this should do what you need. Use as sparingly as possible
+	# 	"options": {
+	# 		"input": ["namespace", "base_name", "properties", "nbt"],  # all of these inputs and output are optional. Change these lists to modify
+	# 		"output": ["output_name", "output_type", "new_properties", "new_nbt"],
+	# 		"function": "function_name"  # this links to a lua funciton in the lua directory with the file name function_name.lua
+	# 	}
+	# }
+
+	# this function was originally designed to be lua code but I have now switched it to python because lua is hard :(
+	# Might swap back one day
+	# this would be in function_name.py
+	# def main(namespace, base_name, properties, nbt)
+	#   return "minecraft:air", "block", {"property_name": "property_name"}, []
+
+	# usage examples:
+	#   splitting and merging strings in signs
+	options = translate_function["options"]
+	inputs = tuple(options.get("input", []))
+	outputs = tuple(options["output"])
+	function_name = options["function"]
+
+	def code(state, block_input, nbt_input, get_block_callback, relative_location, nbt_path):
+		state.cacheable = False
+
+		function_inputs = []
+		for inp in inputs:
+			if inp == "namspace":
+				function_inputs.append(block_input.namespace)
+			elif inp == "base_name":
+				function_inputs.append(block_input.base_name)
+			elif inp == "properties":
+				function_inputs.append(block_input.properties)
+			elif inp == "nbt":
+				if nbt_input is None:
+					state.extra_needed = True
+					function_inputs.append(["compound", {}])
+				else:
+					function_inputs.append(objectify_nbt(nbt_input))
+
+		function_output = code_functions.run(function_name, function_inputs)
+		if not isinstance(function_output, tuple):
+			function_output = (function_output, )
+
+		for out, out_name in zip(function_output, outputs):
+			if out_name == 'output_name':
+				assert isinstance(out, str)
+				state.output_name = out
+			elif out_name == 'output_type':
+				assert isinstance(out, str)
+				state.output_type = out
+			elif out_name == 'new_properties':
+				assert isinstance(out, dict)
+				for key, val in out.items():
+					state.new_data['properties'][key] = _property_from_snbt(val)
+			elif out_name == 'new_nbt':
+				assert isinstance(out, list)
+				for val in out:
+					assert len(val) == 5
+					state.new_data['nbt'].append(tuple(val[:4]) + (unobjectify_nbt(val[4]), ))
+	return code
+
+
+_function_compilers: Dict[str, Callable[[dict], Program]] = {
+	'new_block': _compile_new_block,
+	'new_entity': _compile_new_entity,
+	'new_properties': _compile_new_properties,
+	'carry_properties': _compile_carry_properties,
+	'map_properties': _compile_map_properties,
+	'multiblock': _compile_multiblock,
+	'map_block_name': _compile_map_block_name,
+	'walk_input_nbt': _compile_walk_input_nbt,
+	'new_nbt': _compile_new_nbt,
+	'carry_nbt': _compile_carry_nbt,
+	'map_nbt': _compile_map_nbt,
+	'code': _compile_code
+}
 
 
 def objectify_nbt(nbt: NBTFile) -> Tuple[str, dict]:
@@ -696,89 +1249,3 @@ def unobjectify_nbt(nbt: Tuple[str, Union[dict, list, int, str, 'ndarray']]):
 		return nbt_class([unobjectify_nbt(val) for val in nbt])
 	elif nbt_type in ['byte', 'short', 'int', 'long', 'float', 'double', 'string', 'byte_array', 'int_array', 'long_array']:
 		return nbt_class(nbt)
-
-
-def _convert_walk_input_nbt(block_input: Union[Block, None], nbt_input: Union[NBTFile, None], mappings: dict, get_block_callback: Callable, relative_location: Tuple[int, int, int] = None, nbt_path: Tuple[str, str, List[Tuple[Union[str, int], str]]] = None, inherited_data: Tuple[Union[str, None], Union[str, None], dict, bool, bool] = None) -> Tuple[Union[str, None], Union[str, None], dict, bool, bool]:
-	if nbt_path is None:
-		nbt_path = ('', 'compound', [])
-	if inherited_data is not None:
-		output_name, output_type, new_data, extra_needed, cacheable = inherited_data
-	else:
-		output_name = None
-		output_type = None
-		new_data = {
-			'properties': {},
-			'nbt': []
-		}  # There could be multiple 'new_block' functions in the mappings so new properties are put in here and merged at the very end
-		new_data['nbt']: List[
-			List[
-				str,
-				str,
-				List[
-					Union[str, int], str
-				],
-				Union[str, int],
-				Union[TAG_Byte, TAG_Short, TAG_Int, TAG_Long, TAG_Float, TAG_Double, TAG_Byte_Array, TAG_String, TAG_List, TAG_Compound, TAG_Int_Array, TAG_Long_Array]
-			]
-		]
-		"""
-		new['nbt'] = [
-			[
-				[
-					[path0, type0],
-					[path1, type1],
-					...
-				],
-				path_n,
-				NBT
-			],
-			...
-		]
-		"""
-		extra_needed = False  # used to determine if extra data is required (and thus to do block by block)
-		cacheable = True    # cacheable until proven otherwise
-
-	nbt = index_nbt(nbt_input, nbt_path)  # nbt_path should always exist in nbt_input because the calling code should check that
-
-	datatype = mappings['type']
-
-	if 'functions' in mappings:
-		# run functions if present
-		output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, mappings['functions'], get_block_callback, relative_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-
-	if isinstance(nbt, datatype_to_nbt(datatype)):
-		# datatypes match
-		if datatype == 'compound':
-			for key in nbt.value:
-				if key in mappings.get('keys', {}):
-					output_name, output_type, new_data, extra_needed, cacheable = _convert_walk_input_nbt(block_input, nbt_input, mappings['keys'][key], get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(key, nbt_to_datatype(nbt.value[key]))]), (output_name, output_type, new_data, extra_needed, cacheable))
-				elif 'nested_default' in mappings:
-					if mappings['nested_default'] == [{"function": "carry_nbt"}]:
-						log.info(f'Unnaccounted data at {(nbt_path[0], nbt_path[1], nbt_path[2] + [(key, nbt_to_datatype(nbt.value[key]))])}')
-					output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, mappings['nested_default'], get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(key, nbt_to_datatype(nbt.value[key]))]), (output_name, output_type, new_data, extra_needed, cacheable))
-
-		elif datatype == 'list':
-			for index in range(len(nbt)):
-				if str(index) in mappings.get('index', {}):
-					output_name, output_type, new_data, extra_needed, cacheable = _convert_walk_input_nbt(block_input, nbt_input, mappings['index'][str(index)], get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nbt_to_datatype(nbt.value[index]))]), (output_name, output_type, new_data, extra_needed, cacheable))
-				elif 'nested_default' in mappings:
-					if mappings['nested_default'] == [{"function": "carry_nbt"}]:
-						log.info(f'Unnaccounted data at {(nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nbt_to_datatype(nbt.value[index]))])}')
-					output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, mappings['nested_default'], get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nbt_to_datatype(nbt.value[index]))]), (output_name, output_type, new_data, extra_needed, cacheable))
-
-		# elif datatype in ('byte', 'short', 'int', 'long', 'float', 'double', 'string'):
-		# 	pass
-
-		elif datatype in ('byte_array', 'int_array', 'long_array'):
-			nested_datatype = datatype.replace('_array', '')
-			for index in range(len(nbt)):
-				if str(index) in mappings.get('index', {}):
-					output_name, output_type, new_data, extra_needed, cacheable = _convert_walk_input_nbt(block_input, nbt_input, mappings['index'][str(index)], get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nested_datatype)]), (output_name, output_type, new_data, extra_needed, cacheable))
-				elif 'nested_default' in mappings:
-					output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, mappings['nested_default'], get_block_callback, relative_location, (nbt_path[0], nbt_path[1], nbt_path[2] + [(index, nested_datatype)]), (output_name, output_type, new_data, extra_needed, cacheable))
-
-	elif 'self_default' in mappings:
-		# datatypes do not match. Run self_default
-		output_name, output_type, new_data, extra_needed, cacheable = _translate(block_input, nbt_input, mappings['self_default'], get_block_callback, relative_location, nbt_path, (output_name, output_type, new_data, extra_needed, cacheable))
-
-	return output_name, output_type, new_data, extra_needed, cacheable
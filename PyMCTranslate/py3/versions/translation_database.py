@@ -1,8 +1,13 @@
-from typing import List, Tuple, Union, Callable, TYPE_CHECKING
+from typing import List, Tuple, Union, Callable, Dict, Sequence, Iterable, TYPE_CHECKING
 import copy
+import sys
+import numpy
+import amulet_nbt
 
-from PyMCTranslate import Block, BlockEntity, Entity, Item, BlockItem, minified, json_atlas, log
-from ..versions.translate import translate
+from PyMCTranslate import Block, BlockEntity, Entity, Item, BlockItem, ChunkLoadError, log
+from PyMCTranslate.py3.util import FrozenDict, thaw
+from ..versions.translate import translate, compile_mappings, Program, NBTMemo
+from .cache import LRUCache, sizeof
 
 if TYPE_CHECKING:
     from ..versions import Version
@@ -14,6 +19,12 @@ class BaseTranslator:
         self._universal_format = universal_format
         self._database = database
         self._mode = mode
+        # creates a cache with the limits set in the TranslationManager
+        self._new_cache = parent_version.translation_manager.new_cache
+        # mapping files compiled with compile_mappings. (block_format, direction, namespace, base_name)
+        self._programs: Dict[Tuple[str, str, str, str], Program] = {}
+        # the snbt in specifications parsed to nbt. (block_format, namespace, base_name)
+        self._parsed_specifications: Dict[Tuple[str, str, str], Tuple[Dict[str, amulet_nbt.BaseValueType], Union[amulet_nbt.BaseValueType, None]]] = {}
 
     def _format_key(self, force_blockstate):
         return 'numerical' if not force_blockstate and self._parent_version.has_abstract_format else 'blockstate'
@@ -22,13 +33,15 @@ class BaseTranslator:
             self,
             object_input: Union[Block, Entity],
             input_spec: dict,
-            mappings: List[dict],
+            mappings: Program,
             output_version: 'Version',
             force_blockstate: bool,
             translation_direction: str,
             get_block_callback: Callable[[Tuple[int, int, int]], Tuple[Block, Union[None, BlockEntity]]] = None,
             extra_input: BlockEntity = None,
-            pre_populate_defaults: bool = True
+            pre_populate_defaults: bool = True,
+            neighbours: List[Tuple[Tuple[int, int, int], Union[Block, None]]] = None,
+            nbt_memo: NBTMemo = None
     ) -> Union[
         Tuple[Block, None, bool, bool],
         Tuple[Block, BlockEntity, bool, bool],
@@ -43,7 +56,9 @@ class BaseTranslator:
                 force_blockstate,
                 get_block_callback,
                 extra_input,
-                pre_populate_defaults
+                pre_populate_defaults,
+                neighbours,
+                nbt_memo
             )
             return output, extra_output, extra_needed, cacheable
         except Exception as e:
@@ -81,12 +96,38 @@ class BaseTranslator:
             )[namespace].keys()
         )
 
-    @staticmethod
-    def _get_data(data):
-        if minified:
-            return copy.deepcopy(json_atlas[data])
-        else:
-            return copy.deepcopy(data)
+    def _get_raw_data(self, direction: str, namespace: str, base_name: str, force_blockstate: bool):
+        """Get the frozen data for the requested object without copying it."""
+        return self._database.get(
+            self._format_key(force_blockstate), {}
+        ).get(
+            direction, {}
+        )[namespace][base_name]
+
+    def _get_specification(self, namespace: str, base_name: str, force_blockstate: bool = False) -> FrozenDict:
+        """
+        Get the specification for the requested object without copying it.
+        This is for internal use. The returned data is immutable. Use get_specification for a mutable copy.
+        """
+        try:
+            return self._get_raw_data('specification', namespace, base_name, force_blockstate)
+        except KeyError:
+            raise KeyError(f'Specification for {self._mode} {self._format_key(force_blockstate)} {namespace}:{base_name} does not exist in {self._parent_version}')
+
+    def _get_parsed_specification(self, namespace: str, base_name: str, force_blockstate: bool = False) -> Tuple[Dict[str, amulet_nbt.BaseValueType], Union[amulet_nbt.BaseValueType, None]]:
+        """
+        Get the default properties and nbt template from the specification parsed from snbt.
+        These are parsed the first time they are requested and shared after that so they must not be modified.
+        :return: The default properties and the nbt template or None if the specification does not define one
+        """
+        key = (self._format_key(force_blockstate), namespace, base_name)
+        if key not in self._parsed_specifications:
+            spec = self._get_specification(namespace, base_name, force_blockstate)
+            self._parsed_specifications[key] = (
+                {prop: amulet_nbt.from_snbt(val) for prop, val in spec.get('defaults', {}).items()},
+                amulet_nbt.from_snbt(spec['snbt']) if 'snbt' in spec else None
+            )
+        return self._parsed_specifications[key]
 
     def get_specification(self, namespace: str, base_name: str, force_blockstate: bool = False) -> dict:
         """
@@ -94,17 +135,9 @@ class BaseTranslator:
         :param namespace: A namespace string as found using the namespaces method
         :param base_name: A base name string as found using the base_name method
         :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
-        :return: A dictionary containing the specification for the object
+        :return: A dictionary containing the specification for the object. This is a copy that can be modified.
         """
-        try:
-            data = self._database.get(
-                self._format_key(force_blockstate), {}
-            ).get(
-                'specification', {}
-            )[namespace][base_name]
-            return self._get_data(data)
-        except KeyError:
-            raise KeyError(f'Specification for {self._mode} {self._format_key(force_blockstate)} {namespace}:{base_name} does not exist in {self._parent_version}')
+        return thaw(self._get_specification(namespace, base_name, force_blockstate))
 
     def get_mapping_to_universal(self, namespace: str, base_name: str, force_blockstate: bool = False) -> List[dict]:
         """
@@ -112,15 +145,10 @@ class BaseTranslator:
         :param namespace: A namespace string as found using the namespaces method
         :param base_name: A base name string as found using the base_name method
         :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
-        :return: A list of mapping functions to apply to the object
+        :return: A list of mapping functions to apply to the object. This is a copy that can be modified.
         """
         try:
-            data = self._database.get(
-                self._format_key(force_blockstate), {}
-            ).get(
-                'to_universal', {}
-            )[namespace][base_name]
-            return self._get_data(data)
+            return thaw(self._get_raw_data('to_universal', namespace, base_name, force_blockstate))
         except KeyError:
             raise KeyError(f'Mapping to universal for {self._mode} {self._format_key(force_blockstate)} {namespace}:{base_name} does not exist in {self._parent_version}')
 
@@ -130,18 +158,32 @@ class BaseTranslator:
         :param namespace: A namespace string as found using the namespaces method
         :param base_name: A base name string as found using the base_name method
         :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
-        :return: A list of mapping functions to apply to the object
+        :return: A list of mapping functions to apply to the object. This is a copy that can be modified.
         """
         try:
-            data = self._database.get(
-                self._format_key(force_blockstate), {}
-            ).get(
-                'from_universal', {}
-            )[namespace][base_name]
-            return self._get_data(data)
+            return thaw(self._get_raw_data('from_universal', namespace, base_name, force_blockstate))
         except KeyError:
             raise KeyError(f'Mapping from universal for {self._mode} {self._format_key(force_blockstate)} {namespace}:{base_name} does not exist in {self._parent_version}')
 
+    def _get_program(self, direction: str, namespace: str, base_name: str, force_blockstate: bool) -> Program:
+        """
+        Get the compiled mapping for the requested object.
+        The mapping is compiled the first time it is requested and reused after that.
+        :param direction: 'to_universal' or 'from_universal'
+        :param namespace: A namespace string as found using the namespaces method
+        :param base_name: A base name string as found using the base_name method
+        :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
+        :return: The compiled mapping. Raises a KeyError if the mapping does not exist
+        """
+        key = (self._format_key(force_blockstate), direction, namespace, base_name)
+        if key not in self._programs:
+            try:
+                mapping = self._get_raw_data(direction, namespace, base_name, force_blockstate)
+            except KeyError:
+                raise KeyError(f'Mapping {direction} for {self._mode} {self._format_key(force_blockstate)} {namespace}:{base_name} does not exist in {self._parent_version}')
+            self._programs[key] = compile_mappings(mapping)
+        return self._programs[key]
+
     def to_universal(self, *args, **kwargs):
         raise NotImplementedError
 
@@ -149,15 +191,143 @@ class BaseTranslator:
         raise NotImplementedError
 
 
+class _NeighbourNode:
+    """
+    A node in the cache of results that depend on neighbouring blocks.
+    Each node reads the block at one relative location and branches on the block found there.
+    The branches are either another node or the cached result.
+    """
+    __slots__ = ('location', 'branches')
+
+    def __init__(self, location: Tuple[int, int, int]):
+        self.location = location
+        self.branches: Dict[Union[Block, None], Union['_NeighbourNode', Tuple[Union[Block, Entity], Union[BlockEntity, None], bool]]] = {}
+
+    def __sizeof__(self):
+        # the node and its branch dictionary but not the branches themselves. Those are counted as they are added
+        return object.__sizeof__(self) + sys.getsizeof(self.branches)
+
+    def get(
+            self,
+            get_block_callback: Callable[[Tuple[int, int, int]], Tuple[Block, Union[None, BlockEntity]]]
+    ) -> Union[Tuple[Union[Block, Entity], Union[BlockEntity, None], bool], None]:
+        """Walk the tree reading the neighbours with get_block_callback. Returns the cached result or None if there is not one."""
+        node = self
+        while isinstance(node, _NeighbourNode):
+            try:
+                block = get_block_callback(node.location)[0]
+            except ChunkLoadError:
+                block = None
+            if block not in node.branches:
+                return None
+            node = node.branches[block]
+        return node
+
+    def add(
+            self,
+            neighbours: List[Tuple[Tuple[int, int, int], Union[Block, None]]],
+            result: Tuple[Union[Block, Entity], Union[BlockEntity, None], bool]
+    ) -> int:
+        """
+        Add a result to the tree under the neighbours that were read to get it. The first neighbour must be at this node's location.
+        :return: The estimated number of bytes the tree grew by so that the cache holding it can be updated
+        """
+        nbytes = 0
+        node = self
+        for index, (location, block) in enumerate(neighbours):
+            if node.location != location:
+                # the mapping read a different location to the one it read before. This should not happen
+                break
+            branches = node.branches
+            nbytes -= sys.getsizeof(branches)
+            if block in branches:
+                old = branches[block]
+            else:
+                old = None
+                nbytes += sizeof(block)
+            if index == len(neighbours) - 1:
+                if old is not None:
+                    nbytes -= sizeof(old)
+                branches[block] = result
+                nbytes += sizeof(result) + sys.getsizeof(branches)
+            else:
+                if not isinstance(old, _NeighbourNode):
+                    if old is not None:
+                        nbytes -= sizeof(old)
+                    old = branches[block] = _NeighbourNode(neighbours[index + 1][0])
+                    nbytes += sizeof(old)
+                nbytes += sys.getsizeof(branches)
+                node = old
+        return nbytes
+
+
 class BlockTranslator(BaseTranslator):
     def __init__(self, parent_version: 'Version', universal_format: 'Version', database: dict):
         super().__init__(parent_version, universal_format, database, 'block')
-        self._cache = {  # only blocks without a block entity can be cached
-            ('to_universal', False): {},
-            ('to_universal', True): {},
-            ('from_universal', False): {},
-            ('from_universal', True): {}
+        self._cache: Dict[Tuple[str, bool], LRUCache] = {  # only blocks without a block entity can be cached
+            ('to_universal', False): self._new_cache(),
+            ('to_universal', True): self._new_cache(),
+            ('from_universal', False): self._new_cache(),
+            ('from_universal', True): self._new_cache()
+        }
+        # results of blocks that read their neighbours keyed by the block and then the neighbours that were read
+        self._neighbour_cache: Dict[Tuple[str, bool], LRUCache] = {
+            ('to_universal', False): self._new_cache(),
+            ('to_universal', True): self._new_cache(),
+            ('from_universal', False): self._new_cache(),
+            ('from_universal', True): self._new_cache()
         }
+        # results of blocks with a block entity keyed by the block and then the nbt the mapping read
+        self._nbt_memo: Dict[Tuple[str, bool], NBTMemo] = {
+            ('to_universal', False): NBTMemo(self._new_cache()),
+            ('to_universal', True): NBTMemo(self._new_cache()),
+            ('from_universal', False): NBTMemo(self._new_cache()),
+            ('from_universal', True): NBTMemo(self._new_cache())
+        }
+
+    def _translate_cached(
+            self,
+            direction: str,
+            translate: Callable,
+            object_input: 'Block',
+            get_block_callback: Union[Callable[[Tuple[int, int, int]], Tuple[Block, Union[None, BlockEntity]]], None],
+            force_blockstate: bool,
+            extra_input: Union['BlockEntity', None]
+    ) -> Union[
+        Tuple[Block, None, bool],
+        Tuple[Block, BlockEntity, bool],
+        Tuple[Entity, None, bool]
+    ]:
+        assert isinstance(object_input, Block), 'Input object must be a block'
+        cache_key = (direction, force_blockstate)
+        neighbours = None
+        if extra_input is None:
+            result = self._cache[cache_key].get(object_input)
+            if result is not None:
+                return result
+            if get_block_callback is not None:
+                node = self._neighbour_cache[cache_key].get(object_input)
+                if node is not None:
+                    result = node.get(get_block_callback)
+                    if result is not None:
+                        return result
+                neighbours = []
+        else:
+            assert isinstance(extra_input, BlockEntity), 'extra_input must be None or a BlockEntity'
+
+        output, extra_output, extra_needed, cacheable = translate(object_input, get_block_callback, force_blockstate, extra_input, neighbours)
+
+        if cacheable:
+            if neighbours:
+                neighbour_cache = self._neighbour_cache[cache_key]
+                node = neighbour_cache.get(object_input)
+                if node is None:
+                    node = neighbour_cache[object_input] = _NeighbourNode(neighbours[0][0])
+                neighbour_cache.resize(object_input, node.add(neighbours, (output, extra_output, extra_needed)))
+            else:
+                self._cache[cache_key][object_input] = output, extra_output, extra_needed
+
+        return output, extra_output, extra_needed
 
     def to_universal(
             self,
@@ -180,22 +350,33 @@ class BlockTranslator(BaseTranslator):
             extra_output - None or BlockEntity if there is a BlockEntity to return (only if output is Block)
             extra_needed - bool specifying if the location is needed to fully define the output
         """
-        assert isinstance(object_input, Block), 'Input object must be a block'
-        cache_key = ('to_universal', force_blockstate)
-        if extra_input is None:
-            if object_input in self._cache[cache_key]:
-                return self._cache[cache_key][object_input]
-        else:
-            assert isinstance(extra_input, BlockEntity), 'extra_input must be None or a BlockEntity'
+        return self._translate_cached('to_universal', self._translate_to_universal, object_input, get_block_callback, force_blockstate, extra_input)
 
+    def _translate_to_universal(
+            self,
+            object_input: 'Block',
+            get_block_callback: Callable[[Tuple[int, int, int]], Tuple[Block, Union[None, BlockEntity]]],
+            force_blockstate: bool,
+            extra_input: Union['BlockEntity', None],
+            neighbours: List[Tuple[Tuple[int, int, int], Union[Block, None]]] = None
+    ) -> Union[
+        Tuple[Block, None, bool, bool],
+        Tuple[Block, BlockEntity, bool, bool]
+    ]:
+        """
+        Translate a Block to the Universal format without using the block cache.
+        Blocks with a block entity are looked up in and stored in the nbt memo.
+        :param neighbours: see translate
+        :return: output, extra_output, extra_needed, cacheable
+        """
         try:
-            input_spec = self.get_specification(object_input.namespace, object_input.base_name, force_blockstate)
-            mapping = self.get_mapping_to_universal(object_input.namespace, object_input.base_name, force_blockstate)
+            input_spec = self._get_specification(object_input.namespace, object_input.base_name, force_blockstate)
+            mapping = self._get_program('to_universal', object_input.namespace, object_input.base_name, force_blockstate)
         except KeyError:
             log.warning(f'Could not find translation information for {self._mode} {object_input} to universal in {self._parent_version}. If this is not a vanilla block ignore this message')
-            return object_input, extra_input, False
+            return object_input, extra_input, False, False
 
-        output, extra_output, extra_needed, cacheable = self._translate(
+        return self._translate(
             object_input,
             input_spec,
             mapping,
@@ -203,14 +384,11 @@ class BlockTranslator(BaseTranslator):
             True,
             'to universal',
             get_block_callback,
-            extra_input
+            extra_input,
+            neighbours=neighbours,
+            nbt_memo=self._nbt_memo[('to_universal', force_blockstate)]
         )
 
-        if cacheable:
-            self._cache[cache_key][object_input] = output, extra_output, extra_needed
-
-        return output, extra_output, extra_needed
-
     def from_universal(
             self,
             object_input: 'Block',
@@ -233,25 +411,37 @@ class BlockTranslator(BaseTranslator):
             extra_output - None or BlockEntity if there is a BlockEntity to return (only if output is Block)
             extra_needed - bool specifying if the location is needed to fully define the output
         """
-        assert isinstance(object_input, Block), 'Input object must be a block'
-        cache_key = ('from_universal', force_blockstate)
-        if extra_input is None:
-            if object_input in self._cache[cache_key]:
-                return self._cache[cache_key][object_input]
-        else:
-            assert isinstance(extra_input, BlockEntity), 'extra_input must be None or a BlockEntity'
+        return self._translate_cached('from_universal', self._translate_from_universal, object_input, get_block_callback, force_blockstate, extra_input)
 
+    def _translate_from_universal(
+            self,
+            object_input: 'Block',
+            get_block_callback: Callable[[Tuple[int, int, int]], Tuple[Block, Union[None, BlockEntity]]],
+            force_blockstate: bool,
+            extra_input: Union['BlockEntity', None],
+            neighbours: List[Tuple[Tuple[int, int, int], Union[Block, None]]] = None
+    ) -> Union[
+        Tuple[Block, None, bool, bool],
+        Tuple[Block, BlockEntity, bool, bool],
+        Tuple[Entity, None, bool, bool]
+    ]:
+        """
+        Translate a Block from the Universal format without using the block cache.
+        Blocks with a block entity are looked up in and stored in the nbt memo.
+        :param neighbours: see translate
+        :return: output, extra_output, extra_needed, cacheable
+        """
         try:
-            input_spec = self._universal_format.block.get_specification(object_input.namespace, object_input.base_name)
-            mapping = self.get_mapping_from_universal(object_input.namespace, object_input.base_name, force_blockstate)
+            input_spec = self._universal_format.block._get_specification(object_input.namespace, object_input.base_name)
+            mapping = self._get_program('from_universal', object_input.namespace, object_input.base_name, force_blockstate)
         except KeyError:
             if object_input.namespace == 'minecraft' and list(object_input.properties.keys()) == ['block_data']:
                 log.debug(f'Probably just a quirk block {object_input} from universal in {self._parent_version}.')
             else:
                 log.warning(f'Could not find translation information for {self._mode} {object_input} from universal in {self._parent_version}. If this is not a vanilla block ignore this message')
-            return object_input, extra_input, False
+            return object_input, extra_input, False, False
 
-        output, extra_output, extra_needed, cacheable = self._translate(
+        return self._translate(
             object_input,
             input_spec,
             mapping,
@@ -259,18 +449,283 @@ class BlockTranslator(BaseTranslator):
             force_blockstate,
             'from_universal',
             get_block_callback,
-            extra_input
+            extra_input,
+            neighbours=neighbours,
+            nbt_memo=self._nbt_memo[('from_universal', force_blockstate)]
         )
 
-        if cacheable:
-            self._cache[cache_key][object_input] = output, extra_output, extra_needed
+    def to_universal_many(
+            self,
+            objects: Iterable[Union[Block, Tuple[Block, Union[BlockEntity, None]]]],
+            force_blockstate: bool = False
+    ) -> List[Union[
+        Tuple[Block, None, bool],
+        Tuple[Block, BlockEntity, bool]
+    ]]:
+        """
+        A method to translate many Block objects to the Universal format.
+        This is equivalent to calling to_universal for each input without a get_block_callback
+        but each unique block is only looked up in the cache and translated once.
+        :param objects: An iterable of Block objects or (Block, BlockEntity) tuples. The BlockEntity may be None
+        :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
+        :return: A list of (output, extra_output, extra_needed) in the same order as the inputs. See to_universal
+        """
+        return self._translate_many('to_universal', self._translate_to_universal, objects, force_blockstate)
 
-        return output, extra_output, extra_needed
+    def from_universal_many(
+            self,
+            objects: Iterable[Union[Block, Tuple[Block, Union[BlockEntity, None]]]],
+            force_blockstate: bool = False
+    ) -> List[Union[
+        Tuple[Block, None, bool],
+        Tuple[Block, BlockEntity, bool],
+        Tuple[Entity, None, bool]
+    ]]:
+        """
+        A method to translate many Block objects from the Universal format to the format of this class instance.
+        This is equivalent to calling from_universal for each input without a get_block_callback
+        but each unique block is only looked up in the cache and translated once.
+        :param objects: An iterable of Block objects or (Block, BlockEntity) tuples. The BlockEntity may be None
+        :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
+        :return: A list of (output, extra_output, extra_needed) in the same order as the inputs. See from_universal
+        """
+        return self._translate_many('from_universal', self._translate_from_universal, objects, force_blockstate)
+
+    def _translate_many(
+            self,
+            direction: str,
+            translate: Callable,
+            objects: Iterable[Union[Block, Tuple[Block, Union[BlockEntity, None]]]],
+            force_blockstate: bool
+    ) -> List[Tuple[Union[Block, Entity], Union[BlockEntity, None], bool]]:
+        cache = self._cache[(direction, force_blockstate)]
+        # blocks without a block entity are deduplicated. Blocks with a block entity are translated individually
+        keys: List[Union[Block, None]] = []
+        unique: Dict[Block, Union[Tuple[Union[Block, Entity], Union[BlockEntity, None], bool], None]] = {}
+        with_block_entity: List[Tuple[int, Block, BlockEntity]] = []
+        for obj in objects:
+            if isinstance(obj, Block):
+                block, block_entity = obj, None
+            else:
+                block, block_entity = obj
+            if block_entity is None:
+                keys.append(block)
+                unique[block] = None
+            else:
+                with_block_entity.append((len(keys), block, block_entity))
+                keys.append(None)
+
+        for block in unique:
+            result = cache.get(block)
+            if result is None:
+                assert isinstance(block, Block), 'Input object must be a block'
+                output, extra_output, extra_needed, cacheable = translate(block, None, force_blockstate, None)
+                result = output, extra_output, extra_needed
+                if cacheable:
+                    cache[block] = result
+            unique[block] = result
+
+        results = [None if key is None else unique[key] for key in keys]
+        for index, block, block_entity in with_block_entity:
+            assert isinstance(block, Block), 'Input object must be a block'
+            assert isinstance(block_entity, BlockEntity), 'The block entity must be None or a BlockEntity'
+            results[index] = translate(block, None, force_blockstate, block_entity)[:3]
+        return results
+
+    def palette_to_universal(
+            self,
+            palette: Sequence[Block],
+            indices: numpy.ndarray,
+            force_blockstate: bool = False
+    ) -> Tuple[List[Block], numpy.ndarray, numpy.ndarray, Dict[int, BlockEntity]]:
+        """
+        A method to translate an array of blocks stored as a palette and an array of indices into that palette to the Universal format.
+        Each palette entry used in the array is only translated once.
+        :param palette: A sequence of Block objects (eg a list or BlockManager). Only the entries used in indices are translated
+        :param indices: A numpy array of any shape of indices into palette
+        :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
+        :return: palette, indices, extra_needed, block_entities
+            palette - a list of the unique translated Block objects
+            indices - a numpy array the same shape as the input of indices into the returned palette
+            extra_needed - a numpy array of the input palette indices that need the location to be fully defined. Translate these individually with a get_block_callback
+            block_entities - a dictionary mapping the input palette index to the BlockEntity its block translated to
+        """
+        return self._translate_palette(self.to_universal_many, palette, indices, force_blockstate)
+
+    def palette_from_universal(
+            self,
+            palette: Sequence[Block],
+            indices: numpy.ndarray,
+            force_blockstate: bool = False
+    ) -> Tuple[List[Union[Block, Entity]], numpy.ndarray, numpy.ndarray, Dict[int, BlockEntity]]:
+        """
+        A method to translate an array of blocks stored as a palette and an array of indices into that palette from the Universal format to the format of this class instance.
+        Each palette entry used in the array is only translated once.
+        :param palette: A sequence of Block objects (eg a list or BlockManager). Only the entries used in indices are translated
+        :param indices: A numpy array of any shape of indices into palette
+        :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
+        :return: palette, indices, extra_needed, block_entities
+            palette - a list of the unique translated Block objects. Blocks that translated to an Entity will have the Entity here
+            indices - a numpy array the same shape as the input of indices into the returned palette
+            extra_needed - a numpy array of the input palette indices that need the location to be fully defined. Translate these individually with a get_block_callback
+            block_entities - a dictionary mapping the input palette index to the BlockEntity its block translated to
+        """
+        return self._translate_palette(self.from_universal_many, palette, indices, force_blockstate)
+
+    @staticmethod
+    def _translate_palette(
+            translate_many: Callable,
+            palette: Sequence[Block],
+            indices: numpy.ndarray,
+            force_blockstate: bool
+    ) -> Tuple[List[Union[Block, Entity]], numpy.ndarray, numpy.ndarray, Dict[int, BlockEntity]]:
+        indices = numpy.asarray(indices)
+        unique, inverse = numpy.unique(indices, return_inverse=True)
+        # maps each unique input index to an index in the output palette
+        lut = numpy.zeros(len(unique), dtype=numpy.uint32)
+        output_palette: List[Union[Block, Entity]] = []
+        output_palette_indices: Dict[Block, int] = {}
+        extra_needed = []
+        block_entities = {}
+        unique = unique.tolist()
+        outputs = translate_many([palette[palette_index] for palette_index in unique], force_blockstate)
+        for lut_index, (palette_index, (output, extra_output, needed)) in enumerate(zip(unique, outputs)):
+            if isinstance(output, Block):
+                if output not in output_palette_indices:
+                    output_palette_indices[output] = len(output_palette)
+                    output_palette.append(output)
+                lut[lut_index] = output_palette_indices[output]
+            else:
+                lut[lut_index] = len(output_palette)
+                output_palette.append(output)
+            if needed:
+                extra_needed.append(palette_index)
+            if extra_output is not None:
+                block_entities[palette_index] = extra_output
+        return output_palette, lut[inverse].reshape(indices.shape), numpy.array(extra_needed, dtype=indices.dtype), block_entities
+
+    def chunk_to_universal(
+            self,
+            palette: Sequence[Block],
+            indices: numpy.ndarray,
+            halo: int = 1,
+            block_entities: Dict[Tuple[int, int, int], BlockEntity] = None,
+            force_blockstate: bool = False
+    ) -> Tuple[List[Block], numpy.ndarray, numpy.ndarray, Dict[Tuple[int, int, int], BlockEntity]]:
+        """
+        A method to translate a 3D array of blocks to the Universal format using the surrounding blocks where the mappings need them.
+        The blocks are translated as with palette_to_universal. Blocks that need more information are then
+        translated individually with the neighbouring blocks read from the array rather than from a get_block_callback.
+        :param palette: A sequence of Block objects (eg a list or BlockManager)
+        :param indices: A 3D numpy array of indices into palette. This includes halo blocks of the neighbouring data on each side
+        :param halo: The number of blocks on each side of the array that are only used as neighbours and are not translated
+        :param block_entities: A dictionary mapping the location in indices to the BlockEntity at that location
+        :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
+        :return: palette, indices, extra_needed, block_entities
+            palette - a list of the unique translated Block objects
+            indices - a numpy array of indices into the returned palette. This is the shape of the input without the halo
+            extra_needed - a numpy array of shape (N, 3) of the locations in the output indices that still need more information
+            block_entities - a dictionary mapping the location in the output indices to the translated BlockEntity
+        """
+        return self._translate_chunk(self.to_universal_many, self.to_universal, palette, indices, halo, block_entities, force_blockstate)
+
+    def chunk_from_universal(
+            self,
+            palette: Sequence[Block],
+            indices: numpy.ndarray,
+            halo: int = 1,
+            block_entities: Dict[Tuple[int, int, int], BlockEntity] = None,
+            force_blockstate: bool = False
+    ) -> Tuple[List[Union[Block, Entity]], numpy.ndarray, numpy.ndarray, Dict[Tuple[int, int, int], BlockEntity]]:
+        """
+        A method to translate a 3D array of blocks from the Universal format to the format of this class instance using the surrounding blocks where the mappings need them.
+        The blocks are translated as with palette_from_universal. Blocks that need more information are then
+        translated individually with the neighbouring blocks read from the array rather than from a get_block_callback.
+        :param palette: A sequence of Block objects (eg a list or BlockManager)
+        :param indices: A 3D numpy array of indices into palette. This includes halo blocks of the neighbouring data on each side
+        :param halo: The number of blocks on each side of the array that are only used as neighbours and are not translated
+        :param block_entities: A dictionary mapping the location in indices to the BlockEntity at that location
+        :param force_blockstate: True to get the blockstate format. False to get the native format (these are sometimes the same thing)
+        :return: palette, indices, extra_needed, block_entities
+            palette - a list of the unique translated Block objects. Blocks that translated to an Entity will have the Entity here
+            indices - a numpy array of indices into the returned palette. This is the shape of the input without the halo
+            extra_needed - a numpy array of shape (N, 3) of the locations in the output indices that still need more information
+            block_entities - a dictionary mapping the location in the output indices to the translated BlockEntity
+        """
+        return self._translate_chunk(self.from_universal_many, self.from_universal, palette, indices, halo, block_entities, force_blockstate)
+
+    def _translate_chunk(
+            self,
+            translate_many: Callable,
+            translate: Callable,
+            palette: Sequence[Block],
+            indices: numpy.ndarray,
+            halo: int,
+            block_entities: Union[Dict[Tuple[int, int, int], BlockEntity], None],
+            force_blockstate: bool
+    ) -> Tuple[List[Union[Block, Entity]], numpy.ndarray, numpy.ndarray, Dict[Tuple[int, int, int], BlockEntity]]:
+        indices = numpy.asarray(indices)
+        assert indices.ndim == 3, 'indices must be a 3D array'
+        assert halo >= 0 and all(size > 2 * halo for size in indices.shape), 'The array must be larger than the halo'
+        block_entities = block_entities or {}
+        sx, sy, sz = indices.shape
+        interior = indices[halo:sx - halo, halo:sy - halo, halo:sz - halo]
+
+        # the locations that need translating individually
+        individual = numpy.zeros(interior.shape, dtype=bool)
+        for x, y, z in block_entities:
+            if halo <= x < sx - halo and halo <= y < sy - halo and halo <= z < sz - halo:
+                individual[x - halo, y - halo, z - halo] = True
+
+        # locations with a block entity are left out of the palette translation because they are translated individually
+        output_palette, palette_indices, extra_needed, palette_block_entities = self._translate_palette(translate_many, palette, interior[~individual], force_blockstate)
+        output_palette_indices = {block: index for index, block in enumerate(output_palette) if isinstance(block, Block)}
+        output_indices = numpy.zeros(interior.shape, dtype=palette_indices.dtype)
+        output_indices[~individual] = palette_indices
+        individual |= numpy.isin(interior, extra_needed)
+
+        output_block_entities: Dict[Tuple[int, int, int], BlockEntity] = {}
+        if palette_block_entities:
+            for palette_index, block_entity in palette_block_entities.items():
+                for location in numpy.argwhere((interior == palette_index) & ~individual).tolist():
+                    output_block_entities[tuple(location)] = copy.deepcopy(block_entity)
+
+        still_needed = []
+        for location in numpy.argwhere(individual).tolist():
+            x, y, z = location[0] + halo, location[1] + halo, location[2] + halo
+
+            def get_block_callback(relative_location: Tuple[int, int, int]) -> Tuple[Block, Union[BlockEntity, None]]:
+                dx, dy, dz = x + relative_location[0], y + relative_location[1], z + relative_location[2]
+                if 0 <= dx < sx and 0 <= dy < sy and 0 <= dz < sz:
+                    return palette[indices[dx, dy, dz]], block_entities.get((dx, dy, dz))
+                raise ChunkLoadError(f'Location {relative_location} relative to {(x, y, z)} is outside the array')
+
+            output, extra_output, needed = translate(palette[indices[x, y, z]], get_block_callback, force_blockstate, block_entities.get((x, y, z)))
+            if isinstance(output, Block) and output in output_palette_indices:
+                output_indices[tuple(location)] = output_palette_indices[output]
+            else:
+                output_indices[tuple(location)] = len(output_palette)
+                if isinstance(output, Block):
+                    output_palette_indices[output] = len(output_palette)
+                output_palette.append(output)
+            if extra_output is not None:
+                output_block_entities[tuple(location)] = extra_output
+            if needed:
+                still_needed.append(location)
+
+        return output_palette, output_indices, numpy.array(still_needed, dtype=numpy.int64).reshape(-1, 3), output_block_entities
 
 
 class EntityTranslator(BaseTranslator):
     def __init__(self, parent_version: 'Version', universal_format: 'Version', database: dict):
         super().__init__(parent_version, universal_format, database, 'entity')
+        # translation results stored against the entity id and the nbt the mapping read. (direction, force_blockstate)
+        self._nbt_memo: Dict[Tuple[str, bool], NBTMemo] = {
+            ('to_universal', False): NBTMemo(self._new_cache()),
+            ('to_universal', True): NBTMemo(self._new_cache()),
+            ('from_universal', False): NBTMemo(self._new_cache()),
+            ('from_universal', True): NBTMemo(self._new_cache())
+        }
 
     def to_universal(
             self,
@@ -292,8 +747,8 @@ class EntityTranslator(BaseTranslator):
         assert isinstance(object_input, Entity), 'Input object must be an entity'
 
         try:
-            input_spec = self.get_specification(object_input.namespace, object_input.base_name, force_blockstate)
-            mapping = self.get_mapping_to_universal(object_input.namespace, object_input.base_name, force_blockstate)
+            input_spec = self._get_specification(object_input.namespace, object_input.base_name, force_blockstate)
+            mapping = self._get_program('to_universal', object_input.namespace, object_input.base_name, force_blockstate)
         except KeyError:
             log.warning(f'Could not find translation information for {self._mode} {object_input} to universal in {self._parent_version}. If this is not a vanilla entity ignore this message')
             return object_input, None
@@ -304,7 +759,8 @@ class EntityTranslator(BaseTranslator):
             mapping,
             self._universal_format,
             True,
-            'to universal'
+            'to universal',
+            nbt_memo=self._nbt_memo[('to_universal', force_blockstate)]
         )
 
         return output, extra_output
@@ -326,8 +782,8 @@ class EntityTranslator(BaseTranslator):
         assert isinstance(object_input, Entity), 'Input object must be a block'
 
         try:
-            input_spec = self._universal_format.entity.get_specification(object_input.namespace, object_input.base_name)
-            mapping = self.get_mapping_from_universal(object_input.namespace, object_input.base_name, force_blockstate)
+            input_spec = self._universal_format.entity._get_specification(object_input.namespace, object_input.base_name)
+            mapping = self._get_program('from_universal', object_input.namespace, object_input.base_name, force_blockstate)
         except KeyError:
             log.warning(f'Could not find translation information for {self._mode} {object_input} from universal in {self._parent_version}. If this is not a vanilla entity ignore this message')
             return object_input
@@ -338,7 +794,8 @@ class EntityTranslator(BaseTranslator):
             mapping,
             self._parent_version,
             force_blockstate,
-            'from_universal'
+            'from_universal',
+            nbt_memo=self._nbt_memo[('from_universal', force_blockstate)]
         )
 
         return output
@@ -0,0 +1,78 @@
+"""
+Benchmark of BlockTranslator cache hits with the cached Block hash.
+The input blocks are new instances (as they would be when read from a world) so each lookup hashes and compares the block.
+LegacyBlock recomputes the hash and compares the blockstate strings like Block did before the hash was cached.
+"""
+import random
+import time
+
+import amulet_nbt
+
+import PyMCTranslate
+from PyMCTranslate import Block
+
+PALETTE_SIZE = 256
+LOOKUPS = 200_000
+REPEATS = 5
+
+
+class LegacyBlock(Block):
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if self.__class__ != other.__class__:
+            return False
+        return self.blockstate == other.blockstate and self._compare_extra_blocks(other)
+
+    def __hash__(self):
+        current_hash = hash(self.blockstate)
+        if self.extra_blocks:
+            current_hash = current_hash + hash(self.extra_blocks)
+        return current_hash
+
+
+def palette_mix(version, block_class):
+    """A palette of blocks from the version where a few common blocks make up most of the lookups like in a real world."""
+    blocks = []
+    for namespace in version.block.namespaces(True):
+        for base_name in version.block.base_names(namespace, True):
+            spec = version.block.get_specification(namespace, base_name, True)
+            if 'snbt' in spec:
+                # blocks with a block entity are not cached without the block entity
+                continue
+            properties = {key: amulet_nbt.from_snbt(values[0]) for key, values in spec.get('properties', {}).items()}
+            blocks.append((namespace, base_name, properties))
+    rnd = random.Random(0)
+    palette = rnd.sample(blocks, min(PALETTE_SIZE, len(blocks)))
+    # Zipf like weights so the first few blocks are most common
+    weights = [1 / (index + 1) for index in range(len(palette))]
+    return [block_class(*rnd.choices(palette, weights)[0]) for _ in range(LOOKUPS)]
+
+
+def benchmark(version, block_class) -> float:
+    blocks = palette_mix(version, block_class)
+    to_universal = version.block.to_universal
+    for block in blocks:
+        # fill the cache
+        to_universal(block, None, True)
+    best = float('inf')
+    for _ in range(REPEATS):
+        t = time.perf_counter()
+        for block in blocks:
+            to_universal(block, None, True)
+        best = min(best, time.perf_counter() - t)
+    return LOOKUPS / best
+
+
+def main():
+    translations = PyMCTranslate.new_translation_manager()
+    version = translations.get_version('java', (1, 15, 2))
+    legacy = benchmark(version, LegacyBlock)
+    translations.clear_cache()
+    cached = benchmark(version, Block)
+    print(f'legacy hash and eq: {legacy:,.0f} cache hits per second')
+    print(f'cached hash and eq: {cached:,.0f} cache hits per second ({cached / legacy:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+import os
+import sys
+
+from PyMCTranslate.py3.versions.compiled_database import compile_database
+
+
+def main(pymct_path: str):
+    versions_dir = os.path.join(pymct_path, 'json', 'versions')
+    for version in os.listdir(versions_dir):
+        version_path = os.path.join(versions_dir, version)
+        if not os.path.isdir(version_path):
+            continue
+        for attr in ('block', 'entity', 'item'):
+            fpath = compile_database(version_path, attr)
+            if fpath is not None:
+                print(f'Built {fpath}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else './PyMCTranslate')
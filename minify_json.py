@@ -2,53 +2,148 @@ import json
 import gzip
 import os
 import glob
+import time
+import shutil
+import hashlib
+from typing import Dict, List, Any
 
 
-def main(pymct_path: str):
-    atlas = []
-    versions = {}
+class Atlas:
+    """
+    A list of unique json objects.
+    Objects are indexed by their serialised form so finding or adding an object is constant time.
+    The keys are not sorted when serialising so objects that only differ in key order are stored separately
+    and each object is emitted with the key order it was added with.
+    """
+    def __init__(self):
+        self.objects: List[Any] = []
+        self._index: Dict[str, int] = {}
+
+    def get_add(self, obj) -> int:
+        key = json.dumps(obj, separators=(',', ':'))
+        if key not in self._index:
+            self._index[key] = len(self.objects)
+            self.objects.append(obj)
+        return self._index[key]
+
+
+def version_checksum(version_path: str) -> str:
+    """A checksum of the path, size and modification time of every json file in a version directory."""
+    checksum = hashlib.sha256()
+    for fpath in sorted(glob.iglob(os.path.join(version_path, '**', '*.json'), recursive=True)):
+        stat = os.stat(fpath)
+        rel_path = os.path.relpath(fpath, version_path).replace(os.sep, '/')
+        checksum.update(f'{rel_path}\x00{stat.st_size}\x00{stat.st_mtime_ns}\x00'.encode('utf-8'))
+    return checksum.hexdigest()
+
+
+def load_json_gz(file_path: str):
+    with gzip.open(file_path, 'rb') as f:
+        return json.loads(f.read().decode('utf-8'))
+
+
+def build_version(version_path: str, get_add_atlas) -> dict:
+    """Build the minified data for a version from the source json files."""
+    version_data = {'meta': {}}
+    meta = version_data['meta']
+    for path in os.listdir(version_path):
+        if os.path.isfile(os.path.join(version_path, path)):
+            if path.endswith('.json'):
+                with open(os.path.join(version_path, path)) as f:
+                    meta[path[:-5]] = get_add_atlas(json.load(f))
+
+        elif os.path.isdir(os.path.join(version_path, path)):
+            database = version_data[path] = {}
+            for fpath in glob.iglob(os.path.join(version_path, path, '**', '*.json'), recursive=True):
+                database_ = database
+                rel_path = os.path.relpath(fpath, os.path.join(version_path, path)).split(os.sep)
+                assert len(rel_path) == 5
+                for directory in rel_path[:-2]:
+                    database_ = database_.setdefault(directory, {})
+                with open(fpath) as f:
+                    database_[rel_path[-1][:-5]] = get_add_atlas(json.load(f))
+    return version_data
+
 
-    def get_add_atlas(obj) -> int:
-        try:
-            return atlas.index(obj)
-        except ValueError:
-            atlas.append(obj)
-            return len(atlas) - 1
+def remap_version(min_version_path: str, old_atlas: list, old_to_new: Dict[int, int], get_add_atlas) -> dict:
+    """Rebuild the minified data for a version from the previous build remapping the indexes into the new atlas."""
+    def remap(data):
+        if isinstance(data, dict):
+            return {key: remap(val) for key, val in data.items()}
+        if data not in old_to_new:
+            old_to_new[data] = get_add_atlas(old_atlas[data])
+        return old_to_new[data]
+
+    version_data = {}
+    for file_name in os.listdir(min_version_path):
+        if file_name.endswith('.json.gz'):
+            version_data[file_name[:-8]] = remap(load_json_gz(os.path.join(min_version_path, file_name)))
+    return version_data
+
+
+def main(pymct_path: str, incremental: bool = True):
+    """
+    Build the minified json data.
+    :param pymct_path: The path to the PyMCTranslate package
+    :param incremental: If True versions that have not changed since the last build are reused from that build
+    """
+    start_time = time.perf_counter()
+    atlas = Atlas()
+    versions = {}
+    timings = {}
 
     versions_dir = os.path.join(pymct_path, 'json', 'versions')
     min_json_dir = os.path.join(pymct_path, 'min_json')
+    build_info_path = os.path.join(min_json_dir, 'build_info.json')
+
+    # load the previous build
+    old_checksums = {}
+    old_atlas = None
+    if incremental and os.path.isfile(build_info_path) and os.path.isfile(os.path.join(min_json_dir, 'atlas.json.gz')):
+        with open(build_info_path) as f:
+            old_checksums = json.load(f)['versions']
+        old_atlas = load_json_gz(os.path.join(min_json_dir, 'atlas.json.gz'))
+    old_to_new: Dict[int, int] = {}
 
+    checksums = {}
     for version in os.listdir(versions_dir):
-        meta = versions.setdefault(version, {})['meta'] = {}
-        for path in os.listdir(os.path.join(versions_dir, version)):
-            if os.path.isfile(os.path.join(versions_dir, version, path)):
-                if path.endswith('.json'):
-                    with open(os.path.join(versions_dir, version, path)) as f:
-                        meta[path[:-5]] = get_add_atlas(json.load(f))
-
-            elif os.path.isdir(os.path.join(versions_dir, version, path)):
-                database = versions.setdefault(version, {})[path] = {}
-                for fpath in glob.iglob(os.path.join(versions_dir, version, path, '**', '*.json'), recursive=True):
-                    database_ = database
-                    rel_path = os.path.relpath(fpath, os.path.join(versions_dir, version, path)).split(os.sep)
-                    assert len(rel_path) == 5
-                    for directory in rel_path[:-2]:
-                        database_ = database_.setdefault(directory, {})
-                    with open(fpath) as f:
-                        database_[rel_path[-1][:-5]] = get_add_atlas(json.load(f))
-
-        for path in versions[version]:
-            os.makedirs(os.path.join(min_json_dir, 'versions', version), exist_ok=True)
-            with gzip.open(os.path.join(min_json_dir, 'versions', version, f'{path}.json.gz'), 'wb') as f:
-                f.write(json.dumps(versions[version][path]).encode('utf-8'))
+        version_start_time = time.perf_counter()
+        version_path = os.path.join(versions_dir, version)
+        min_version_path = os.path.join(min_json_dir, 'versions', version)
+        checksums[version] = version_checksum(version_path)
+        if old_atlas is not None and old_checksums.get(version) == checksums[version] and os.path.isdir(min_version_path):
+            versions[version] = remap_version(min_version_path, old_atlas, old_to_new, atlas.get_add)
+            status = 'reused'
+        else:
+            versions[version] = build_version(version_path, atlas.get_add)
+            status = 'built'
+        timings[version] = time.perf_counter() - version_start_time
+        print(f'{status.capitalize()} version {version} in {timings[version]:.2f}s')
+
+    # remove versions that no longer exist
+    if os.path.isdir(os.path.join(min_json_dir, 'versions')):
+        for version in os.listdir(os.path.join(min_json_dir, 'versions')):
+            if version not in versions:
+                shutil.rmtree(os.path.join(min_json_dir, 'versions', version))
 
-        print(f'Built version {version}')
+    for version, version_data in versions.items():
+        os.makedirs(os.path.join(min_json_dir, 'versions', version), exist_ok=True)
+        for path in version_data:
+            with gzip.open(os.path.join(min_json_dir, 'versions', version, f'{path}.json.gz'), 'wb') as f:
+                f.write(json.dumps(version_data[path]).encode('utf-8'))
 
     print('Writing atlas')
     with gzip.open(os.path.join(min_json_dir, 'atlas.json.gz'), 'wb') as f:
-        f.write(json.dumps(atlas).encode('utf-8'))
+        f.write(json.dumps(atlas.objects).encode('utf-8'))
+    with open(build_info_path, 'w') as f:
+        json.dump({'versions': checksums}, f, indent=4)
     print('Written atlas')
 
+    print('Timings')
+    for version, timing in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f'\t{version}: {timing:.2f}s')
+    print(f'Total: {time.perf_counter() - start_time:.2f}s')
+
 
 if __name__ == '__main__':
     main('./PyMCTranslate')
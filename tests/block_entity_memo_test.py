@@ -0,0 +1,100 @@
+import unittest
+import random
+import copy
+
+import amulet_nbt
+from amulet_nbt import NBTFile, TAG_Compound, TAG_List, TAG_String, TAG_Byte, TAG_Short, TAG_Int, TAG_Long, TAG_Float, TAG_Double
+
+import PyMCTranslate
+from PyMCTranslate import BlockEntity, Entity
+from PyMCTranslate.py3.translation_manager.translation_table import blockstates
+
+# the number of block entities translated for each block
+BLOCK_ENTITIES = 8
+
+
+def _serialise(obj):
+    if isinstance(obj, (BlockEntity, Entity)):
+        return type(obj).__name__, obj.namespaced_name, obj.nbt.to_snbt()
+    return obj
+
+
+def _mutate(tag, rnd: random.Random):
+    """Randomly change some of the values in a tag so that the mappings take different branches."""
+    if isinstance(tag, TAG_Compound):
+        for key in list(tag.value):
+            tag[key] = _mutate(tag[key], rnd)
+        if rnd.random() < 0.3:
+            tag['Items'] = TAG_List([
+                TAG_Compound({'id': TAG_String(rnd.choice(['minecraft:stone', 'minecraft:dirt'])), 'Count': TAG_Byte(rnd.randint(1, 64)), 'Slot': TAG_Byte(slot)})
+                for slot in range(rnd.randint(0, 3))
+            ])
+        return tag
+    if isinstance(tag, TAG_List):
+        return TAG_List([_mutate(val, rnd) for val in tag.value]) if len(tag) else tag
+    if rnd.random() < 0.5:
+        return tag
+    if isinstance(tag, (TAG_Byte, TAG_Short, TAG_Int, TAG_Long)):
+        return type(tag)(rnd.randint(0, 3))
+    if isinstance(tag, (TAG_Float, TAG_Double)):
+        return type(tag)(rnd.random())
+    if isinstance(tag, TAG_String):
+        return TAG_String(rnd.choice(['', 'a', '{"text":"hi"}', tag.value]))
+    return tag
+
+
+class BlockEntityMemoTest(unittest.TestCase):
+    """Block entity translations looked up from the nbt memo must match the translation without the memo."""
+
+    def _check(self, translations, platform: str, version_number):
+        version = translations.get_version(platform, version_number)
+        # a second manager with the memo turned off
+        uncached_version = PyMCTranslate.new_translation_manager().get_version(platform, version_number)
+        uncached_version.block._nbt_memo = dict.fromkeys(uncached_version.block._nbt_memo)
+        universal = version.translation_manager.get_version('universal', (1, 0, 0))
+
+        checked = 0
+        for force_blockstate in ((False, True) if version.has_abstract_format else (True, )):
+            for direction, specification_translator in (('to_universal', version.block), ('from_universal', universal.block)):
+                if direction == 'to_universal':
+                    names = [(namespace, base_name) for namespace in version.block.namespaces(force_blockstate) for base_name in version.block.base_names(namespace, force_blockstate)]
+                else:
+                    names = [(namespace, base_name) for namespace in universal.block.namespaces() for base_name in universal.block.base_names(namespace)]
+                for namespace, base_name in names:
+                    if direction == 'to_universal':
+                        specification = specification_translator.get_specification(namespace, base_name, force_blockstate)
+                    else:
+                        specification = specification_translator.get_specification(namespace, base_name)
+                    if 'snbt' not in specification:
+                        continue
+                    rnd = random.Random(f'{direction}{force_blockstate}{namespace}:{base_name}')
+                    blocks = list(blockstates(specification, namespace, base_name))[:8]
+                    for index in range(BLOCK_ENTITIES):
+                        block = rnd.choice(blocks)
+                        nbt = NBTFile(amulet_nbt.from_snbt(specification['snbt']), specification.get('outer_name', ''))
+                        if index:
+                            nbt.value = _mutate(nbt.value, rnd)
+                        block_entity = BlockEntity(*specification['nbt_identifier'], 0, 0, 0, nbt)
+                        expected = getattr(uncached_version.block, direction)(block, None, force_blockstate, copy.deepcopy(block_entity))
+                        # the second translation uses the result the first stored in the memo
+                        for _ in range(2):
+                            output = getattr(version.block, direction)(block, None, force_blockstate, copy.deepcopy(block_entity))
+                            self.assertEqual(tuple(map(_serialise, expected)), tuple(map(_serialise, output)), (direction, block, block_entity.nbt.to_snbt()))
+                            if isinstance(output[1], BlockEntity):
+                                # modifying an output must not change later outputs
+                                output[1].nbt.value['modified'] = TAG_Int(1)
+                            checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_matches_uncached(self):
+        translations = PyMCTranslate.new_translation_manager()
+        self._check(translations, 'java', (1, 12, 2))
+        self._check(translations, 'bedrock', (1, 16, 0))
+
+    def test_matches_uncached_with_eviction(self):
+        self._check(PyMCTranslate.new_translation_manager(cache_entries=1), 'java', (1, 12, 2))
+        self._check(PyMCTranslate.new_translation_manager(cache_bytes=4000), 'bedrock', (1, 16, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os
+import sys
+import pickle
+import subprocess
+
+import amulet_nbt
+from amulet_nbt import TAG_String, TAG_Int, TAG_Byte
+
+from PyMCTranslate import Block
+
+_unpickle_script = """
+import sys, pickle
+from PyMCTranslate import Block
+blocks = pickle.loads(sys.stdin.buffer.read())
+fresh = [Block.from_string_blockstate(block.blockstate) if not block.extra_blocks else block for block in blocks]
+print(all(hash(block) == hash(Block(block.namespace, block.base_name, block.properties, block.extra_blocks)) for block in blocks) and blocks == fresh)
+"""
+
+
+def _blocks():
+    stone = Block('minecraft', 'stone')
+    log = Block('minecraft', 'oak_log', {'axis': TAG_String('x')})
+    water = Block('minecraft', 'water', {'level': TAG_String('0')})
+    return [stone, log, water, log + water, water + log]
+
+
+class BlockHashTest(unittest.TestCase):
+    def test_hash_is_stable(self):
+        for block in _blocks():
+            self.assertEqual(hash(block), hash(block))
+            # the properties are copied out so changing them must not change the block
+            properties = block.properties
+            for key in properties:
+                properties[key] = TAG_String('changed')
+            self.assertEqual(hash(block), hash(Block(block.namespace, block.base_name, block.properties, block.extra_blocks)))
+
+    def test_equality(self):
+        blocks = _blocks()
+        for index, block in enumerate(blocks):
+            equal = Block(block.namespace, block.base_name, block.properties, block.extra_blocks)
+            self.assertEqual(block, equal)
+            self.assertEqual(hash(block), hash(equal))
+            for other in blocks[:index] + blocks[index + 1:]:
+                self.assertNotEqual(block, other)
+        # property order does not matter
+        self.assertEqual(
+            Block('minecraft', 'a', {'x': TAG_String('1'), 'y': TAG_String('2')}),
+            Block('minecraft', 'a', {'y': TAG_String('2'), 'x': TAG_String('1')})
+        )
+        # the tag type does
+        self.assertNotEqual(Block('minecraft', 'a', {'x': TAG_Int(1)}), Block('minecraft', 'a', {'x': TAG_Byte(1)}))
+        self.assertNotEqual(Block('minecraft', 'stone'), 'minecraft:stone')
+
+    def test_pickle(self):
+        blocks = _blocks()
+        for block in blocks:
+            copy = pickle.loads(pickle.dumps(block))
+            self.assertEqual(block, copy)
+            self.assertEqual(hash(block), hash(copy))
+            self.assertEqual(block.extra_blocks, copy.extra_blocks)
+
+    def test_pickle_between_processes(self):
+        # string hashes differ between processes so the cached hash must be recomputed when unpickled
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env.get('PYTHONPATH', '')])
+        env['PYTHONHASHSEED'] = '1' if os.environ.get('PYTHONHASHSEED') != '1' else '2'
+        output = subprocess.run(
+            [sys.executable, '-c', _unpickle_script],
+            input=pickle.dumps(_blocks()),
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True
+        ).stdout
+        self.assertEqual(output.strip(), b'True')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy
+import amulet_nbt
+
+from PyMCTranslate import Block
+from PyMCTranslate.py3.amulet_objects.block import BlockManager
+
+
+def _block(index: int) -> Block:
+    return Block('minecraft', f'block_{index % 7}', {'value': amulet_nbt.TAG_Int(index // 7)})
+
+
+class BlockManagerTest(unittest.TestCase):
+    def test_get_add_blocks(self):
+        manager = BlockManager()
+        blocks = [_block(index % 20) for index in range(100)]
+        indices = manager.get_add_blocks(blocks)
+        self.assertEqual(indices.dtype, numpy.uint32)
+        self.assertEqual(len(manager), 20)
+        # the same as adding them one at a time
+        expected = BlockManager()
+        self.assertEqual(indices.tolist(), [expected.get_add_block(block) for block in blocks])
+        self.assertEqual(manager.blocks(), expected.blocks())
+        self.assertEqual(manager.get_add_blocks([]).tolist(), [])
+
+    def test_blocks_for(self):
+        manager = BlockManager()
+        blocks = [_block(index) for index in range(10)]
+        manager.get_add_blocks(blocks[:5])
+        indices = numpy.array([[4, 0], [2, 2]])
+        self.assertEqual(manager.blocks_for(indices).tolist(), [[blocks[4], blocks[0]], [blocks[2], blocks[2]]])
+        # blocks added after the last call are found
+        manager.get_add_blocks(blocks[5:])
+        self.assertEqual(manager.blocks_for([9, 5]).tolist(), [blocks[9], blocks[5]])
+        for index in range(10):
+            self.assertEqual(manager.blocks_for([index])[0], manager[index])
+        self.assertEqual(manager.blocks_for([]).shape, (0,))
+
+    def test_blocks_for_invalid(self):
+        manager = BlockManager()
+        manager.get_add_blocks([_block(index) for index in range(5)])
+        for indices in ([5], [-1], [0, 100], numpy.array([[0], [-5]])):
+            with self.assertRaises(KeyError):
+                manager.blocks_for(indices)
+        with self.assertRaises(KeyError):
+            BlockManager().blocks_for([0])
+        # the same error as looking up a single index
+        with self.assertRaises(KeyError):
+            manager[5]
+
+    def test_merge(self):
+        manager = BlockManager()
+        manager.get_add_blocks([_block(index) for index in range(0, 20, 2)])
+        other = BlockManager()
+        other_blocks = [_block(index) for index in range(15, -1, -1)]
+        other.get_add_blocks(other_blocks)
+        remap = manager.merge(other)
+        self.assertEqual(len(remap), len(other))
+        for other_index, block in other.items():
+            self.assertEqual(manager[int(remap[other_index])], block)
+        # blocks already in the manager keep their index and new ones are added in order
+        self.assertEqual(manager.blocks()[:10], tuple(_block(index) for index in range(0, 20, 2)))
+        self.assertEqual(manager.blocks()[10:], tuple(_block(index) for index in range(15, -1, -1) if index % 2))
+        # remap an array of the other manager's indices
+        other_array = numpy.array([[0, 3], [15, 7]])
+        self.assertEqual(
+            manager.blocks_for(remap[other_array]).tolist(),
+            other.blocks_for(other_array).tolist()
+        )
+        self.assertEqual(manager.merge(BlockManager()).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import random
+
+import amulet_nbt
+
+import PyMCTranslate
+from PyMCTranslate import Block
+
+
+def _regex_parse(blockstate: str):
+    """The regex parser that Block.parse_blockstate_string falls back to."""
+    match = Block.blockstate_regex.match(blockstate)
+    namespace = match.group("namespace") or "minecraft"
+    base_name = match.group("base_name")
+    if match.group("property_name") is not None:
+        properties = {match.group("property_name"): match.group("property_value")}
+    else:
+        properties = {}
+    properties_string = match.group("properties")
+    if properties_string is not None:
+        for match in Block.parameters_regex.finditer(properties_string):
+            properties[match.group("name")] = match.group("value")
+    return namespace, base_name, {k: amulet_nbt.from_snbt(v) for k, v in sorted(properties.items())}
+
+
+class BlockstateParserTest(unittest.TestCase):
+    def test_round_trip(self):
+        translations = PyMCTranslate.new_translation_manager()
+        version = translations.get_version('java', (1, 15, 2))
+        checked = 0
+        for namespace in version.block.namespaces(True):
+            for base_name in version.block.base_names(namespace, True):
+                specification = version.block.get_specification(namespace, base_name, True)
+                properties = {key: amulet_nbt.from_snbt(values[-1]) for key, values in specification.get('properties', {}).items()}
+                block = Block(namespace, base_name, properties)
+                parsed = Block.from_string_blockstate(block.blockstate)
+                self.assertEqual(block, parsed)
+                self.assertEqual(block.blockstate, parsed.blockstate)
+                self.assertEqual(Block.parse_blockstate_string(block.blockstate), (namespace, base_name, properties))
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_matches_regex_parser(self):
+        rnd = random.Random(0)
+        alphabet = 'abz09_:[]=,"/.-'
+        blockstates = [
+            'stone',
+            'minecraft:stone',
+            'minecraft:oak_log[axis=x]',
+            'minecraft:oak_log[axis="x"]',
+            'minecraft:stairs[facing=east,half=top,shape=straight]',
+            'universal_minecraft:wall[east=none,north=low]',
+            'minecraft:oak_log[]',
+            'minecraft:oak_log[axis=]',
+            'minecraft:oak_log[axis=x,]',
+            'minecraft:oak_log[axis=x',
+            'a:b:c',
+            ':stone',
+        ]
+        for _ in range(20000):
+            blockstates.append('minecraft:a' + ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 20))))
+        for blockstate in blockstates:
+            try:
+                expected = _regex_parse(blockstate)
+            except Exception as e:
+                with self.assertRaises(type(e), msg=blockstate):
+                    Block.parse_blockstate_string(blockstate)
+            else:
+                self.assertEqual(expected, Block.parse_blockstate_string(blockstate), blockstate)
+
+    def test_results_are_not_shared(self):
+        blockstate = 'minecraft:oak_log[axis=x,waterlogged=false]'
+        namespace, base_name, properties = Block.parse_blockstate_string(blockstate)
+        properties['axis'] = amulet_nbt.TAG_String('y')
+        del properties['waterlogged']
+        self.assertEqual(
+            Block.parse_blockstate_string(blockstate)[2],
+            {'axis': amulet_nbt.TAG_String('x'), 'waterlogged': amulet_nbt.TAG_String('false')}
+        )
+        first = Block.parse_blockstate_string(blockstate)[2]
+        second = Block.parse_blockstate_string(blockstate)[2]
+        self.assertIsNot(first, second)
+        self.assertIsNot(first['axis'], second['axis'])
+        block = Block.from_string_blockstate(blockstate)
+        self.assertEqual(block, Block.from_string_blockstate(blockstate))
+        # Block objects are immutable so the same instance is returned for a repeated string
+        self.assertIs(block, Block.from_string_blockstate(blockstate))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import sys
+
+import amulet_nbt
+
+from PyMCTranslate import Block
+from PyMCTranslate.py3.versions.cache import LRUCache, sizeof
+from PyMCTranslate.py3.versions.translation_database import _NeighbourNode
+
+
+def _tree_size(node: _NeighbourNode) -> int:
+    """The size of a whole neighbour tree measured the way the cache estimates it."""
+    size = sizeof(node)
+    for block, branch in node.branches.items():
+        size += sizeof(block)
+        size += _tree_size(branch) if isinstance(branch, _NeighbourNode) else sizeof(branch)
+    return size
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_unbounded(self):
+        cache = LRUCache()
+        for index in range(1000):
+            cache[index] = index
+        self.assertEqual(len(cache), 1000)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_max_entries(self):
+        cache = LRUCache(max_entries=3)
+        for key in 'abc':
+            cache[key] = key.upper()
+        # reading an entry makes it the most recently used
+        self.assertEqual(cache['a'], 'A')
+        cache['d'] = 'D'
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.get('c'), 'C')
+        cache['e'] = 'E'
+        self.assertNotIn('a', cache)
+        self.assertEqual(sorted(cache._data), ['c', 'd', 'e'])
+        # replacing an entry does not evict anything
+        cache['e'] = 'F'
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache['e'], 'F')
+        self.assertIsNone(cache.get('missing'))
+        with self.assertRaises(KeyError):
+            cache['missing']
+
+    def test_max_bytes(self):
+        cache = LRUCache(max_bytes=1000, size_function=len)
+        cache['a'] = 'x' * 399
+        cache['b'] = 'x' * 399
+        self.assertEqual(cache.nbytes, 800)
+        cache['a'] = 'x' * 199
+        self.assertEqual(cache.nbytes, 600)
+        cache['c'] = 'x' * 499
+        # b was the least recently used
+        self.assertEqual(sorted(cache._data), ['a', 'c'])
+        self.assertEqual(cache.nbytes, 700)
+        # an entry larger than the limit is kept on its own
+        cache['d'] = 'x' * 4999
+        self.assertEqual(sorted(cache._data), ['d'])
+        self.assertEqual(cache.nbytes, 5000)
+        cache.clear()
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+
+    def test_resize(self):
+        cache = LRUCache(max_bytes=1000, size_function=len)
+        cache['a'] = 'x' * 99
+        cache['b'] = 'x' * 99
+        cache.resize('a', 300)
+        self.assertEqual(cache.nbytes, 500)
+        cache.resize('a', -100)
+        self.assertEqual(cache.nbytes, 400)
+        # missing entries are ignored
+        cache.resize('missing', 10000)
+        self.assertEqual(cache.nbytes, 400)
+        # growing past the limit evicts the least recently used entries
+        cache['b']
+        cache.resize('b', 700)
+        self.assertEqual(sorted(cache._data), ['b'])
+        self.assertEqual(cache.nbytes, 800)
+        # sizes are not tracked without a byte limit
+        cache = LRUCache(max_entries=10)
+        cache['a'] = 'a'
+        cache.resize('a', 100)
+        self.assertEqual(cache.nbytes, 0)
+
+    def test_neighbour_node_size(self):
+        blocks = [Block('minecraft', 'stone', {'variant': amulet_nbt.TAG_Int(index)}) for index in range(4)]
+        cache = LRUCache(max_bytes=10 ** 9)
+        key = blocks[0]
+        node = cache[key] = _NeighbourNode((0, 1, 0))
+        for first in blocks:
+            for second in blocks + [None]:
+                cache.resize(key, node.add([((0, 1, 0), first), ((0, -1, 0), second)], (first, None, False)))
+                self.assertEqual(cache.nbytes, sizeof(key) + _tree_size(node))
+        # replacing a result and a result with a deeper tree
+        cache.resize(key, node.add([((0, 1, 0), blocks[0]), ((0, -1, 0), None)], (blocks[1], None, True)))
+        self.assertEqual(cache.nbytes, sizeof(key) + _tree_size(node))
+        cache.resize(key, node.add([((0, 1, 0), None)], (blocks[2], None, False)))
+        self.assertEqual(cache.nbytes, sizeof(key) + _tree_size(node))
+        self.assertEqual(node.get(lambda location: (blocks[0] if location == (0, 1, 0) else None, None)), (blocks[1], None, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
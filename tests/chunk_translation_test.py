@@ -0,0 +1,135 @@
+import unittest
+import random
+
+import numpy
+import amulet_nbt
+from amulet_nbt import NBTFile
+
+import PyMCTranslate
+from PyMCTranslate import Block, BlockEntity, Entity, ChunkLoadError
+from PyMCTranslate.py3.translation_manager.translation_table import blockstates
+
+# the number of blockstates used from each block
+BLOCKSTATES = 2
+# the number of palette entries used in each array
+PALETTE_SIZE = 60
+SHAPE = (10, 10, 10)
+HALO = 1
+
+
+def _serialise(obj):
+    if isinstance(obj, (BlockEntity, Entity)):
+        return type(obj).__name__, obj.namespaced_name, obj.nbt.to_snbt()
+    return obj
+
+
+def _palette(translator, universal: bool):
+    """A list of (block, block entity nbt or None) for every block the translator has a specification for."""
+    palette = []
+    for namespace in translator.namespaces(False):
+        for base_name in translator.base_names(namespace, False):
+            if universal:
+                specification = translator.get_specification(namespace, base_name)
+            else:
+                specification = translator.get_specification(namespace, base_name, False)
+            for block in list(blockstates(specification, namespace, base_name))[:BLOCKSTATES]:
+                if 'snbt' in specification:
+                    palette.append((block, (specification['nbt_identifier'], specification['snbt'], specification.get('outer_name', ''))))
+                else:
+                    palette.append((block, None))
+    return palette
+
+
+def _block_entity(nbt_data, x: int, y: int, z: int) -> BlockEntity:
+    (namespace, base_name), snbt, outer_name = nbt_data
+    return BlockEntity(namespace, base_name, x, y, z, NBTFile(amulet_nbt.from_snbt(snbt), outer_name))
+
+
+class ChunkTranslationTest(unittest.TestCase):
+    """Translating a 3D array must match translating each block on its own with the neighbours read from the array."""
+
+    def _check(self, platform: str, version_number, direction: str):
+        version = PyMCTranslate.new_translation_manager().get_version(platform, version_number)
+        # a separate manager so that the expected results do not come from the same cache
+        expected_version = PyMCTranslate.new_translation_manager().get_version(platform, version_number)
+        universal = direction == 'from_universal'
+        if universal:
+            palette = _palette(version.translation_manager.get_version('universal', (1, 0, 0)).block, True)
+        else:
+            palette = _palette(version.block, False)
+        rnd = random.Random(f'{platform}{version_number}{direction}')
+        rnd.shuffle(palette)
+        # the last palette entry is only used at locations with a block entity
+        palette = palette[:PALETTE_SIZE] + [next(entry for entry in palette[PALETTE_SIZE:] if entry[1] is not None)]
+        block_entity_only = PALETTE_SIZE
+        blocks = [block for block, _ in palette]
+
+        indices = numpy.array([rnd.randrange(PALETTE_SIZE) for _ in range(numpy.prod(SHAPE))], dtype=numpy.uint32).reshape(SHAPE)
+        block_entities = {}
+        for location in numpy.ndindex(*SHAPE):
+            if palette[indices[location]][1] is not None and rnd.random() < 0.5:
+                block_entities[location] = _block_entity(palette[indices[location]][1], *location)
+        # include locations in the halo and an entry that only appears with a block entity
+        location = (0, 0, 0)
+        indices[location] = block_entity_only
+        block_entities[location] = _block_entity(palette[block_entity_only][1], *location)
+        location = (HALO, HALO + 1, HALO + 2)
+        indices[location] = block_entity_only
+        block_entities[location] = _block_entity(palette[block_entity_only][1], *location)
+
+        # record the blocks translated in the palette pass
+        translated = []
+
+        def translate_many(objects, force_blockstate):
+            objects = list(objects)
+            translated.extend(objects)
+            return getattr(version.block, f'{direction}_many')(objects, force_blockstate)
+
+        output_palette, output_indices, still_needed, output_block_entities = version.block._translate_chunk(
+            translate_many, getattr(version.block, direction), blocks, indices, HALO, block_entities, False
+        )
+        self.assertNotIn(blocks[block_entity_only], translated)
+        self.assertEqual(output_indices.shape, tuple(size - 2 * HALO for size in SHAPE))
+
+        expected_needed = []
+        expected_block_entities = {}
+        needed = 0
+        for location in numpy.ndindex(*output_indices.shape):
+            x, y, z = location[0] + HALO, location[1] + HALO, location[2] + HALO
+
+            def get_block_callback(relative_location):
+                dx, dy, dz = x + relative_location[0], y + relative_location[1], z + relative_location[2]
+                if 0 <= dx < SHAPE[0] and 0 <= dy < SHAPE[1] and 0 <= dz < SHAPE[2]:
+                    return blocks[indices[dx, dy, dz]], block_entities.get((dx, dy, dz))
+                raise ChunkLoadError
+
+            block = blocks[indices[x, y, z]]
+            needed += getattr(expected_version.block, direction)(block, None)[2]
+            output, extra_output, extra_needed = getattr(expected_version.block, direction)(block, get_block_callback, False, block_entities.get((x, y, z)))
+            self.assertEqual(_serialise(output), _serialise(output_palette[output_indices[location]]), (location, block))
+            if extra_needed:
+                expected_needed.append(location)
+            if extra_output is not None:
+                expected_block_entities[location] = _serialise(extra_output)
+        self.assertEqual(expected_needed, [tuple(location) for location in still_needed.tolist()])
+        self.assertEqual(expected_block_entities, {location: _serialise(block_entity) for location, block_entity in output_block_entities.items()})
+        # make sure the data covers the interesting cases
+        self.assertGreater(needed, 0)
+        self.assertTrue(expected_block_entities)
+
+        # the public method gives the same result
+        public = getattr(version.block, f'chunk_{direction}')(blocks, indices, HALO, block_entities)
+        self.assertEqual(output_palette, public[0])
+        numpy.testing.assert_array_equal(output_indices, public[1])
+
+    def test_to_universal(self):
+        self._check('java', (1, 12, 2), 'to_universal')
+        self._check('bedrock', (1, 16, 0), 'to_universal')
+
+    def test_from_universal(self):
+        self._check('java', (1, 12, 2), 'from_universal')
+        self._check('bedrock', (1, 16, 0), 'from_universal')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import os
+import shutil
+import tempfile
+import json
+
+from PyMCTranslate.py3.versions import compiled_database
+from PyMCTranslate.py3.util import thaw
+
+
+def _write_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+
+class CompiledDatabaseTest(unittest.TestCase):
+    def setUp(self):
+        self.version_path = tempfile.mkdtemp()
+        self.stone_path = os.path.join(self.version_path, 'block', 'blockstate', 'to_universal', 'minecraft', 'vanilla', 'stone.json')
+        _write_json(self.stone_path, [{'function': 'new_block', 'options': 'universal_minecraft:stone'}])
+        _write_json(
+            os.path.join(self.version_path, 'block', 'blockstate', 'to_universal', 'minecraft', 'vanilla', 'dirt.json'),
+            [{'function': 'new_block', 'options': 'universal_minecraft:dirt'}]
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.version_path)
+
+    def _stone(self, lazy: bool):
+        database = compiled_database.load_database(self.version_path, 'block', lazy)
+        return thaw(database['blockstate']['to_universal']['minecraft']['stone'])
+
+    def test_built_on_first_load(self):
+        fpath = compiled_database.compiled_path(self.version_path, 'block')
+        self.assertFalse(os.path.isfile(fpath))
+        expected = self._stone(False)
+        self.assertTrue(os.path.isfile(fpath))
+        for lazy in (False, True):
+            self.assertEqual(self._stone(lazy), expected)
+
+    def test_edited_json(self):
+        self._stone(False)
+        _write_json(self.stone_path, [{'function': 'new_block', 'options': 'universal_minecraft:granite'}])
+        # make sure the modification time changes on file systems with a coarse resolution
+        stat = os.stat(self.stone_path)
+        os.utime(self.stone_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        for lazy in (False, True):
+            self.assertEqual(self._stone(lazy), [{'function': 'new_block', 'options': 'universal_minecraft:granite'}])
+
+    def test_lazy_json(self):
+        database = compiled_database.load_database(self.version_path, 'block', True)
+        namespace = database['blockstate']['to_universal']['minecraft']
+        self.assertIsInstance(namespace, compiled_database.LazyBaseNames)
+        self.assertEqual(sorted(namespace), ['dirt', 'stone'])
+        # the files are only read when they are requested so an edit before then is seen
+        _write_json(self.stone_path, [])
+        self.assertEqual(thaw(namespace['stone']), [])
+        # building the compiled database would read every file
+        self.assertFalse(os.path.isfile(compiled_database.compiled_path(self.version_path, 'block')))
+
+    def test_checksum(self):
+        database_path = os.path.join(self.version_path, 'block')
+        checksum = compiled_database.source_checksum(database_path)
+        self.assertEqual(checksum, compiled_database.source_checksum(database_path))
+        _write_json(os.path.join(database_path, 'blockstate', 'to_universal', 'minecraft', 'vanilla', 'granite.json'), [])
+        self.assertNotEqual(checksum, compiled_database.source_checksum(database_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
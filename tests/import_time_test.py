@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+import json
+import subprocess
+import tempfile
+
+# Importing PyMCTranslate should take at most this multiple of the time to import its dependencies.
+# Both are measured in the same interpreter so that the test does not depend on the speed of the machine.
+IMPORT_TIME_RATIO = 3
+REPEATS = 5
+
+_import_script = """
+import sys, time, json, os
+data_files = []
+
+
+def audit(event, args):
+    # record every file opened under the package data directories
+    if event == 'open' and isinstance(args[0], str) and any(directory in os.path.abspath(args[0]).split(os.sep) for directory in ('json', 'min_json')):
+        data_files.append(args[0])
+
+
+sys.addaudithook(audit)
+t = time.perf_counter()
+import numpy, amulet_nbt
+dependency_time = time.perf_counter() - t
+t = time.perf_counter()
+import PyMCTranslate
+import_time = time.perf_counter() - t
+from PyMCTranslate.py3.versions import code_functions, _version_data, _translator_databases
+print(json.dumps({
+    'dependency_time': dependency_time,
+    'import_time': import_time,
+    'atlas_loaded': PyMCTranslate._json_atlas is not None,
+    'code_functions_loaded': bool(code_functions.code_functions),
+    'versions_loaded': len(_version_data) + len(_translator_databases),
+    'data_files': data_files,
+    'logs_created': os.path.exists('logs'),
+}))
+"""
+
+
+class ImportTimeTest(unittest.TestCase):
+    def _import(self) -> dict:
+        with tempfile.TemporaryDirectory() as cwd:
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env.get('PYTHONPATH', '')])
+            output = subprocess.run(
+                [sys.executable, '-c', _import_script],
+                cwd=cwd,
+                env=env,
+                stdout=subprocess.PIPE,
+                check=True
+            ).stdout
+        return json.loads(output)
+
+    def test_import_time(self):
+        results = [self._import() for _ in range(REPEATS)]
+        dependency_time = min(result['dependency_time'] for result in results)
+        import_time = min(result['import_time'] for result in results)
+        print(f'import PyMCTranslate took {import_time:.3f}s. Importing numpy and amulet_nbt took {dependency_time:.3f}s')
+        self.assertLess(import_time, dependency_time * IMPORT_TIME_RATIO)
+
+    def test_import_side_effects(self):
+        result = self._import()
+        self.assertFalse(result['atlas_loaded'], 'The json atlas should not be loaded on import')
+        self.assertFalse(result['code_functions_loaded'], 'The code functions should not be loaded on import')
+        self.assertFalse(result['versions_loaded'], 'The version data should not be loaded on import')
+        self.assertEqual(result['data_files'], [], 'The data files should not be read on import')
+        self.assertFalse(result['logs_created'], 'The logs directory should not be created on import')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import amulet_nbt
+
+import PyMCTranslate
+from PyMCTranslate import Block
+from PyMCTranslate.py3.translation_manager.translation_table import blockstates
+
+VERSIONS = [('java', (1, 12, 2)), ('java', (1, 15, 2)), ('bedrock', (1, 9, 0)), ('bedrock', (1, 16, 0))]
+
+# the number of blockstates checked for each universal block
+BLOCKSTATES = 8
+
+
+def _from_universal(translations, platform: str, version_number, block: Block):
+    version = translations.get_version(platform, version_number)
+    return version.block.from_universal(block, None, True)[0]
+
+
+class InternBlockTest(unittest.TestCase):
+    """The shared output Blocks must not depend on which versions translated the same block before."""
+
+    def test_property_order(self):
+        shared = PyMCTranslate.new_translation_manager()
+        # a manager for each version so the results do not depend on the other versions
+        separate = [PyMCTranslate.new_translation_manager() for _ in VERSIONS]
+        universal = shared.get_version('universal', (1, 0, 0)).block
+        checked = 0
+        for namespace in universal.namespaces():
+            for base_name in universal.base_names(namespace):
+                specification = universal.get_specification(namespace, base_name)
+                for block in list(blockstates(specification, namespace, base_name))[:BLOCKSTATES]:
+                    for (platform, version_number), translations in zip(VERSIONS, separate):
+                        expected = _from_universal(translations, platform, version_number, block)
+                        output = _from_universal(shared, platform, version_number, block)
+                        self.assertEqual(expected, output)
+                        if isinstance(expected, Block):
+                            self.assertEqual(list(expected.properties), list(output.properties), (platform, version_number, block))
+                        checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_end_portal_frame(self):
+        translations = PyMCTranslate.new_translation_manager()
+        block = Block('universal_minecraft', 'end_portal_frame', {'eye': amulet_nbt.TAG_String('true'), 'facing': amulet_nbt.TAG_String('north')})
+        java_1_12_2 = _from_universal(translations, 'java', (1, 12, 2), block)
+        java_1_15_2 = _from_universal(translations, 'java', (1, 15, 2), block)
+        expected = _from_universal(PyMCTranslate.new_translation_manager(), 'java', (1, 15, 2), block)
+        self.assertEqual(java_1_12_2, java_1_15_2)
+        self.assertEqual(list(java_1_15_2.properties), list(expected.properties))
+
+    def test_outputs_are_shared(self):
+        translations = PyMCTranslate.new_translation_manager()
+        block = Block('universal_minecraft', 'stone')
+        outputs = [_from_universal(translations, 'java', (1, 15, 2), Block('universal_minecraft', 'stone')) for _ in range(2)]
+        translations.clear_cache()
+        outputs.append(_from_universal(translations, 'java', (1, 15, 2), block))
+        self.assertIs(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
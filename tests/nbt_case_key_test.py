@@ -0,0 +1,82 @@
+import unittest
+import sys
+
+import numpy
+import amulet_nbt
+from amulet_nbt import TAG_Byte, TAG_Short, TAG_Int, TAG_Long, TAG_Float, TAG_Double, TAG_String, TAG_List, TAG_Compound, TAG_Int_Array
+
+from PyMCTranslate import Block
+import PyMCTranslate.py3.versions.translate
+
+# the translate function shadows the module in the package namespace
+translate_module = sys.modules['PyMCTranslate.py3.versions.translate']
+
+_tags = [
+    TAG_Byte(0), TAG_Byte(1), TAG_Short(1), TAG_Int(0), TAG_Int(1), TAG_Int(-1), TAG_Long(1),
+    TAG_Float(1), TAG_Double(1), TAG_Double(1.5),
+    TAG_String(''), TAG_String('1'), TAG_String('1b'), TAG_String('x'), TAG_String('true'), TAG_String('"x"'),
+    TAG_List([TAG_Int(1), TAG_Int(2)]), TAG_Compound({'a': TAG_Byte(1)}), TAG_Int_Array(numpy.array([1, 2], dtype=numpy.int32))
+]
+
+# snbt as it could appear in a mapping file. Some of these are not in the form to_snbt creates
+_snbt = [
+    '0b', '1b', '1B', '1s', '1', '01', '-1', '1L', '1l', '1.0f', '1.0F', '1.0d', '1.5d', '1.5',
+    '""', '"1"', '"1b"', '"x"', "'x'", 'x', 'true', '"\\\\"x\\\\""', '[1, 2]', '[1,2]', '{a: 1b}', '{a:1b}', '[I; 1, 2]', '{'
+]
+
+
+class NBTCaseKeyTest(unittest.TestCase):
+    def test_matches_snbt(self):
+        # a tag matches a case exactly when the case is the snbt of the tag
+        snbt = _snbt + [tag.to_snbt() for tag in _tags]
+        for tag in _tags:
+            for case in snbt:
+                self.assertEqual(
+                    tag.to_snbt() == case,
+                    translate_module.nbt_case_key(tag) == translate_module._snbt_case_key(case),
+                    (tag, case)
+                )
+
+    def test_typed_keys(self):
+        # the values are equal but the tags are not
+        self.assertEqual(TAG_Byte(1), TAG_Int(1))
+        keys = {translate_module.nbt_case_key(tag) for tag in (TAG_Byte(1), TAG_Short(1), TAG_Int(1), TAG_Long(1), TAG_String('1'))}
+        self.assertEqual(len(keys), 5)
+
+    def test_non_canonical_snbt(self):
+        for case in ('1B', '01', '1l', "'x'", 'x', '[1,2]', '{a:1b}', '{'):
+            self.assertEqual(translate_module._snbt_case_key(case), case)
+
+    def test_map_properties(self):
+        mappings = [
+            {'function': 'new_block', 'options': 'universal_minecraft:test'},
+            {'function': 'map_properties', 'options': {'value': {
+                '1b': [{'function': 'new_properties', 'options': {'matched': '"byte"'}}],
+                '1': [{'function': 'new_properties', 'options': {'matched': '"int"'}}],
+                '"1"': [{'function': 'new_properties', 'options': {'matched': '"string"'}}],
+                '1B': [{'function': 'new_properties', 'options': {'matched': '"never"'}}]
+            }}},
+            {'function': 'carry_properties', 'options': {'carried': ['1b', '"x"']}}
+        ]
+        # the property table and the walked functions
+        programs = [translate_module.compile_mappings(mappings), translate_module.compile_mappings(mappings, False)]
+
+        def run(properties):
+            for program in programs:
+                state = translate_module.TranslationState()
+                program(state, Block('minecraft', 'test', properties), None, None, (0, 0, 0), None)
+                yield {key: val.to_snbt() for key, val in state.new_data['properties'].items()}
+
+        for value, matched in ((TAG_Byte(1), '"byte"'), (TAG_Int(1), '"int"'), (TAG_String('1'), '"string"')):
+            for output in run({'value': value}):
+                self.assertEqual(output, {'matched': matched})
+        for output in run({'value': TAG_Short(1), 'carried': TAG_Int(1)}):
+            self.assertEqual(output, {})
+        for output in run({'carried': TAG_Byte(1)}):
+            self.assertEqual(output, {'carried': '1b'})
+        for output in run({'carried': TAG_String('x')}):
+            self.assertEqual(output, {'carried': '"x"'})
+
+
+if __name__ == '__main__':
+    unittest.main()
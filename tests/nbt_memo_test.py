@@ -0,0 +1,89 @@
+import unittest
+import random
+
+import amulet_nbt
+from amulet_nbt import NBTFile, TAG_Compound, TAG_String, TAG_Int, TAG_List, TAG_Double, TAG_Byte
+
+from PyMCTranslate import Entity
+from PyMCTranslate.py3.versions.cache import LRUCache
+from PyMCTranslate.py3.versions.translate import translate, compile_mappings, NBTMemo
+
+# The shipped data has no entity mappings so the entity tests use this mapping.
+# It carries Pos from the input, maps IsBaby and ignores Name so the memo has carried, mapped and ignored values.
+_zombie_mapping = [
+    {"function": "new_entity", "options": "universal_minecraft:zombie"},
+    {"function": "walk_input_nbt", "options": {
+        "type": "compound",
+        "keys": {
+            "Pos": {"type": "list", "nested_default": [{"function": "carry_nbt"}]},
+            "IsBaby": {"type": "byte", "functions": [{"function": "map_nbt", "options": {
+                "cases": {"1b": [{"function": "new_nbt", "options": {"key": "baby", "value": "\"yes\""}}]},
+                "default": [{"function": "new_nbt", "options": {"key": "baby", "value": "\"no\""}}]
+            }}]},
+            "Name": {"type": "string", "nested_default": []}
+        },
+        "nested_default": [{"function": "carry_nbt"}]
+    }}
+]
+
+_zombie_snbt = '{Health: 20.0f}'
+
+
+class _EntitySpecification:
+    def _get_specification(self, namespace, base_name, force_blockstate=False):
+        return {'snbt': _zombie_snbt}
+
+    def _get_parsed_specification(self, namespace, base_name, force_blockstate=False):
+        return {}, amulet_nbt.from_snbt(_zombie_snbt)
+
+
+class _Version:
+    entity = _EntitySpecification()
+
+
+def _random_zombie(rnd: random.Random) -> Entity:
+    nbt = TAG_Compound()
+    nbt['Pos'] = TAG_List([TAG_Double(rnd.random() * 100) for _ in range(3)])
+    if rnd.random() < 0.7:
+        nbt['IsBaby'] = TAG_Byte(rnd.randint(0, 2))
+    if rnd.random() < 0.5:
+        nbt['Name'] = TAG_String(rnd.choice('abc'))
+    if rnd.random() < 0.3:
+        nbt['Extra'] = TAG_Int(rnd.randint(0, 5))
+    return Entity('minecraft', 'zombie', 0, 0, 0, NBTFile(nbt))
+
+
+class EntityNBTMemoTest(unittest.TestCase):
+    def setUp(self):
+        self.mapping = compile_mappings(_zombie_mapping)
+        self.version = _Version()
+
+    def _check(self, memo: NBTMemo, count: int = 2000):
+        rnd = random.Random(0)
+        for _ in range(count):
+            entity = _random_zombie(rnd)
+            expected = translate(entity, {}, self.mapping, self.version, True)
+            output = translate(entity, {}, self.mapping, self.version, True, nbt_memo=memo)
+            self.assertEqual(expected[0].namespaced_name, output[0].namespaced_name)
+            self.assertEqual(expected[0].nbt.to_snbt(), output[0].nbt.to_snbt())
+            self.assertEqual(expected[2], output[2])
+            # modifying an output must not change later outputs
+            output[0].nbt['Pos'] = TAG_Int(1)
+
+    def test_matches_uncached(self):
+        self._check(NBTMemo())
+
+    def test_matches_uncached_with_eviction(self):
+        self._check(NBTMemo(LRUCache(max_entries=1)))
+        self._check(NBTMemo(LRUCache(max_bytes=1000)))
+
+    def test_size_is_updated(self):
+        cache = LRUCache(max_bytes=10 ** 9)
+        self._check(NBTMemo(cache), 200)
+        self.assertEqual(len(cache), 1)
+        # the tree for the entity id grows after it is added so the size must be updated
+        self.assertGreater(cache.nbytes, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
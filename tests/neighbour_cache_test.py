@@ -0,0 +1,83 @@
+import unittest
+import random
+
+import amulet_nbt
+
+import PyMCTranslate
+from PyMCTranslate import Block, BlockEntity, Entity
+from PyMCTranslate.py3.translation_manager.translation_table import blockstates
+
+# the number of random neighbourhoods each block is translated in
+WORLDS = 6
+
+
+def _serialise(obj):
+    if isinstance(obj, (BlockEntity, Entity)):
+        return type(obj).__name__, obj.namespaced_name, obj.nbt.to_snbt()
+    return obj
+
+
+class _World:
+    """Random blocks around the origin. A location always returns the same block."""
+    def __init__(self, palette, rnd: random.Random):
+        self._palette = palette
+        self._rnd = rnd
+        self._blocks = {}
+        self.reads = 0
+
+    def get_block(self, location):
+        self.reads += 1
+        if location not in self._blocks:
+            self._blocks[location] = self._rnd.choice(self._palette)
+        return self._blocks[location], None
+
+
+class NeighbourCacheTest(unittest.TestCase):
+    """Translations that read neighbouring blocks must match the uncached translation."""
+
+    def _check(self, translations, platform: str, version_number, force_blockstate: bool = False):
+        translator = translations.get_version(platform, version_number).block
+        air = Block('minecraft', 'air', {'block_data': amulet_nbt.TAG_Int(0)}) if not force_blockstate else Block('minecraft', 'air')
+        checked = 0
+        for namespace in translator.namespaces(force_blockstate):
+            for base_name in translator.base_names(namespace, force_blockstate):
+                specification = translator.get_specification(namespace, base_name, force_blockstate)
+                if 'snbt' in specification:
+                    continue
+                blocks = list(blockstates(specification, namespace, base_name))[:32]
+                palette = blocks + [air]
+                rnd = random.Random(f'{namespace}:{base_name}')
+                for block in blocks[:8]:
+                    for _ in range(WORLDS):
+                        seed = rnd.random()
+                        world = _World(palette, random.Random(seed))
+                        expected = translator._translate_to_universal(block, world.get_block, force_blockstate, None)[:3]
+                        if not world.reads:
+                            # this block does not read its neighbours
+                            break
+                        output = translator.to_universal(block, _World(palette, random.Random(seed)).get_block, force_blockstate)
+                        self.assertEqual(tuple(map(_serialise, expected)), tuple(map(_serialise, output)), block)
+                        checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_matches_uncached(self):
+        translations = PyMCTranslate.new_translation_manager()
+        self._check(translations, 'java', (1, 12, 2))
+        self._check(translations, 'java', (1, 12, 2), True)
+
+    def test_matches_uncached_with_eviction(self):
+        self._check(PyMCTranslate.new_translation_manager(cache_entries=2), 'java', (1, 12, 2))
+        self._check(PyMCTranslate.new_translation_manager(cache_bytes=4000), 'java', (1, 12, 2))
+
+    def test_size_is_updated(self):
+        translations = PyMCTranslate.new_translation_manager(cache_bytes=10 ** 9)
+        self._check(translations, 'java', (1, 12, 2))
+        translator = translations.get_version('java', (1, 12, 2)).block
+        cache = translator._neighbour_cache[('to_universal', False)]
+        self.assertGreater(len(cache), 0)
+        # the trees grow after they are added to the cache so each is more than an empty node
+        self.assertGreater(cache.nbytes / len(cache), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy
+import amulet_nbt
+
+import PyMCTranslate
+from PyMCTranslate import Block
+from PyMCTranslate.py3.amulet_objects.block import BlockManager
+
+
+class NumericalArrayTest(unittest.TestCase):
+    """ints_to_indices and indices_to_ints must match ints_to_block and block_to_ints."""
+
+    def setUp(self):
+        self.translations = PyMCTranslate.new_translation_manager()
+        self.version = self.translations.get_version('java', (1, 12, 2))
+
+    def test_ints_to_indices(self):
+        rnd = numpy.random.RandomState(0)
+        # ids in and out of the numerical block map
+        block_ids = rnd.randint(0, 300, (4, 16, 16))
+        block_datas = rnd.randint(0, 16, (4, 16, 16))
+        block_datas[0, 0, :3] = [-1, 2 ** 31 - 1, -2 ** 31]
+        manager = BlockManager()
+        indices = self.version.ints_to_indices(block_ids, block_datas, manager)
+        self.assertEqual(indices.shape, block_ids.shape)
+        for block_id, block_data, index in zip(block_ids.ravel().tolist(), block_datas.ravel().tolist(), indices.ravel().tolist()):
+            self.assertEqual(manager[index], self.version.ints_to_block(block_id, block_data))
+        # the order blocks are added to the manager does not matter to the result but each block is only added once
+        self.assertEqual(len(manager), len(set(zip(block_ids.ravel().tolist(), block_datas.ravel().tolist()))))
+        self.assertEqual(self.version.ints_to_indices(block_ids, block_datas, manager).tolist(), indices.tolist())
+
+    def test_indices_to_ints(self):
+        manager = BlockManager()
+        blocks = [
+            self.version.ints_to_block(1, 0),
+            self.version.ints_to_block(35, 14),
+            self.version.ints_to_block(1000, 3),
+            Block('minecraft', 'stone', {'block_data': amulet_nbt.TAG_Int(2)}),
+            # blocks with no numerical form
+            Block('minecraft', 'stone'),
+            Block('minecraft', 'not_a_block', {'block_data': amulet_nbt.TAG_Int(0)}),
+        ]
+        manager.get_add_blocks(blocks)
+        indices = numpy.array([[0, 1, 2], [3, 4, 5], [5, 4, 0]])
+        block_ids, block_datas = self.version.indices_to_ints(indices, manager)
+        self.assertEqual(block_ids.dtype, numpy.int32)
+        self.assertEqual(block_ids.shape, indices.shape)
+        for index, block_id, block_data in zip(indices.ravel().tolist(), block_ids.ravel().tolist(), block_datas.ravel().tolist()):
+            self.assertEqual((block_id, block_data), self.version.block_to_ints(manager[index]) or (-1, -1))
+        with self.assertRaises(KeyError):
+            self.version.indices_to_ints([len(blocks)], manager)
+
+    def test_round_trip(self):
+        block_ids = numpy.array([1, 2, 3, 35, 35, 1000], dtype=numpy.uint16)
+        block_datas = numpy.array([0, 0, 1, 14, 14, 7], dtype=numpy.uint8)
+        manager = BlockManager()
+        indices = self.version.ints_to_indices(block_ids, block_datas, manager)
+        block_ids_, block_datas_ = self.version.indices_to_ints(indices, manager)
+        self.assertEqual(block_ids_.tolist(), block_ids.tolist())
+        self.assertEqual(block_datas_.tolist(), block_datas.tolist())
+
+    def test_registry_changes(self):
+        manager = BlockManager()
+        before = manager[int(self.version.ints_to_indices([2000], [0], manager)[0])]
+        self.assertEqual(before, self.version.ints_to_block(2000, 0))
+        # registering a block id must invalidate the remembered blocks
+        self.translations.block_registry.register('modded:block', 2000)
+        after = manager[int(self.version.ints_to_indices([2000], [0], manager)[0])]
+        self.assertEqual(after, self.version.ints_to_block(2000, 0))
+        self.assertNotEqual(before, after)
+        index = manager.get_add_block(Block('modded', 'block', {'block_data': amulet_nbt.TAG_Int(5)}))
+        block_ids, block_datas = self.version.indices_to_ints([index], manager)
+        self.assertEqual((block_ids[0], block_datas[0]), (2000, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import random
+
+import numpy
+
+import PyMCTranslate
+from PyMCTranslate import Block, BlockEntity, Entity
+from PyMCTranslate.py3.translation_manager.translation_table import blockstates
+
+# the number of blockstates used from each block
+BLOCKSTATES = 2
+
+
+def _serialise(obj):
+    if isinstance(obj, (BlockEntity, Entity)):
+        return type(obj).__name__, obj.namespaced_name, obj.nbt.to_snbt()
+    return obj
+
+
+def _palette(translator, force_blockstate: bool = False, universal: bool = False):
+    palette = []
+    for namespace in translator.namespaces(force_blockstate):
+        for base_name in translator.base_names(namespace, force_blockstate):
+            if universal:
+                specification = translator.get_specification(namespace, base_name)
+            else:
+                specification = translator.get_specification(namespace, base_name, force_blockstate)
+            palette += list(blockstates(specification, namespace, base_name))[:BLOCKSTATES]
+    return palette
+
+
+class PaletteTranslationTest(unittest.TestCase):
+    """Translating a palette and an index array must match translating each block on its own."""
+
+    def _check(self, platform: str, version_number, direction: str):
+        version = PyMCTranslate.new_translation_manager().get_version(platform, version_number)
+        # a separate manager so that the expected results do not come from the same cache
+        expected_version = PyMCTranslate.new_translation_manager().get_version(platform, version_number)
+        if direction == 'to_universal':
+            palette = _palette(version.block)
+            translate_palette = version.block.palette_to_universal
+        else:
+            palette = _palette(version.translation_manager.get_version('universal', (1, 0, 0)).block, universal=True)
+            translate_palette = version.block.palette_from_universal
+        rnd = random.Random(f'{platform}{version_number}{direction}')
+        # only some of the palette is used
+        used = rnd.sample(range(len(palette)), len(palette) // 2)
+        indices = numpy.array([rnd.choice(used) for _ in range(16 * 16 * 16)], dtype=numpy.uint32).reshape((16, 16, 16))
+
+        output_palette, output_indices, extra_needed, block_entities = translate_palette(palette, indices)
+        self.assertEqual(output_indices.shape, indices.shape)
+        self.assertEqual(len(output_palette), len(numpy.unique(output_indices)))
+        output_blocks = [block for block in output_palette if isinstance(block, Block)]
+        self.assertEqual(len(output_blocks), len(set(output_blocks)))
+
+        expected_needed = set()
+        expected_block_entities = {}
+        for palette_index in sorted(set(used)):
+            output, extra_output, needed = getattr(expected_version.block, direction)(palette[palette_index], None)
+            locations = numpy.argwhere(indices == palette_index)
+            if not len(locations):
+                continue
+            for location in locations.tolist():
+                self.assertEqual(_serialise(output), _serialise(output_palette[output_indices[tuple(location)]]), palette[palette_index])
+            if needed:
+                expected_needed.add(palette_index)
+            if extra_output is not None:
+                expected_block_entities[palette_index] = _serialise(extra_output)
+        self.assertEqual(expected_needed, set(extra_needed.tolist()))
+        self.assertEqual(expected_block_entities, {palette_index: _serialise(block_entity) for palette_index, block_entity in block_entities.items()})
+        # make sure the data covers the interesting cases
+        self.assertTrue(expected_needed)
+        self.assertTrue(expected_block_entities)
+
+    def test_to_universal(self):
+        self._check('java', (1, 12, 2), 'to_universal')
+        self._check('bedrock', (1, 16, 0), 'to_universal')
+
+    def test_from_universal(self):
+        self._check('java', (1, 15, 2), 'from_universal')
+        self._check('bedrock', (1, 16, 0), 'from_universal')
+
+    def test_empty(self):
+        version = PyMCTranslate.new_translation_manager().get_version('java', (1, 15, 2))
+        output_palette, output_indices, extra_needed, block_entities = version.block.palette_to_universal([], numpy.zeros((0, 16), dtype=numpy.uint16))
+        self.assertEqual((output_palette, output_indices.shape, extra_needed.shape, block_entities), ([], (0, 16), (0, ), {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import itertools
+import sys
+
+import amulet_nbt
+
+import PyMCTranslate
+from PyMCTranslate import Block
+from PyMCTranslate.py3.util import thaw
+import PyMCTranslate.py3.versions.translate
+
+# the translate function shadows the module in the package namespace
+translate_module = sys.modules['PyMCTranslate.py3.versions.translate']
+
+# the maximum number of blockstates checked for each block
+BLOCKSTATES = 64
+
+
+def _blockstates(specification: dict, namespace: str, base_name: str):
+    properties = specification.get('properties', {})
+    keys = tuple(properties)
+    values = [[amulet_nbt.from_snbt(val) for val in properties[key]] for key in keys]
+    for row in itertools.islice(itertools.product(*values), BLOCKSTATES):
+        yield Block(namespace, base_name, dict(zip(keys, row)))
+    if keys:
+        row = [vals[0] for vals in values]
+        for index, key in enumerate(keys):
+            # values that no case matches and missing values
+            properties = dict(zip(keys, row))
+            properties[key] = amulet_nbt.TAG_String('not_a_value')
+            yield Block(namespace, base_name, properties)
+            properties[key] = amulet_nbt.TAG_Int(row[index].value + 1000) if isinstance(row[index], amulet_nbt.TAG_Int) else amulet_nbt.TAG_Int(0)
+            yield Block(namespace, base_name, properties)
+            del properties[key]
+            yield Block(namespace, base_name, properties)
+
+
+def _run(program, block: Block):
+    state = translate_module.TranslationState()
+    program(state, block, None, None, (0, 0, 0), None)
+    return state.output_name, state.output_type, {key: val.to_snbt() for key, val in state.new_data['properties'].items()}
+
+
+class PropertyTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.translations = PyMCTranslate.new_translation_manager()
+
+    def _check_version(self, platform: str, version_number):
+        translator = self.translations.get_version(platform, version_number).block
+        checked = 0
+        for force_blockstate in (False, True):
+            for namespace in translator.namespaces(force_blockstate):
+                for base_name in translator.base_names(namespace, force_blockstate):
+                    mapping = thaw(translator._get_raw_data('to_universal', namespace, base_name, force_blockstate))
+                    if translate_module._property_keys(mapping) is None:
+                        # these depend on more than the properties
+                        continue
+                    tables = translate_module.compile_mappings(mapping)
+                    walked = translate_module.compile_mappings(mapping, False)
+                    specification = translator.get_specification(namespace, base_name, force_blockstate)
+                    for block in _blockstates(specification, namespace, base_name):
+                        self.assertEqual(_run(walked, block), _run(tables, block), block)
+                        checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_full_tables(self):
+        self._check_version('java', (1, 12, 2))
+        self._check_version('bedrock', (1, 16, 0))
+
+    def test_partial_tables(self):
+        # tables larger than the size limit are filled as inputs are seen
+        table_size = translate_module._property_table_size
+        translate_module._property_table_size = 4
+        try:
+            self._check_version('java', (1, 12, 2))
+        finally:
+            translate_module._property_table_size = table_size
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import random
+
+import amulet_nbt
+from amulet_nbt import NBTFile
+
+import PyMCTranslate
+from PyMCTranslate import BlockEntity, Entity
+from PyMCTranslate.py3.translation_manager.translation_table import blockstates
+
+# the number of blockstates used from each block
+BLOCKSTATES = 2
+
+
+def _serialise(obj):
+    if isinstance(obj, (BlockEntity, Entity)):
+        return type(obj).__name__, obj.namespaced_name, obj.nbt.to_snbt()
+    return obj
+
+
+def _inputs(translator, universal: bool):
+    """Blocks and (block, block entity) tuples for every block the translator has a specification for."""
+    inputs = []
+    for namespace in translator.namespaces(False):
+        for base_name in translator.base_names(namespace, False):
+            if universal:
+                specification = translator.get_specification(namespace, base_name)
+            else:
+                specification = translator.get_specification(namespace, base_name, False)
+            for block in list(blockstates(specification, namespace, base_name))[:BLOCKSTATES]:
+                inputs.append(block)
+                inputs.append((block, None))
+                if 'snbt' in specification:
+                    nbt = NBTFile(amulet_nbt.from_snbt(specification['snbt']), specification.get('outer_name', ''))
+                    inputs.append((block, BlockEntity(*specification['nbt_identifier'], 0, 0, 0, nbt)))
+    return inputs
+
+
+class TranslateManyTest(unittest.TestCase):
+    """Translating many blocks at once must match translating each block on its own."""
+
+    def _check(self, platform: str, version_number, direction: str):
+        version = PyMCTranslate.new_translation_manager().get_version(platform, version_number)
+        # a separate manager so that the expected results do not come from the same cache
+        expected_version = PyMCTranslate.new_translation_manager().get_version(platform, version_number)
+        if direction == 'to_universal':
+            inputs = _inputs(version.block, False)
+            translate_many = version.block.to_universal_many
+        else:
+            inputs = _inputs(version.translation_manager.get_version('universal', (1, 0, 0)).block, True)
+            translate_many = version.block.from_universal_many
+        # repeated inputs in a random order
+        inputs = inputs * 2
+        random.Random(f'{platform}{version_number}{direction}').shuffle(inputs)
+
+        outputs = translate_many(iter(inputs))
+        self.assertEqual(len(inputs), len(outputs))
+        needed = block_entities = 0
+        for obj, output in zip(inputs, outputs):
+            block, block_entity = (obj, None) if isinstance(obj, PyMCTranslate.Block) else obj
+            expected = getattr(expected_version.block, direction)(block, None, False, block_entity)
+            self.assertEqual(tuple(map(_serialise, expected)), tuple(map(_serialise, output)), obj)
+            needed += expected[2]
+            block_entities += expected[1] is not None
+        # make sure the data covers the interesting cases
+        self.assertGreater(needed, 0)
+        self.assertGreater(block_entities, 0)
+
+    def test_to_universal(self):
+        self._check('java', (1, 12, 2), 'to_universal')
+        self._check('bedrock', (1, 16, 0), 'to_universal')
+
+    def test_from_universal(self):
+        self._check('java', (1, 15, 2), 'from_universal')
+        self._check('bedrock', (1, 16, 0), 'from_universal')
+
+    def test_outputs_are_shared(self):
+        version = PyMCTranslate.new_translation_manager().get_version('java', (1, 15, 2))
+        block = PyMCTranslate.Block('minecraft', 'stone')
+        outputs = version.block.to_universal_many([block, PyMCTranslate.Block('minecraft', 'stone')])
+        self.assertIs(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], version.block.to_universal(block))
+
+
+if __name__ == '__main__':
+    unittest.main()
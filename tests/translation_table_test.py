@@ -0,0 +1,117 @@
+import unittest
+import os
+import random
+import tempfile
+
+import amulet_nbt
+from amulet_nbt import NBTFile
+
+import PyMCTranslate
+from PyMCTranslate import Block, BlockEntity, Entity
+from PyMCTranslate.py3.translation_manager.translation_table import TranslationTable, blockstates
+
+SOURCE = ('java', (1, 12, 2))
+TARGET = ('bedrock', (1, 16, 0))
+
+
+def _serialise(obj):
+    if isinstance(obj, (BlockEntity, Entity)):
+        return type(obj).__name__, obj.namespaced_name, obj.nbt.to_snbt()
+    elif isinstance(obj, Block):
+        # the property order is part of the result
+        return obj, tuple(obj.properties)
+    return obj
+
+
+def _translate(source, target, block, get_block_callback=None, block_entity=None):
+    """Translate through the universal format with the translators."""
+    universal, universal_extra, extra_needed_to = source.block.to_universal(block, get_block_callback, False, block_entity)
+    if not isinstance(universal, Block):
+        return universal, universal_extra, extra_needed_to
+    if get_block_callback is None:
+        universal_callback = None
+    else:
+        def universal_callback(location):
+            block_, block_entity_ = get_block_callback(location)
+            return source.block.to_universal(block_, None, False, block_entity_)[:2]
+    output, extra_output, extra_needed_from = target.block.from_universal(universal, universal_callback, False, universal_extra)
+    return output, extra_output, extra_needed_to or extra_needed_from
+
+
+def _inputs(version):
+    """Some blockstates of each block in the version with a block entity and a world where they need them."""
+    rnd = random.Random(0)
+    air = Block('minecraft', 'air', {'block_data': amulet_nbt.TAG_Int(0)})
+    for namespace in version.block.namespaces(False):
+        for base_name in version.block.base_names(namespace, False):
+            specification = version.block.get_specification(namespace, base_name, False)
+            blocks = list(blockstates(specification, namespace, base_name))[:4]
+            for block in blocks:
+                if 'snbt' in specification:
+                    nbt = NBTFile(amulet_nbt.from_snbt(specification['snbt']), specification.get('outer_name', ''))
+                    block_entity = BlockEntity(*specification['nbt_identifier'], 0, 0, 0, nbt)
+                else:
+                    block_entity = None
+                world = {}
+
+                def get_block(location, palette=blocks + [air], world=world):
+                    if location not in world:
+                        world[location] = rnd.choice(palette)
+                    return world[location], None
+                yield block, block_entity, get_block
+
+
+class TranslationTableTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        translations = PyMCTranslate.new_translation_manager()
+        cls.table = translations.build_translation_table(translations.get_version(*SOURCE), translations.get_version(*TARGET))
+
+    def setUp(self):
+        # a separate manager so the reference translations do not share caches with the converter
+        translations = PyMCTranslate.new_translation_manager()
+        self.source = translations.get_version(*SOURCE)
+        self.target = translations.get_version(*TARGET)
+
+    def test_table_matches_translation(self):
+        self.assertGreater(len(self.table), 0)
+        for block, output in self.table.items():
+            self.assertEqual((_serialise(output), None, False), tuple(map(_serialise, _translate(self.source, self.target, block))), block)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'table.gz')
+            self.table.save(path)
+            table = TranslationTable.load(path)
+        self.assertEqual((table.source, table.target), (self.table.source, self.table.target))
+        self.assertEqual(
+            [(_serialise(block), _serialise(output)) for block, output in self.table.items()],
+            [(_serialise(block), _serialise(output)) for block, output in table.items()]
+        )
+
+    def _check_converter(self, translations, table: TranslationTable = None):
+        converter = translations.converter(translations.get_version(*SOURCE), translations.get_version(*TARGET), table=table)
+        checked = 0
+        for block, block_entity, get_block in _inputs(self.source):
+            # repeat each input so that the second conversion uses the cache
+            for _ in range(2):
+                expected = _translate(self.source, self.target, block)
+                self.assertEqual(tuple(map(_serialise, expected)), tuple(map(_serialise, converter.convert(block))), block)
+                expected = _translate(self.source, self.target, block, get_block, block_entity)
+                output = converter.convert(block, get_block, block_entity)
+                self.assertEqual(tuple(map(_serialise, expected)), tuple(map(_serialise, output)), block)
+                checked += 1
+        self.assertGreater(checked, 0)
+
+    def test_converter(self):
+        self._check_converter(PyMCTranslate.new_translation_manager())
+
+    def test_converter_with_table(self):
+        self._check_converter(PyMCTranslate.new_translation_manager(), self.table)
+
+    def test_converter_with_eviction(self):
+        self._check_converter(PyMCTranslate.new_translation_manager(cache_entries=2))
+
+
+if __name__ == '__main__':
+    unittest.main()